@@ -0,0 +1,163 @@
+"""
+Admission control for the generation endpoints.
+
+Each endpoint runs at most N requests at once (LEASE_GENERATE_CONCURRENCY,
+default: CPU count; LEASE_PROCESS_CONCURRENCY, default: twice that). Further
+requests wait in a bounded FIFO queue (LEASE_GENERATE_QUEUE /
+LEASE_PROCESS_QUEUE, default 4 x concurrency) for up to LEASE_QUEUE_TIMEOUT
+seconds, or less if the client sends an X-Lease-Deadline header (seconds it
+is willing to wait). A request that finds the queue full is rejected with
+Overloaded(429); one whose wait runs out with Overloaded(503). Both carry a
+Retry-After estimate from the recent service time and queue depth, so under
+a burst the admitted requests keep their latency instead of everyone
+competing for CPU.
+
+Limits are per worker process. A concurrency of 0 disables the limiter.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+_CPUS = os.cpu_count() or 2
+
+QUEUE_TIMEOUT = float(os.environ.get('LEASE_QUEUE_TIMEOUT', '15'))
+DEADLINE_HEADER = 'X-Lease-Deadline'
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; maps to an HTTP status with Retry-After."""
+
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    def __reduce__(self):
+        return type(self), (self.status, str(self), self.retry_after)
+
+
+class Limiter:
+    """Bounded concurrency with a bounded FIFO wait queue."""
+
+    def __init__(self, name, concurrency, max_queue, queue_timeout=QUEUE_TIMEOUT):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._active = 0
+        self._service_seconds = 1.0
+        self._counts = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def _retry_after(self):
+        # Seconds until the current queue has likely drained (lock held)
+        estimate = self._service_seconds * (len(self._waiters) + 1) / max(self.concurrency, 1)
+        return min(60, max(1, math.ceil(estimate)))
+
+    def _acquire(self, timeout):
+        with self._lock:
+            if self._active < self.concurrency and not self._waiters:
+                self._active += 1
+                self._counts["admitted"] += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self._counts["rejected_queue_full"] += 1
+                raise Overloaded(429, f"Too many {self.name} requests queued; retry later", self._retry_after())
+            granted = threading.Event()
+            self._waiters.append(granted)
+            self._counts["queued"] += 1
+
+        granted.wait(timeout)
+        with self._lock:
+            # A slot handed over just as the wait timed out still counts
+            if granted.is_set():
+                self._counts["admitted"] += 1
+                return
+            self._waiters.remove(granted)
+            self._counts["rejected_timeout"] += 1
+            raise Overloaded(503, f"Timed out waiting for a {self.name} slot; retry later", self._retry_after())
+
+    def _release(self, elapsed):
+        with self._lock:
+            self._service_seconds += 0.2 * (elapsed - self._service_seconds)
+            if self._waiters:
+                # Hand the slot straight to the oldest waiter
+                self._waiters.popleft().set()
+            else:
+                self._active -= 1
+
+    @contextmanager
+    def slot(self, deadline=None):
+        """
+        Hold one concurrency slot for the duration of the block.
+
+        Args:
+            deadline (float): Longest time in seconds to wait for a slot;
+                capped at the limiter's queue timeout
+
+        Raises:
+            Overloaded: The queue is full (429) or the wait ran out (503)
+        """
+        if self.concurrency <= 0:
+            yield
+            return
+        self._acquire(self.wait_timeout(deadline))
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - start)
+
+    def wait_timeout(self, deadline=None):
+        """
+        Longest time a request with this deadline waits to be served.
+
+        Args:
+            deadline (float): Client deadline in seconds, or None
+
+        Returns:
+            float: Seconds, capped at the limiter's queue timeout
+        """
+        return self.queue_timeout if deadline is None else max(0.0, min(deadline, self.queue_timeout))
+
+    def stats(self):
+        """
+        Current load and counters.
+
+        Returns:
+            dict: Limits, active requests, queue depth, counters and the
+                smoothed service time in seconds
+        """
+        with self._lock:
+            return dict(self._counts, concurrency=self.concurrency, max_queue=self.max_queue, active=self._active,
+                        queue_depth=len(self._waiters), service_seconds=round(self._service_seconds, 3))
+
+
+def parse_deadline(value):
+    """
+    Parse an X-Lease-Deadline header value.
+
+    Args:
+        value (str): Seconds the client is willing to wait, or None
+
+    Returns:
+        float or None: Seconds, None if absent or invalid
+    """
+    try:
+        deadline = float(value)
+    except (TypeError, ValueError):
+        return None
+    return deadline if math.isfinite(deadline) and deadline >= 0 else None
+
+
+_generate_concurrency = int(os.environ.get('LEASE_GENERATE_CONCURRENCY', str(_CPUS)))
+_process_concurrency = int(os.environ.get('LEASE_PROCESS_CONCURRENCY', str(2 * _CPUS)))
+
+GENERATE = Limiter('generate', _generate_concurrency,
+                   int(os.environ.get('LEASE_GENERATE_QUEUE', str(4 * _generate_concurrency))))
+PROCESS = Limiter('process', _process_concurrency,
+                  int(os.environ.get('LEASE_PROCESS_QUEUE', str(4 * _process_concurrency))))
@@ -1,11 +1,132 @@
 from flask import Flask, request, jsonify, send_from_directory, send_file
-from converter import update_json_with_generated_content, keyValueMapping
-from lease_automation import getMapping, simple_document_replacement
+from lease_pipeline import enrich, build_mapping
+from fanout import render_many, safe_filename, unique_names, zip_documents
+from json_response import json_response
+from payload_schema import validate_lease_payload, validate_generate_payload
+import admission
+import mapping_cache
+import single_flight
+import template_registry
+from template_store import ensure_store
+from pdf_convert import docx_to_pdf, PDF_MIMETYPE
+import profiling
+from deterministic_output import DETERMINISTIC_TIMESTAMP, content_hash
+import warmup
 import io
 import os
 
 app = Flask(__name__, static_folder='web', static_url_path='')
 
+DEFAULT_TEMPLATE_PATH = os.environ.get('DEFAULT_TEMPLATE_PATH') or '/Users/daivikvennela/workspace/lease_automation/template/Linea - Lilac Easement Agreement (WA) 4927-7044-5639.4.docx'
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Multi-worker deployments share one read-only, memory-mapped template store.
+# It is rebuilt from the registry directory at startup when out of date;
+# uploads and deletes are rejected while it is in use.
+TEMPLATE_STORE_PATH = os.environ.get('LEASE_TEMPLATE_STORE')
+if TEMPLATE_STORE_PATH:
+    template_registry.attach_store(ensure_store(TEMPLATE_STORE_PATH, template_registry.TEMPLATE_REGISTRY_DIR))
+else:
+    template_registry.load_registry()
+
+# Preload templates and warm caches in the background; /api/ready reports when done
+warmup.start_warmup([DEFAULT_TEMPLATE_PATH])
+
+
+def _is_truthy(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _store_read_only():
+    return jsonify({"error": "Templates are served from a read-only template store (LEASE_TEMPLATE_STORE); "
+                             "add or remove them in the registry directory and restart the workers"}), 409
+
+
+def _overloaded(error):
+    """Response for a request that was not admitted (429 queue full, 503 wait timed out)."""
+    return jsonify({"error": str(error)}), error.status, {"Retry-After": str(error.retry_after)}
+
+
+def _resolve_template(spec):
+    """Return (template, display name) for a template_id / template_path spec; (None, None) for an unknown id."""
+    template_id = spec.get('template_id')
+    if template_id:
+        meta = template_registry.get_template(template_id)
+        if meta is None:
+            return None, None
+        return template_registry.get_working_copy(template_id), meta["name"]
+    # Optional override for template path
+    template_path = spec.get('template_path') or DEFAULT_TEMPLATE_PATH
+    template = template_registry.get_path_working_copy(template_path) or template_path
+    return template, os.path.basename(template_path)
+
+
+def _template_identity(spec):
+    """Identify a spec's template for request coalescing: registry id, or path and modification time."""
+    if spec.get('template_id'):
+        return spec['template_id']
+    template_path = spec.get('template_path') or DEFAULT_TEMPLATE_PATH
+    try:
+        return [template_path, os.stat(template_path).st_mtime_ns]
+    except OSError:
+        return [template_path, None]
+
+
+def _generate(payload, specs, mapping_list, output_format, deterministic, capture):
+    """
+    Render the documents of a validated generate request.
+
+    Returns plain data rather than a response, so coalesced requests can
+    share it: ('error', body, status) or ('ok', file name, bytes, mimetype).
+    """
+    # Fan-out: "templates" renders the same mapping into several templates
+    targets = []
+    for spec in specs:
+        template, template_name = _resolve_template(spec)
+        if template is None:
+            return 'error', {"error": f"Unknown template_id '{spec.get('template_id')}'"}, 404
+        # Names end up in the download header and as ZIP entry names
+        if len(specs) > 1:
+            name = safe_filename(spec.get('output_filename') or template_name, 'document')
+        else:
+            name = safe_filename(payload.get('output_filename') or 'processed_document.docx', 'processed_document')
+        targets.append((template, name if name.lower().endswith('.docx') else name + '.docx'))
+    track_changes = bool(payload.get('track_changes', False))
+    timestamp = payload.get('generation_timestamp') or DETERMINISTIC_TIMESTAMP
+
+    # Build mapping: build_mapping(enrich(json_data)), unless precomputed
+    if mapping_list is None:
+        with capture.stage('mapping'):
+            mapping_list = build_mapping(enrich(payload, deterministic=deterministic))
+
+    # Generate documents (in parallel when fanning out)
+    names = unique_names([name for _, name in targets])
+    with capture.stage('render'):
+        results = render_many([template for template, _ in targets], mapping_list, track_changes=track_changes,
+                              exhibit_format=payload.get('exhibit_format') or 'auto',
+                              deterministic=deterministic, timestamp=timestamp)
+    failures = [{"index": i, "output": names[i], "error": err} for i, (ok, _, err) in enumerate(results) if not ok]
+    capture.save(output=names, ok=not failures, error=failures or None)
+    if failures:
+        if len(targets) == 1:
+            return 'error', {"error": failures[0]["error"]}, 400
+        return 'error', {"error": "Rendering failed", "details": failures}, 400
+
+    documents = []
+    for name, (_, docx_bytes, _) in zip(names, results):
+        if output_format == 'pdf':
+            ok, pdf_bytes, err = docx_to_pdf(docx_bytes)
+            if not ok:
+                return 'error', {"error": err}, 503
+            documents.append((os.path.splitext(name)[0] + '.pdf', pdf_bytes, PDF_MIMETYPE))
+        else:
+            documents.append((name, docx_bytes, DOCX_MIMETYPE))
+
+    if len(documents) == 1:
+        return ('ok',) + documents[0]
+    archive_name = safe_filename(payload.get('output_filename') or 'documents', 'documents')
+    return 'ok', os.path.splitext(archive_name)[0] + '.zip', zip_documents([(n, data) for n, data, _ in documents]), 'application/zip'
+
 
 @app.route('/')
 def index():
@@ -18,12 +139,27 @@ def process_json():
         data = request.get_json(force=True, silent=False)
         if not isinstance(data, dict):
             return jsonify({"error": "JSON payload must be an object"}), 400
-        enriched = update_json_with_generated_content(data)
-        mapping = keyValueMapping(enriched)
-        return jsonify({
+        errors = validate_lease_payload(data)
+        if errors:
+            return jsonify({"error": "Invalid payload", "details": errors}), 400
+        deterministic = bool(data.get('deterministic')) or _is_truthy(request.args.get('deterministic'))
+        with admission.PROCESS.slot(admission.parse_deadline(request.headers.get(admission.DEADLINE_HEADER))):
+            enriched = enrich(data, deterministic=deterministic)
+            mapping = build_mapping(enriched)
+        # The handle lets /api/generate-docx (on this worker process) reuse this mapping
+        mapping_handle = mapping_cache.store_mapping(mapping, deterministic=deterministic)
+        # Lightweight mode (?lite=1) skips sending enriched_json back;
+        # ?shape=dedup sends repeated long strings once in a "$strings" table
+        dedupe = request.args.get('shape') == 'dedup'
+        if _is_truthy(request.args.get('lite')):
+            return json_response({"mapping": mapping, "mapping_handle": mapping_handle}, dedupe=dedupe)
+        return json_response({
             "mapping": mapping,
+            "mapping_handle": mapping_handle,
             "enriched_json": enriched
-        })
+        }, dedupe=dedupe)
+    except admission.Overloaded as e:
+        return _overloaded(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 @app.route('/api/generate-docx', methods=['POST'])
@@ -32,25 +168,131 @@ def generate_docx():
         payload = request.get_json(force=True, silent=False)
         if not isinstance(payload, dict):
             return jsonify({"error": "JSON payload must be an object"}), 400
+        errors = validate_generate_payload(payload)
+        if errors:
+            return jsonify({"error": "Invalid payload", "details": errors}), 400
+
+        specs = payload.get('templates') or [payload]
+        output_format = payload.get('format') or request.args.get('format') or 'docx'
+        if output_format not in ('docx', 'pdf'):
+            return jsonify({"error": "format must be 'docx' or 'pdf'"}), 400
+        # Deterministic mode: identical input -> identical bytes (and ETag)
+        deterministic = bool(payload.get('deterministic')) or _is_truthy(request.args.get('deterministic'))
 
-        # Optional override for template path and output filename
-        template_path = payload.get('template_path') or '/Users/daivikvennela/workspace/lease_automation/template/Linea - Lilac Easement Agreement (WA) 4927-7044-5639.4.docx'
-        output_name = payload.get('output_filename') or 'processed_document.docx'
-        track_changes = bool(payload.get('track_changes', False))
+        # Mapping from /api/process (by handle) or supplied by the caller
+        mapping_list = payload.get('mapping')
+        if payload.get('mapping_handle'):
+            mapping_list = mapping_cache.get_mapping(payload['mapping_handle'], deterministic=deterministic,
+                                                     timestamp=payload.get('generation_timestamp') or DETERMINISTIC_TIMESTAMP)
+            if mapping_list is None:
+                return jsonify({"error": "Unknown or expired mapping_handle (handles are only valid on the worker "
+                                         "process that issued them)"}), 410
 
-        # Build mapping using requested flow: getMapping(update_json_with_generated_content(json_data))
-        mapping_list = getMapping(payload)
+        # Opt-in profiling (X-Lease-Profile header or LEASE_PROFILE_SAMPLE_RATE)
+        capture = profiling.capture_for('/api/generate-docx', requested=_is_truthy(request.headers.get(profiling.PROFILE_HEADER)))
 
-        # Generate document
-        ok, docx_bytes, err = simple_document_replacement(template_path, mapping_list, output_filename=output_name, track_changes=track_changes)
-        if not ok:
-            return jsonify({"error": err}), 400
+        # Identical concurrent requests (double clicks, client retries) share
+        # one render; profiled requests always render on their own. Only the
+        # rendering request takes a concurrency slot; the others wait for it
+        # no longer than they would wait for a slot.
+        deadline = admission.parse_deadline(request.headers.get(admission.DEADLINE_HEADER))
+        def generate():
+            with admission.GENERATE.slot(deadline):
+                return _generate(payload, specs, mapping_list, output_format, deterministic, capture)
+        shared = False
+        if single_flight.SINGLE_FLIGHT_ENABLED and capture.id is None:
+            key = single_flight.request_key(payload, output_format, deterministic, [_template_identity(spec) for spec in specs])
+            outcome, shared = single_flight.run(key, generate, timeout=admission.GENERATE.wait_timeout(deadline))
+        else:
+            outcome = generate()
+        if outcome[0] == 'error':
+            _, body, status = outcome
+            return jsonify(body), status
 
-        return send_file(io.BytesIO(docx_bytes), as_attachment=True, download_name=output_name, mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+        _, name, body, mimetype = outcome
+        response = send_file(io.BytesIO(body), as_attachment=True, download_name=name, mimetype=mimetype,
+                             etag=content_hash(body) if deterministic else False)
+        if shared:
+            response.headers['X-Lease-Coalesced'] = '1'
+        if capture.id:
+            response.headers['X-Lease-Profile-Id'] = capture.id
+        return response
+    except admission.Overloaded as e:
+        return _overloaded(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
+@app.route('/api/templates', methods=['POST'])
+def upload_template():
+    if TEMPLATE_STORE_PATH:
+        return _store_read_only()
+    upload = request.files.get('file')
+    if upload is not None:
+        data = upload.read()
+        name = upload.filename
+    else:
+        data = request.get_data()
+        name = request.args.get('name')
+    if not data:
+        return jsonify({"error": "Upload a DOCX file as multipart field 'file' or as the request body"}), 400
+    try:
+        meta = template_registry.register_template(data, name=name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(meta), 201
+
+
+@app.route('/api/templates', methods=['GET'])
+def list_templates():
+    return jsonify({"templates": template_registry.list_templates()})
+
+
+@app.route('/api/templates/<template_id>', methods=['GET'])
+def get_template(template_id):
+    meta = template_registry.get_template(template_id)
+    if meta is None:
+        return jsonify({"error": f"Unknown template_id '{template_id}'"}), 404
+    return jsonify(meta)
+
+
+@app.route('/api/templates/<template_id>', methods=['DELETE'])
+def delete_template(template_id):
+    if TEMPLATE_STORE_PATH:
+        return _store_read_only()
+    if not template_registry.delete_template(template_id):
+        return jsonify({"error": f"Unknown template_id '{template_id}'"}), 404
+    return jsonify({"deleted": template_id})
+
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    state = warmup.readiness()
+    return jsonify(state), 200 if state["ready"] else 503
+
+
+@app.route('/api/admission', methods=['GET'])
+def admission_stats():
+    return jsonify({
+        "generate": admission.GENERATE.stats(),
+        "process": admission.PROCESS.stats(),
+        "coalescing": single_flight.stats(),
+    })
+
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    return jsonify({"profiles": profiling.list_profiles()})
+
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    archive = profiling.profile_archive(profile_id)
+    if archive is None:
+        return jsonify({"error": f"Unknown profile '{profile_id}'"}), 404
+    return send_file(io.BytesIO(archive), as_attachment=True, download_name=f"{profile_id}.zip", mimetype='application/zip')
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Batch lease generation.
+
+Reads a manifest of lease payloads (a JSON array, or JSON Lines with one
+payload per line), validates every record up front and only then renders
+each one into the output directory. Records may name an uploaded template
+by template_id; it is read from the template registry directory
+(LEASE_TEMPLATE_DIR).
+
+Usage:
+    python batch.py manifest.json --template template.docx --out-dir out/
+"""
+import argparse
+import json
+import os
+import sys
+
+from lease_pipeline import build_mapping, enrich
+from fanout import render_many, safe_filename, unique_names
+from payload_schema import validate_manifest
+import pdf_convert
+import profiling
+import template_registry
+import worker_pool
+from deterministic_output import DETERMINISTIC_TIMESTAMP
+
+
+def load_manifest(path):
+    """
+    Load batch records from a JSON array or JSON Lines file.
+
+    Args:
+        path (str): Manifest file path
+
+    Returns:
+        list: Lease payloads
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        records = json.loads(stripped)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return records
+
+
+def output_filename_for(record, index):
+    """
+    Pick the output file name for a record.
+
+    Args:
+        record (dict): Lease payload
+        index (int): Record index in the manifest
+
+    Returns:
+        str: File name ending in .docx
+    """
+    name = record.get('output_filename') or record.get('document_name') or f"lease_{index + 1}"
+    name = safe_filename(name, f"lease_{index + 1}")
+    if not name.lower().endswith('.docx'):
+        name += '.docx'
+    return name
+
+
+def template_ids(record):
+    """
+    List the registry template ids a record refers to.
+
+    Args:
+        record (dict): Lease payload
+
+    Returns:
+        list: (field path, template id) pairs, e.g. ("templates[1].template_id", "...")
+    """
+    ids = []
+    if isinstance(record, dict):
+        if record.get('template_id'):
+            ids.append(("template_id", record['template_id']))
+        for i, spec in enumerate(record.get('templates') or ()):
+            if isinstance(spec, dict) and spec.get('template_id'):
+                ids.append((f"templates[{i}].template_id", spec['template_id']))
+    return ids
+
+
+def validate_template_ids(records):
+    """
+    Check that every template_id in a manifest is in the template registry.
+
+    Args:
+        records (list): Lease payloads
+
+    Returns:
+        list: Error messages in validate_manifest() format; empty if all are known
+    """
+    errors = []
+    for i, record in enumerate(records):
+        for path, template_id in template_ids(record):
+            try:
+                known = template_registry.load_template(template_id) is not None
+            except ValueError as e:
+                errors.append(f"records[{i}].{path}: {str(e)}")
+                continue
+            if not known:
+                errors.append(f"records[{i}].{path}: unknown template_id '{template_id}'")
+    return errors
+
+
+def resolve_template(spec, template):
+    """
+    Get the template to render a spec into.
+
+    Args:
+        spec (dict): Record or template spec with template_id or template_path
+        template (str): Default DOCX template path
+
+    Returns:
+        Document or str: Working copy of a registry template, or a file path
+    """
+    if spec.get('template_id'):
+        if template_registry.load_template(spec['template_id']) is None:
+            raise ValueError(f"Unknown template_id '{spec['template_id']}'")
+        return template_registry.get_working_copy(spec['template_id'])
+    return spec.get('template_path') or template
+
+
+def fan_out_filename(output_name, spec):
+    """
+    Pick the output file name for one template of a fanned-out record.
+
+    Args:
+        output_name (str): The record's output file name
+        spec (dict): Template spec with template_id or template_path and optional output_filename
+
+    Returns:
+        str: File name ending in .docx, e.g. "Lease - memorandum.docx"
+    """
+    if spec.get('output_filename'):
+        return output_filename_for(spec, 0)
+    template_name = spec.get('template_path') or 'template'
+    if spec.get('template_id'):
+        meta = template_registry.load_template(spec['template_id'])
+        template_name = meta["name"] if meta else spec['template_id']
+    template_stem = os.path.splitext(os.path.basename(template_name))[0]
+    return output_filename_for({"output_filename": f"{os.path.splitext(output_name)[0]} - {template_stem}"}, 0)
+
+
+def render_record(record, index, template, out_dir, track_changes=False, output_format='docx', profile=False,
+                  deterministic=False, fan_out=None, output_name=None):
+    """
+    Render one manifest record and write it to out_dir.
+
+    With fan-out (the record's "templates" or the fan_out argument) the
+    mapping is built once and rendered into every template.
+
+    Args:
+        record (dict): Lease payload
+        index (int): Record index in the manifest
+        template (str): Default DOCX template path (records and template
+            specs may set template_path, or template_id for the registry)
+        out_dir (str): Output directory
+        track_changes (bool): Enable track changes mode
+        output_format (str): 'docx' or 'pdf' (records may override with format)
+        profile (bool): Capture a profile of the record (see profiling.py)
+        deterministic (bool): Byte-stable output (records may override with deterministic)
+        fan_out (list): Template paths to render every record into
+        output_name (str): Output file name (default: output_filename_for())
+
+    Returns:
+        dict: Result with index, output path(s) and error (None on success)
+    """
+    output_name = output_name or output_filename_for(record, index)
+    specs = record.get('templates') or [{"template_path": path} for path in fan_out or ()]
+    if specs:
+        names = unique_names([fan_out_filename(output_name, spec) for spec in specs])
+        templates = [resolve_template(spec, template) for spec in specs]
+    else:
+        names = [output_name]
+        templates = [resolve_template(record, template)]
+    deterministic = bool(record.get('deterministic', deterministic))
+    capture = profiling.capture_for(f"batch record {index}", requested=profile)
+    with capture.stage('mapping'):
+        mapping = build_mapping(enrich(record, deterministic=deterministic))
+    with capture.stage('render'):
+        results = render_many(
+            templates,
+            mapping,
+            track_changes=bool(record.get('track_changes', track_changes)),
+            exhibit_format=record.get('exhibit_format') or 'auto',
+            deterministic=deterministic,
+            timestamp=record.get('generation_timestamp') or DETERMINISTIC_TIMESTAMP,
+        )
+    errors = [err for ok, _, err in results if not ok]
+    capture.save(output=names, ok=not errors, error=errors or None)
+    if errors:
+        return {"index": index, "output": None, "outputs": [], "error": "; ".join(errors)}
+
+    outputs = []
+    for name, (_, docx_bytes, _) in zip(names, results):
+        if record.get('format', output_format) == 'pdf':
+            ok, docx_bytes, err = pdf_convert.docx_to_pdf(docx_bytes)
+            if not ok:
+                return {"index": index, "output": None, "outputs": outputs, "error": err}
+            name = os.path.splitext(name)[0] + '.pdf'
+        output_path = os.path.join(out_dir, name)
+        with open(output_path, 'wb') as f:
+            f.write(docx_bytes)
+        outputs.append(output_path)
+    return {"index": index, "output": outputs[0], "outputs": outputs, "error": None}
+
+
+def _failed_result(index, message):
+    return {"index": index, "output": None, "outputs": [], "error": message}
+
+
+def _render_named(item, index, *args):
+    record, output_name = item
+    return render_record(record, index, *args, output_name=output_name)
+
+
+def run_batch(records, template, out_dir, track_changes=False, output_format='docx', profile=False, deterministic=False,
+              fan_out=None, workers=0, max_tasks=worker_pool.MAX_TASKS_PER_WORKER, max_rss_mb=worker_pool.MAX_WORKER_RSS_MB):
+    """
+    Validate all records, then render them one by one, or on a pool of
+    recycled worker processes (see worker_pool.py).
+
+    Args:
+        records (list): Lease payloads
+        template (str): Default DOCX template path
+        out_dir (str): Output directory
+        track_changes (bool): Enable track changes mode
+        output_format (str): 'docx' or 'pdf'
+        profile (bool): Profile every record
+        deterministic (bool): Byte-stable output
+        fan_out (list): Template paths to render every record into
+        workers (int): Worker processes (0: render in this process)
+        max_tasks (int): Records per worker process before it is replaced (0: no limit)
+        max_rss_mb (float): Worker RSS that triggers a replacement (0: no limit)
+
+    Returns:
+        dict: Summary with "validation_errors", per-record "results" and
+            per-worker-process "workers" stats (empty without workers)
+    """
+    errors = validate_manifest(records) or validate_template_ids(records)
+    if errors:
+        return {"validation_errors": errors, "results": [], "workers": []}
+    os.makedirs(out_dir, exist_ok=True)
+    # Records with the same document_name must not overwrite each other
+    names = unique_names([output_filename_for(record, i) for i, record in enumerate(records)])
+    items = list(zip(records, names))
+    args = (template, out_dir, track_changes, output_format, profile, deterministic, fan_out)
+    if workers > 0:
+        results, worker_stats = worker_pool.run_pool(
+            _render_named, items, args, workers=workers, max_tasks=max_tasks, max_rss_mb=max_rss_mb,
+            on_error=_failed_result, on_exit=pdf_convert.shutdown)
+        return {"validation_errors": [], "results": results, "workers": worker_stats}
+    try:
+        results = [_render_named(item, i, *args) for i, item in enumerate(items)]
+    finally:
+        pdf_convert.shutdown()
+    return {"validation_errors": [], "results": results, "workers": []}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate lease documents for every record in a manifest.")
+    parser.add_argument('manifest', help="JSON array or JSON Lines file of lease payloads")
+    parser.add_argument('--template', help="DOCX template (records may override with template_path or template_id)")
+    parser.add_argument('--out-dir', default='output', help="Directory for generated documents")
+    parser.add_argument('--track-changes', action='store_true', help="Enable track changes mode")
+    parser.add_argument('--format', choices=['docx', 'pdf'], default='docx', help="Output format (pdf needs LibreOffice)")
+    parser.add_argument('--profile', action='store_true', help="Profile every record (LEASE_PROFILE_SAMPLE_RATE samples otherwise)")
+    parser.add_argument('--deterministic', action='store_true', help="Byte-identical output for identical records")
+    parser.add_argument('--fan-out', nargs='+', metavar='TEMPLATE',
+                        help="Render every record into each of these templates (records may set templates)")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('LEASE_BATCH_WORKERS', '0')),
+                        help="Render on this many worker processes (default: in this process)")
+    parser.add_argument('--max-tasks-per-worker', type=int, default=worker_pool.MAX_TASKS_PER_WORKER,
+                        help="Replace a worker process after this many records (0: never)")
+    parser.add_argument('--max-worker-rss-mb', type=float, default=worker_pool.MAX_WORKER_RSS_MB,
+                        help="Replace a worker process once its RSS reaches this many MB (0: never)")
+    args = parser.parse_args(argv)
+
+    records = load_manifest(args.manifest)
+    if not isinstance(records, list):
+        print("[ERROR] Manifest must be a JSON array or JSON Lines file", file=sys.stderr)
+        return 2
+    if not args.template and not args.fan_out and any(
+            isinstance(r, dict) and not r.get('template_path') and not r.get('template_id') and not r.get('templates')
+            for r in records):
+        print("[ERROR] --template or --fan-out is required unless every record sets template_path, template_id "
+              "or templates", file=sys.stderr)
+        return 2
+
+    summary = run_batch(records, args.template, args.out_dir, args.track_changes, args.format, args.profile, args.deterministic,
+                        args.fan_out, args.workers, args.max_tasks_per_worker, args.max_worker_rss_mb)
+    if summary["validation_errors"]:
+        print("[ERROR] Manifest validation failed; nothing was rendered:", file=sys.stderr)
+        for error in summary["validation_errors"]:
+            print(f"  {error}", file=sys.stderr)
+        return 1
+
+    failed = [r for r in summary["results"] if r["error"]]
+    for result in failed:
+        print(f"[ERROR] Record {result['index']}: {result['error']}", file=sys.stderr)
+    documents = sum(len(r["outputs"]) for r in summary["results"])
+    print(f"[INFO] Rendered {len(summary['results']) - len(failed)}/{len(records)} records ({documents} documents) into {args.out_dir}")
+    if summary["workers"]:
+        for stats in summary["workers"]:
+            if stats["tasks"] is None:
+                print(f"[INFO] Worker {stats['pid']}: {stats['reason']}")
+            else:
+                print(f"[INFO] Worker {stats['pid']}: {stats['tasks']} records, RSS {stats['start_rss_mb']:.0f} -> "
+                      f"{stats['last_rss_mb']:.0f} MB (peak {stats['peak_rss_mb']:.0f} MB), exit: {stats['reason']}")
+        totals = worker_pool.summarize_workers(summary["workers"])
+        peak = f"{totals['peak_rss_mb']:.0f} MB" if totals["peak_rss_mb"] is not None else "n/a"
+        print(f"[INFO] {totals['processes']} worker processes ({totals['recycled_max_tasks']} recycled at the task limit, "
+              f"{totals['recycled_max_rss']} at the RSS limit, {totals['died']} died), peak worker RSS {peak}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
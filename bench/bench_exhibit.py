@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled exhibit templates.
+
+Compared against:
+
+- dynamic:  the same templates/exhibit blocks rendered without compilation
+            (read the cached text, str.replace each slot per parcel)
+- f-string: the previous hard-coded build_exhibit_string layout
+
+The template blocks are several times longer than the old one-line parcel
+headers, so output size and time per KB of output are printed as well.
+
+Usage:
+    python bench/bench_exhibit.py [--parcels 1 10 100 500] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exhibit_templates import (  # noqa: E402
+    EXHIBIT_TEMPLATE_DIR, EXHIBIT_TEMPLATE_FILES, load_exhibit_templates, render_exhibit, select_exhibit_template,
+)
+
+
+def load_texts():
+    texts = {}
+    for name, filename in EXHIBIT_TEMPLATE_FILES.items():
+        with open(os.path.join(EXHIBIT_TEMPLATE_DIR, filename), 'r', encoding='utf-8') as f:
+            texts[name] = f.read().strip()
+    return texts
+
+
+def dynamic_exhibit(parcels, context, texts):
+    """The same blocks rendered by replacing each slot per parcel."""
+    county = context.get("county", "")
+    state = context.get("state", "")
+    blocks = [texts["general"].replace("[County]", str(county)).replace("[State]", str(state))]
+    for parcel in parcels:
+        text = texts[select_exhibit_template(parcel)]
+        for slot, value in (
+            ("[i]", parcel.get("parcelNumber", "Unknown")),
+            ("[Acres]", parcel.get("acres", 0)),
+            ("[Legal Description]", parcel.get("legal_description", "No legal description provided")),
+            ("[APN]", parcel.get("apn", "Unknown")),
+            ("[County]", county),
+            ("[State]", state),
+        ):
+            text = text.replace(slot, str(value))
+        blocks.append(text)
+    return "\n\n".join(blocks)
+
+
+def fstring_exhibit(parcels):
+    """The previous build_exhibit_string body, without its debug prints."""
+    exhibit_parts = ["EXHIBIT A", "", "General Description of Property", ""]
+    exhibit_parts.append("[Image]")
+    exhibit_parts.append("")
+    for parcel in parcels:
+        parcel_number = parcel.get("parcelNumber", "Unknown")
+        apn = parcel.get("apn", "Unknown")
+        acres = parcel.get("acres", 0)
+        legal_description = parcel.get("legal_description", "No legal description provided")
+        if parcel.get("isPortion", False):
+            parcel_description = f"Portion {parcel_number} (APN: {apn}, {acres} acres):\n\n{legal_description}"
+        else:
+            parcel_description = f"Parcel {parcel_number} (APN: {apn}, {acres} acres):\n\n{legal_description}"
+        exhibit_parts.append(parcel_description)
+        exhibit_parts.append("")
+    return "\n".join(exhibit_parts)
+
+
+def make_parcels(count):
+    return [
+        {
+            "parcelNumber": i,
+            "apn": f"16174.{9000 + i}",
+            "acres": 10 + i % 7,
+            "legal_description": f"17-26-41(SE1/4): THE WEST 887.00 FT OF THE NORTH 492.68 FT OF LOT {i}; EXCEPT COUNTY ROADS.",
+            "isPortion": i % 3 == 0,
+            "templateType": "standard",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parcels', type=int, nargs='+', default=[1, 10, 100, 500])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    load_exhibit_templates()
+    texts = load_texts()
+    context = {"county": "Spokane", "state": "Washington"}
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=args.repeat, repeat=5)) / args.repeat
+
+    print(f"{'parcels':>8} {'f-string us':>12} {'dynamic us':>11} {'compiled us':>12}"
+          f" {'f-string KB':>12} {'compiled KB':>12} {'f-string us/KB':>15} {'compiled us/KB':>15}")
+    for count in args.parcels:
+        parcels = make_parcels(count)
+        assert dynamic_exhibit(parcels, context, texts) == render_exhibit(parcels, context)
+        fstring_t = best(lambda: fstring_exhibit(parcels))
+        dynamic_t = best(lambda: dynamic_exhibit(parcels, context, texts))
+        compiled_t = best(lambda: render_exhibit(parcels, context))
+        fstring_kb = len(fstring_exhibit(parcels)) / 1024
+        compiled_kb = len(render_exhibit(parcels, context)) / 1024
+        print(f"{count:>8} {fstring_t * 1e6:>12.1f} {dynamic_t * 1e6:>11.1f} {compiled_t * 1e6:>12.1f}"
+              f" {fstring_kb:>12.1f} {compiled_kb:>12.1f} {fstring_t * 1e6 / fstring_kb:>15.1f}"
+              f" {compiled_t * 1e6 / compiled_kb:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
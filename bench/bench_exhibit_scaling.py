@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark Exhibit A scaling with the parcel count.
+
+For each parcel count, times building the mapping and rendering the document
+with the exhibit as one text run ("text") and as structured paragraphs
+("paragraphs"), and reports output size. The per-parcel columns should stay
+flat as the count grows if rendering is linear.
+
+Usage:
+    python bench/bench_exhibit_scaling.py [--counts 10,100,250,500,1000] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from lease_pipeline import build_mapping, enrich, render  # noqa: E402
+
+
+def build_template():
+    doc = Document()
+    doc.add_paragraph("This Easement Agreement is made by [Grantor Name], [Owner Type].")
+    doc.add_paragraph("[Signature Block]")
+    doc.add_page_break()
+    doc.add_paragraph("[Exhibit A - Exhibit A String]")
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def make_payload(count):
+    return {
+        "document_name": f"Scaling Lease {count}",
+        "grantor_name": "Grantor LLC",
+        "owner_type": "LLC",
+        "number_of_grantor_signatures": 1,
+        "state": "Washington",
+        "county": "Spokane",
+        "parcels": [
+            {
+                "apn": f"16174.{i}",
+                "acres": 10 + i % 40,
+                "legal_description": f"17-26-41(SE1/4): THE NORTH 492.68 FT OF LOT {i}; EXCEPT COUNTY ROADS.",
+                "isPortion": i % 3 == 0,
+            }
+            for i in range(1, count + 1)
+        ],
+    }
+
+
+def best_of(repeat, fn):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', default='10,100,250,500,1000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    counts = [int(c) for c in args.counts.split(',')]
+
+    template = build_template()
+    real_stdout = sys.stdout
+    rows = []
+    sys.stdout = open(os.devnull, 'w')  # the pipeline's debug output
+    try:
+        for count in counts:
+            payload = make_payload(count)
+            mapping_t, mapping = best_of(args.repeat, lambda: build_mapping(enrich(payload)))
+            row = {"count": count, "mapping": mapping_t}
+            for exhibit_format in ('text', 'paragraphs'):
+                t, (ok, docx_bytes, err) = best_of(args.repeat, lambda: render(
+                    io.BytesIO(template), mapping, exhibit_images=False, exhibit_format=exhibit_format))
+                if not ok:
+                    raise RuntimeError(err)
+                row[exhibit_format] = (t, len(docx_bytes))
+            rows.append(row)
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"{'parcels':>7} {'mapping ms':>10} {'text ms':>8} {'text KB':>8} {'text us/p':>9}"
+          f" {'para ms':>8} {'para KB':>8} {'para us/p':>9}")
+    for row in rows:
+        n = row["count"]
+        text_t, text_size = row["text"]
+        para_t, para_size = row["paragraphs"]
+        print(f"{n:>7} {1000 * row['mapping']:>10.1f} {1000 * text_t:>8.1f} {text_size / 1024:>8.1f} {1e6 * text_t / n:>9.0f}"
+              f" {1000 * para_t:>8.1f} {para_size / 1024:>8.1f} {1e6 * para_t / n:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark parcel loop expansion with the parcel count.
+
+Renders a template with a per-parcel paragraph loop and a per-parcel table
+row (see parcel_loops.py) using the full production mapping, and reports
+render time and time per parcel. The per-parcel column should stay flat as
+the count grows.
+
+Usage:
+    python bench/bench_parcel_loops.py [--counts 10,100,500,1000,2000] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from bench_exhibit_scaling import best_of, make_payload  # noqa: E402
+from lease_pipeline import build_mapping, enrich, render  # noqa: E402
+from parcel_loops import LOOP_BEGIN, LOOP_END, ROW_MARKER  # noqa: E402
+
+
+def build_template():
+    doc = Document()
+    doc.add_paragraph("This Easement Agreement is made by [Grantor Name], [Owner Type].")
+    doc.add_paragraph(LOOP_BEGIN)
+    paragraph = doc.add_paragraph("Parcel [Parcel Index]: APN ")
+    paragraph.add_run("[Parcel APN]").bold = True
+    paragraph.add_run(", [Parcel Acres] acres, [County] County, [State]")
+    doc.add_paragraph("[Parcel Legal Description]")
+    doc.add_paragraph(LOOP_END)
+    table = doc.add_table(rows=2, cols=3)
+    for cell, text in zip(table.rows[0].cells, ("APN", "Acres", "Portion")):
+        cell.text = text
+    for cell, text in zip(table.rows[1].cells, (f"{ROW_MARKER}[Parcel APN]", "[Parcel Acres]", "[Parcel Is Portion]")):
+        cell.text = text
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', default='10,100,500,1000,2000')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    counts = [int(c) for c in args.counts.split(',')]
+
+    template = build_template()
+    real_stdout = sys.stdout
+    rows = []
+    sys.stdout = open(os.devnull, 'w')  # the pipeline's debug output
+    try:
+        for count in counts:
+            mapping = build_mapping(enrich(make_payload(count)))
+            t, (ok, docx_bytes, err) = best_of(args.repeat, lambda: render(
+                io.BytesIO(template), mapping, exhibit_images=False))
+            if not ok:
+                raise RuntimeError(err)
+            rows.append((count, len(mapping), t, len(docx_bytes)))
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"{'parcels':>7} {'keys':>6} {'render ms':>9} {'KB':>8} {'us/parcel':>9}")
+    for count, keys, t, size in rows:
+        print(f"{count:>7} {keys:>6} {1000 * t:>9.1f} {size / 1024:>8.1f} {1e6 * t / count:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
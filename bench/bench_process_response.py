@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/process response size and encode time as parcel count grows.
+
+For each parcel count the full {"mapping", "enriched_json"} response is
+encoded with every registered encoder, with and without string
+de-duplication, and gzip-compressed.
+
+Usage:
+    python bench/bench_process_response.py [--parcels 1 10 100 500] [--repeat 20]
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_response import COMPRESS_LEVEL, JSON_ENCODERS, dedupe_strings  # noqa: E402
+from lease_pipeline import build_mapping, enrich  # noqa: E402
+
+
+def make_payload(count):
+    parcels = [
+        {
+            "apn": f"16174.{9000 + i}",
+            "acres": 10 + i % 7,
+            "legal_description": f"17-26-41(SE1/4): THE WEST 887.00 FT OF THE NORTH 492.68 FT OF THE SOUTH 1645.84 FT OF LOT {i}; EXCEPT COUNTY ROADS. (PARCEL {i} ROS AFN 7390810)",
+            "isPortion": i % 3 == 0,
+        }
+        for i in range(1, count + 1)
+    ]
+    return {
+        "document_name": "Bench Easement Agreement",
+        "grantor_type": "Individual",
+        "grantor_name": "Stephen Douglas Foster and Karen Rene Foster",
+        "owner_type": "a married couple",
+        "number_of_grantor_signatures": 2,
+        "state": "Washington",
+        "county": "Spokane",
+        "total_acres": sum(p["acres"] for p in parcels),
+        "apn_list": [p["apn"] for p in parcels],
+        "parcels": parcels,
+        "number_of_parcels": count,
+    }
+
+
+def build_response(count):
+    with contextlib.redirect_stdout(io.StringIO()):
+        enriched = enrich(make_payload(count))
+        mapping = build_mapping(enriched)
+    return {"mapping": mapping, "enriched_json": enriched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parcels', type=int, nargs='+', default=[1, 10, 100, 500])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'parcels':>8} {'encoder':>8} {'shape':>6} {'encode ms':>10} {'raw KB':>9} {'gzip ms':>8} {'gzip KB':>8}")
+    for count in args.parcels:
+        response = build_response(count)
+        for shape in ('plain', 'dedup'):
+            for name, encode in sorted(JSON_ENCODERS.items()):
+                if shape == 'dedup':
+                    def run(encode=encode):
+                        return encode(dedupe_strings(response))
+                else:
+                    def run(encode=encode):
+                        return encode(response)
+                encode_t = timeit.timeit(run, number=args.repeat) / args.repeat
+                body = run()
+                gzip_t = timeit.timeit(lambda: gzip.compress(body, compresslevel=COMPRESS_LEVEL), number=args.repeat) / args.repeat
+                gz = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+                print(f"{count:>8} {name:>8} {shape:>6} {encode_t * 1e3:>10.2f} {len(body) / 1024:>9.1f}"
+                      f" {gzip_t * 1e3:>8.2f} {len(gz) / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark table traversal on a large merged-cell fixture.
+
+Compares the python-docx row.cells walk (which rebuilds the cell grid and
+returns a merged cell once per grid position) with the XML story walk used
+by the replacement code (every w:p once): paragraph visits and traversal
+time, then the full render time of the fixture in both replacement modes.
+
+Usage:
+    python bench/bench_table_traversal.py [--rows 120] [--cols 8] [--repeat 5]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+from docx.oxml.ns import qn  # noqa: E402
+
+from lease_pipeline import _iter_story_paragraphs, render  # noqa: E402
+
+
+def build_fixture(rows, cols):
+    """Signature/parcel style table: wide header merges, vertical merges and nested tables."""
+    doc = Document()
+    table = doc.add_table(rows=rows, cols=cols)
+    for r in range(0, rows, 6):
+        # Full-width title row
+        table.cell(r, 0).merge(table.cell(r, cols - 1))
+        table.cell(r, 0).text = f"[Parcels - Parcel {r // 6 + 1} APN] - [County] County, [State]"
+        # Label column merged over the next 4 rows, value cells merged in pairs
+        if r + 4 < rows:
+            table.cell(r + 1, 0).merge(table.cell(r + 4, 0))
+            table.cell(r + 1, 0).text = "[Grantor Name]"
+            for rr in range(r + 1, r + 5):
+                for c in range(1, cols - 1, 2):
+                    table.cell(rr, c).merge(table.cell(rr, c + 1))
+                    table.cell(rr, c).text = f"[Parcels - Parcel {rr} Acres] acres"
+        if r + 5 < rows:
+            nested = table.cell(r + 5, 0).merge(table.cell(r + 5, cols - 1)).add_table(rows=2, cols=2)
+            nested.cell(0, 0).merge(nested.cell(0, 1))
+            nested.cell(0, 0).text = "[Signature Block]"
+            nested.cell(1, 0).text = "[Owner Type]"
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def legacy_paragraphs(table):
+    """The former walk: every row, every grid cell, recursing into nested tables."""
+    for row in table.rows:
+        for cell in row.cells:
+            yield from cell.paragraphs
+            for nested in cell.tables:
+                yield from legacy_paragraphs(nested)
+
+
+def timed(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=120)
+    parser.add_argument('--cols', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fixture = build_fixture(args.rows, args.cols)
+    doc = Document(io.BytesIO(fixture))
+    table = doc.tables[0]
+    legacy_t, legacy_visits = timed(args.repeat, lambda: sum(1 for _ in legacy_paragraphs(table)))
+    xml_t, xml_visits = timed(args.repeat, lambda: sum(1 for _ in _iter_story_paragraphs(doc)) - len(doc.paragraphs))
+    unique = sum(1 for _ in table._tbl.iter(qn('w:p')))
+
+    mapping = [
+        {"key": "[Grantor Name]", "value": "Stephen Douglas Foster and Karen Rene Foster"},
+        {"key": "[Owner Type]", "value": "a married couple"},
+        {"key": "[County]", "value": "Spokane"},
+        {"key": "[State]", "value": "Washington"},
+        {"key": "[Signature Block]", "value": "By: ____________________\nName: [Grantor Name]"},
+    ] + [{"key": f"[Parcels - Parcel {i} APN]", "value": f"16174.{i}"} for i in range(1, args.rows + 1)] \
+      + [{"key": f"[Parcels - Parcel {i} Acres]", "value": str(i)} for i in range(1, args.rows + 1)]
+
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # the pipeline's debug output
+    try:
+        render_t = {}
+        for track_changes in (False, True):
+            render_t[track_changes], (ok, _, err) = timed(args.repeat, lambda: render(
+                io.BytesIO(fixture), mapping, track_changes=track_changes, exhibit_images=False))
+            if not ok:
+                raise RuntimeError(err)
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"fixture: {args.rows}x{args.cols} merged table with nested tables, {unique} unique paragraphs")
+    print(f"{'walk':<12} {'visits':>8} {'ms':>8}")
+    print(f"{'row.cells':<12} {legacy_visits:>8} {1000 * legacy_t:>8.1f}")
+    print(f"{'xml walk':<12} {xml_visits:>8} {1000 * xml_t:>8.1f}")
+    print(f"render (xml walk): normal {1000 * render_t[False]:.1f} ms, track changes {1000 * render_t[True]:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
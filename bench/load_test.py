@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Load test: replay production-shaped lease payloads against the app.
+
+Drives /api/process and /api/generate-docx with a mix of synthetic payloads
+(owner types, signature counts, 1-500 parcels, track changes on/off) from a
+thread pool and reports throughput, error rate and p50/p95/p99 latency per
+endpoint. Runs in-process through the Flask test client by default, or
+against a running server with --url.
+
+A fixture template is uploaded through /api/templates and referenced by
+template_id, so the same run works in both modes. Use --json-out to keep a
+baseline to compare later runs against.
+
+Usage:
+    python bench/load_test.py [--requests 200] [--concurrency 8] [--generate-ratio 0.5]
+    python bench/load_test.py --url http://localhost:5000 --concurrency 32 --json-out baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stress_concurrent_render import build_fixture_template  # noqa: E402
+
+OWNER_SIGNATURES = [
+    ("his/her sole property", 1),
+    ("a married couple", 2),
+    ("Sole Owner, married couple", 2),
+    ("Individual", 1),
+    ("Corporation", 1),
+    ("LLC", 2),
+    ("LP", 1),
+    ("Trust", 2),
+]
+# (weight, min parcels, max parcels): most leases are small, a few are utility scale
+PARCEL_BUCKETS = [(70, 1, 5), (25, 6, 50), (5, 51, 500)]
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+LEGAL_DESCRIPTION = ("17-26-41(SE1/4): THE NORTH 492.68 FT OF THE SOUTH 1645.84 FT OF THE SE1/4; "
+                     "EXCEPT THE WEST 1329.35 FT THEREOF. (PARCEL {n} ROS AFN 7390810)")
+
+
+def make_payload(rng, max_parcels, track_changes_ratio):
+    weights = [w for w, _, _ in PARCEL_BUCKETS]
+    _, low, high = rng.choices(PARCEL_BUCKETS, weights=weights)[0]
+    count = rng.randint(min(low, max_parcels), min(high, max_parcels))
+    owner_type, signatures = rng.choice(OWNER_SIGNATURES)
+    parcels = [
+        {
+            "apn": f"{rng.randint(10000, 99999)}.{i}",
+            "acres": round(rng.uniform(0.5, 160), 2),
+            "legal_description": LEGAL_DESCRIPTION.format(n=i),
+            "isPortion": rng.random() < 0.3,
+        }
+        for i in range(1, count + 1)
+    ]
+    return {
+        "document_name": f"Load Test Lease {rng.randint(1, 10 ** 6)}",
+        "grantor_name": "Stephen Douglas Foster and Karen Rene Foster",
+        "owner_type": owner_type,
+        "number_of_grantor_signatures": signatures,
+        "state": "Washington",
+        "county": rng.choice(["Spokane", "Lincoln", "Adams", "Whitman"]),
+        "track_changes": rng.random() < track_changes_ratio,
+        "parcels": parcels,
+    }
+
+
+class ClientTransport:
+    """In-process requests through the Flask test client (one client per thread)."""
+
+    def __init__(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+        self.app = app_module.app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def post(self, path, payload=None, data=None):
+        if data is not None:
+            response = self._client().post(path, data=data, content_type=DOCX_MIMETYPE)
+        else:
+            response = self._client().post(path, json=payload)
+        return response.status_code, response.data
+
+
+class HttpTransport:
+    """Requests against a running server."""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def post(self, path, payload=None, data=None):
+        body = data if data is not None else json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.base_url + path, data=body, method='POST')
+        request.add_header('Content-Type', 'application/json' if data is None else DOCX_MIMETYPE)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile: the smallest value with at least pct% of the samples at or below it."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, elapsed):
+    report = {"elapsed_s": round(elapsed, 3), "endpoints": {}}
+    for endpoint in sorted({s["endpoint"] for s in samples}):
+        rows = [s for s in samples if s["endpoint"] == endpoint]
+        latencies = sorted(s["latency"] for s in rows)
+        errors = [s for s in rows if s["status"] >= 400 or s["status"] == 0]
+        statuses = {}
+        for s in rows:
+            statuses[str(s["status"])] = statuses.get(str(s["status"]), 0) + 1
+        report["endpoints"][endpoint] = {
+            "requests": len(rows),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(rows), 4),
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+            "p50_ms": round(1000 * percentile(latencies, 50), 2),
+            "p95_ms": round(1000 * percentile(latencies, 95), 2),
+            "p99_ms": round(1000 * percentile(latencies, 99), 2),
+            "statuses": statuses,
+        }
+    report["total_requests"] = len(samples)
+    report["throughput_rps"] = round(len(samples) / elapsed, 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help="Base URL of a running server (default: in-process test client)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--generate-ratio', type=float, default=0.5, help="Share of requests sent to /api/generate-docx")
+    parser.add_argument('--track-changes-ratio', type=float, default=0.2)
+    parser.add_argument('--max-parcels', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json-out', help="Write the report as JSON (baseline file)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = []
+    for _ in range(args.requests):
+        endpoint = '/api/generate-docx' if rng.random() < args.generate_ratio else '/api/process'
+        jobs.append((endpoint, make_payload(rng, args.max_parcels, args.track_changes_ratio)))
+
+    real_stdout = sys.stdout
+    if not args.url:
+        sys.stdout = open(os.devnull, 'w')  # the pipeline's debug output
+    try:
+        transport = HttpTransport(args.url, args.timeout) if args.url else ClientTransport()
+        status, body = transport.post('/api/templates?name=load_test.docx', data=build_fixture_template())
+        if status != 201:
+            raise SystemExit(f"Template upload failed ({status}): {body[:200]!r}")
+        template_id = json.loads(body)["id"]
+
+        def run(job):
+            endpoint, payload = job
+            if endpoint == '/api/generate-docx':
+                payload = dict(payload, template_id=template_id)
+            start = time.perf_counter()
+            try:
+                status, _ = transport.post(endpoint, payload)
+            except Exception:
+                status = 0
+            return {"endpoint": endpoint, "status": status, "latency": time.perf_counter() - start,
+                    "parcels": len(payload["parcels"])}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            samples = list(pool.map(run, jobs))
+        elapsed = time.perf_counter() - start
+    finally:
+        if sys.stdout is not real_stdout:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+
+    report = summarize(samples, elapsed)
+    report["config"] = {k: v for k, v in vars(args).items() if k != 'json_out'}
+    print(f"{report['total_requests']} requests, concurrency {args.concurrency}, "
+          f"{elapsed:.2f}s, {report['throughput_rps']} req/s ({'server ' + args.url if args.url else 'test client'})")
+    print(f"{'endpoint':<20} {'n':>5} {'err%':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"{endpoint:<20} {stats['requests']:>5} {100 * stats['error_rate']:>6.1f} {stats['throughput_rps']:>7.2f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(s["errors"] for s in report["endpoints"].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
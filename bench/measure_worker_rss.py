@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Measure per-worker memory with private template copies vs the mapped store.
+
+Starts N worker processes in two modes and reports each worker's RSS, PSS
+(proportional set size: shared pages divided among the processes mapping
+them) and private memory, read from /proc/self/smaps_rollup (Linux only):
+
+- private: every worker registers each template from its own copy of the
+  DOCX bytes (what load_registry() does with the plain registry)
+- mmap:    every worker maps the shared template store and attaches it
+  (attach_store)
+
+In both modes each worker then takes a working copy of every template
+(get_working_copy), so the parsed and cloned trees are included, as in a
+worker that has rendered each template once.
+
+Synthetic templates embed an incompressible image so the raw bytes dominate.
+
+Usage:
+    python bench/measure_worker_rss.py [--workers 4] [--templates 8] [--image-px 1000]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def memory_stats():
+    stats = {}
+    with open('/proc/self/smaps_rollup', 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[1].isdigit():
+                stats[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        "rss_kb": stats.get("Rss", 0),
+        "pss_kb": stats.get("Pss", 0),
+        "private_kb": stats.get("Private_Clean", 0) + stats.get("Private_Dirty", 0),
+    }
+
+
+def worker(mode, paths, store_path, ready, results, release):
+    sys.path.insert(0, ROOT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import template_registry
+        from template_store import open_store
+
+        if mode == 'private':
+            template_ids = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    template_ids.append(template_registry.register_template(f.read(), persist=False)["id"])
+        else:
+            store = open_store(store_path)
+            template_registry.attach_store(store)
+            template_ids = list(store["index"])
+        # Measure what a rendering worker holds: every template parsed and cloned
+        held = [template_registry.get_working_copy(template_id) for template_id in template_ids]
+    ready.wait()  # all workers loaded, so shared pages are counted once
+    results.put((mode, os.getpid(), len(held), memory_stats()))
+    release.wait()
+
+
+def build_templates(directory, count, image_px):
+    from docx import Document
+    from docx.shared import Inches
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        image = Image.frombytes('RGB', (image_px, image_px), os.urandom(image_px * image_px * 3))
+        png = io.BytesIO()
+        image.save(png, format='PNG')
+        png.seek(0)
+        doc = Document()
+        doc.add_paragraph(f"Template {i}: [Grantor Name] [County] [State]")
+        doc.add_picture(png, width=Inches(4))
+        path = os.path.join(directory, f"template_{i}.docx")
+        doc.save(path)
+        paths.append(path)
+    return paths
+
+
+def run_mode(mode, workers, paths, store_path):
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Barrier(workers)
+    release = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, paths, store_path, ready, results, release)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    rows = [results.get() for _ in procs]
+    release.set()
+    for proc in procs:
+        proc.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--templates', type=int, default=8)
+    parser.add_argument('--image-px', type=int, default=1000)
+    args = parser.parse_args()
+
+    from template_store import build_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_templates(tmp, args.templates, args.image_px)
+        total_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+        store_path = os.path.join(tmp, 'templates.store')
+        templates = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                templates.append({"data": f.read(), "name": os.path.basename(path)})
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_store(store_path, templates)
+        del templates
+
+        print(f"{args.templates} templates, {total_mb:.1f} MB of DOCX bytes, {args.workers} workers")
+        print(f"{'mode':>8} {'pid':>8} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}")
+        for mode in ('private', 'mmap'):
+            rows = run_mode(mode, args.workers, paths, store_path)
+            for _, pid, _, stats in rows:
+                print(f"{mode:>8} {pid:>8} {stats['rss_kb'] / 1024:>8.1f} {stats['pss_kb'] / 1024:>8.1f} {stats['private_kb'] / 1024:>11.1f}")
+            pss = sum(stats['pss_kb'] for *_, stats in rows) / 1024
+            print(f"{mode:>8} {'total':>8} {'':>8} {pss:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
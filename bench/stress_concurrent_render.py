@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Stress test: many threads rendering from one cached template.
+
+Builds a fixture template (body, merged table, header/footer), registers it
+once, renders every payload serially, then renders the same payloads many
+times from a thread pool and checks that every concurrent output is
+identical, part by part, to the serial one.
+
+Usage:
+    python bench/stress_concurrent_render.py [--threads 16] [--payloads 8] [--rounds 25]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+import template_registry  # noqa: E402
+from lease_pipeline import build_mapping, enrich, render  # noqa: E402
+
+
+def build_fixture_template():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "[Document Name] - [County] County"
+    doc.sections[0].footer.paragraphs[0].text = "Grantor: [Grantor Name]"
+    doc.add_paragraph("This Easement Agreement is made by [Grantor Name], [Owner Type].")
+    p = doc.add_paragraph("Split placeholder: ")
+    p.add_run("[Grantor").bold = True
+    p.add_run(" Name] in [State].")
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2))
+    table.cell(0, 0).text = "[Signature Block]"
+    for i in range(1, 3):
+        table.cell(i, 0).text = f"[Parcels - Parcel {i} APN]"
+        table.cell(i, 1).text = f"[Parcels - Parcel {i} Acres]"
+        table.cell(i, 2).text = f"[Parcels - Parcel {i} Legal Description]"
+    doc.add_paragraph("[Exhibit A - Exhibit A String]")
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def make_payload(n):
+    return {
+        "document_name": f"Stress Lease {n}",
+        "grantor_name": f"Grantor {n}",
+        "owner_type": "a married couple" if n % 2 else "LLC",
+        "number_of_grantor_signatures": 1 + n % 2,
+        "state": "Washington",
+        "county": f"County {n}",
+        "parcels": [
+            {"apn": f"{n}.{i}", "acres": n + i, "legal_description": f"Lot {i} of tract {n}", "isPortion": bool(i % 2)}
+            for i in range(1, 3)
+        ],
+    }
+
+
+def parts_of(docx_bytes):
+    with zipfile.ZipFile(io.BytesIO(docx_bytes)) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def render_payload(template_id, mapping):
+    ok, docx_bytes, err = render(template_registry.get_working_copy(template_id), mapping)
+    if not ok:
+        raise RuntimeError(err)
+    return parts_of(docx_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--payloads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=25)
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    sys.stdout = io.StringIO()  # the pipeline's debug output
+    try:
+        template_id = template_registry.register_template(build_fixture_template(), name="stress.docx", persist=False)["id"]
+        mappings = [build_mapping(enrich(make_payload(n))) for n in range(args.payloads)]
+
+        start = time.perf_counter()
+        expected = [render_payload(template_id, mapping) for mapping in mappings]
+        serial_t = time.perf_counter() - start
+
+        jobs = [n for _ in range(args.rounds) for n in range(args.payloads)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(lambda n: (n, render_payload(template_id, mappings[n])), jobs))
+        concurrent_t = time.perf_counter() - start
+    finally:
+        sys.stdout = real_stdout
+
+    mismatches = [n for n, parts in results if parts != expected[n]]
+    print(f"serial: {args.payloads} renders in {serial_t:.2f}s")
+    print(f"concurrent: {len(jobs)} renders on {args.threads} threads in {concurrent_t:.2f}s")
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} outputs differ from serial rendering")
+        return 1
+    print("OK: all concurrent outputs identical to serial rendering")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
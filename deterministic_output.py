@@ -0,0 +1,114 @@
+"""
+Deterministic (byte-stable) DOCX output.
+
+In deterministic mode the same input always produces the same bytes:
+
+- the mapping's generation timestamp is the caller's generation_timestamp,
+  or DETERMINISTIC_TIMESTAMP when none is given
+- the core properties' created / modified dates are set to that timestamp
+- the ZIP container is rewritten with fixed entry dates, attributes and
+  compression, in the order python-docx wrote the parts
+
+so outputs can be cached, deduplicated and content-addressed by hash.
+"""
+import hashlib
+import zipfile
+from datetime import datetime, timezone
+from io import BytesIO
+
+DETERMINISTIC_TIMESTAMP = "2000-01-01T00:00:00+00:00"
+TIMESTAMP_PLACEHOLDER = "[Exhibit A - Generation Timestamp]"
+
+# Earliest date a ZIP entry can carry
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp; naive values are taken as UTC.
+
+    Args:
+        value (str): Timestamp such as "2024-05-01T12:00:00Z"
+
+    Returns:
+        datetime: Timezone-aware datetime
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 timestamp
+    """
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def pin_timestamp(json_data):
+    """
+    Give a payload a fixed generation timestamp if it has none.
+
+    Args:
+        json_data (dict): Lease payload
+
+    Returns:
+        dict: The payload, or a shallow copy with generation_timestamp set
+    """
+    if json_data.get("generation_timestamp"):
+        return json_data
+    return dict(json_data, generation_timestamp=DETERMINISTIC_TIMESTAMP)
+
+
+def pin_mapping_timestamp(mapping, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Set the generation timestamp of an already built mapping.
+
+    Args:
+        mapping (list): Mapping list from build_mapping()
+        timestamp (str): ISO 8601 timestamp
+
+    Returns:
+        list: Copy of the mapping with TIMESTAMP_PLACEHOLDER set to timestamp
+    """
+    return [dict(item, value=timestamp) if item.get("key") == TIMESTAMP_PLACEHOLDER else item for item in mapping]
+
+
+def stabilize_core_properties(doc, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Set the document's created / modified dates to a fixed timestamp.
+
+    Args:
+        doc: python-docx Document
+        timestamp (str): ISO 8601 timestamp
+    """
+    when = parse_timestamp(timestamp).astimezone(timezone.utc).replace(tzinfo=None)
+    props = doc.core_properties
+    props.created = when
+    props.modified = when
+
+
+def normalize_docx_zip(docx_bytes, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Rewrite a DOCX container with fixed ZIP metadata.
+
+    Args:
+        docx_bytes (bytes): DOCX file content
+        timestamp (str): ISO 8601 timestamp used for every entry
+
+    Returns:
+        bytes: Normalized DOCX file content
+    """
+    when = parse_timestamp(timestamp).astimezone(timezone.utc)
+    date_time = max(_ZIP_EPOCH, (when.year, when.month, when.day, when.hour, when.minute, when.second))
+    out = BytesIO()
+    with zipfile.ZipFile(BytesIO(docx_bytes)) as src, zipfile.ZipFile(out, 'w') as dst:
+        for item in src.infolist():
+            info = zipfile.ZipInfo(item.filename, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 0
+            info.external_attr = 0
+            dst.writestr(info, src.read(item.filename))
+    return out.getvalue()
+
+
+def content_hash(data):
+    """Return the SHA-256 hex digest of output bytes (for ETags / storage keys)."""
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,87 @@
+"""
+Cheap per-request working copies of parsed DOCX templates.
+
+A template is parsed once into a frozen python-docx Document that is never
+modified. Each render gets its own copy from clone_document(). The copy
+rebuilds the package the way python-docx's Unmarshaller does, but from the
+frozen parts instead of the zip:
+
+- XML parts get an lxml deep copy of their element (no XML parsing)
+- binary parts (images, fonts, ...) share their immutable blob
+- relationships are re-linked to the new parts
+
+copy.deepcopy() of a Document is not used because python-docx caches
+element proxies (e.g. the body) that deepcopy detaches from the copied tree.
+"""
+import copy
+from io import BytesIO
+
+from docx import Document
+from docx.opc.part import XmlPart
+
+from docx_normalize import normalize_document
+from parcel_loops import compile_parcel_loops, share_compiled_loops
+
+
+def load_frozen_document(docx_file, normalize=True):
+    """
+    Parse a DOCX template into a Document meant only to be cloned.
+
+    Args:
+        docx_file: File path, file-like object or bytes
+        normalize (bool): Merge fragmented runs and strip proofing/rsid
+            noise once here, so every clone starts with placeholders in
+            single runs (see docx_normalize)
+
+    Returns:
+        Document: Parsed document; treat it as read-only
+    """
+    if isinstance(docx_file, (bytes, bytearray)):
+        docx_file = BytesIO(docx_file)
+    doc = Document(docx_file)
+    if normalize:
+        normalize_document(doc)
+    # Parcel loop blocks are found and serialized here, once per template
+    compile_parcel_loops(doc)
+    return doc
+
+
+def clone_document(frozen):
+    """
+    Create an isolated, editable copy of a frozen Document.
+
+    Only reads the frozen document, so it can be called from many threads at
+    once on the same template.
+
+    Args:
+        frozen: Document returned by load_frozen_document()
+
+    Returns:
+        Document: Independent copy
+    """
+    src_package = frozen.part.package
+    package = type(src_package)()
+
+    src_parts = list(src_package.iter_parts())
+    parts = {}
+    for part in src_parts:
+        if isinstance(part, XmlPart):
+            parts[part.partname] = type(part)(part.partname, part.content_type, copy.deepcopy(part.element), package)
+        else:
+            parts[part.partname] = type(part).load(part.partname, part.content_type, part.blob, package)
+
+    for part in src_parts:
+        clone = parts[part.partname]
+        for rel in part.rels.values():
+            target = rel.target_ref if rel.is_external else parts[rel.target_part.partname]
+            clone.load_rel(rel.reltype, target, rel.rId, rel.is_external)
+    for rel in src_package.rels.values():
+        target = rel.target_ref if rel.is_external else parts[rel.target_part.partname]
+        package.load_rel(rel.reltype, target, rel.rId, rel.is_external)
+
+    for clone in parts.values():
+        clone.after_unmarshal()
+    package.after_unmarshal()
+    document = package.main_document_part.document
+    share_compiled_loops(frozen, document)
+    return document
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Template normalization: one placeholder, one run.
+
+Word fragments text into many w:r elements because of spell-check and
+editing-session marks, so "[Grantor Name]" often spans several runs. Run once
+per template (when it is parsed for the registry, or offline with this
+script), normalization:
+
+- removes proofing marks (w:proofErr) and rendering hints
+  (w:lastRenderedPageBreak)
+- strips revision-session ids (w:rsid* attributes)
+- merges adjacent text-only runs with identical formatting
+
+so placeholders end up inside a single run and replacement can substitute
+in place without touching formatting.
+
+Usage:
+    python docx_normalize.py template.docx normalized.docx
+"""
+import argparse
+import sys
+from io import BytesIO
+
+from docx import Document
+from docx.oxml.ns import qn
+from lxml import etree
+
+from docx_stories import iter_story_roots
+
+RSID_ATTRIBUTES = frozenset(qn(f'w:{name}') for name in (
+    'rsidR', 'rsidRPr', 'rsidRDefault', 'rsidP', 'rsidDel', 'rsidSect', 'rsidTr'))
+NOISE_TAGS = (qn('w:proofErr'), qn('w:lastRenderedPageBreak'))
+
+_R = qn('w:r')
+_T = qn('w:t')
+_RPR = qn('w:rPr')
+_XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+
+def _text_only(run):
+    """Return the run's w:t children if it holds nothing but formatting and text, else None."""
+    texts = []
+    for child in run:
+        if child.tag == _T:
+            texts.append(child)
+        elif child.tag != _RPR:
+            return None
+    return texts
+
+
+def _rpr_key(run):
+    rpr = run.find(_RPR)
+    return etree.tostring(rpr) if rpr is not None else b''
+
+
+def normalize_root(root):
+    """
+    Normalize one story part in place.
+
+    Args:
+        root: lxml root element of a story part
+
+    Returns:
+        dict: Counts of removed noise elements, stripped attributes and merged runs
+    """
+    stats = {"removed": 0, "attributes": 0, "merged": 0}
+
+    for element in list(root.iter(*NOISE_TAGS)):
+        element.getparent().remove(element)
+        stats["removed"] += 1
+
+    for element in root.iter():
+        attrib = element.attrib
+        for name in [name for name in attrib if name in RSID_ATTRIBUTES]:
+            del attrib[name]
+            stats["attributes"] += 1
+
+    for run in list(root.iter(_R)):
+        prev = run.getprevious()
+        if prev is None or prev.tag != _R:
+            continue
+        texts = _text_only(run)
+        prev_texts = _text_only(prev)
+        if not texts or not prev_texts or _rpr_key(run) != _rpr_key(prev):
+            continue
+        target = prev_texts[-1]
+        target.text = (target.text or '') + ''.join(t.text or '' for t in texts)
+        target.set(_XML_SPACE, 'preserve')
+        run.getparent().remove(run)
+        stats["merged"] += 1
+    return stats
+
+
+def normalize_document(doc):
+    """
+    Normalize every story part of a document in place.
+
+    Args:
+        doc: python-docx Document
+
+    Returns:
+        dict: Summed counts from normalize_root()
+    """
+    totals = {"removed": 0, "attributes": 0, "merged": 0}
+    for _, root in iter_story_roots(doc):
+        for key, count in normalize_root(root).items():
+            totals[key] += count
+    return totals
+
+
+def normalize_docx_bytes(data):
+    """
+    Normalize DOCX bytes.
+
+    Args:
+        data (bytes): DOCX file content
+
+    Returns:
+        tuple: (normalized bytes, stats dict)
+    """
+    doc = Document(BytesIO(data))
+    stats = normalize_document(doc)
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue(), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalize a DOCX template so each placeholder sits in one run.")
+    parser.add_argument('source')
+    parser.add_argument('destination')
+    args = parser.parse_args(argv)
+
+    with open(args.source, 'rb') as f:
+        data, stats = normalize_docx_bytes(f.read())
+    with open(args.destination, 'wb') as f:
+        f.write(data)
+    print(f"[INFO] Removed {stats['removed']} proofing marks, {stats['attributes']} rsid attributes, "
+          f"merged {stats['merged']} runs -> {args.destination}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
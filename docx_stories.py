@@ -0,0 +1,98 @@
+"""
+Story-part traversal for DOCX documents.
+
+A document's text lives in several XML parts ("stories"): the main document,
+headers, footers, footnotes, endnotes and comments. Text boxes (w:txbxContent)
+and tables are nested inside those parts. iter_story_roots() yields each
+distinct story part exactly once, however many sections link to it, so
+callers can visit every w:p of the document in a single pass.
+
+python-docx loads footnotes and endnotes as plain binary parts; their XML is
+parsed on the fly and written back to the part after the caller is done.
+"""
+import re
+from collections import namedtuple
+
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.part import XmlPart
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+# Minimal parent giving Paragraph/Run proxies access to their story part
+PartParent = namedtuple('PartParent', 'part')
+
+# Characters that are not allowed in XML 1.0 text
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+STORY_CONTENT_TYPES = frozenset((
+    CT.WML_DOCUMENT_MAIN,
+    CT.WML_HEADER,
+    CT.WML_FOOTER,
+    CT.WML_FOOTNOTES,
+    CT.WML_ENDNOTES,
+    CT.WML_COMMENTS,
+))
+
+
+def iter_story_parts(doc):
+    """
+    Yield each distinct story part of a document, main document first.
+
+    Args:
+        doc: python-docx Document
+
+    Yields:
+        Part: Story parts
+    """
+    main = doc.part
+    yield main
+    for part in main.package.iter_parts():
+        if part is not main and part.content_type in STORY_CONTENT_TYPES:
+            yield part
+
+
+def iter_story_roots(doc, writeback=True, partnames=None):
+    """
+    Yield (part, root element) for each distinct story part.
+
+    Args:
+        doc: python-docx Document
+        writeback (bool): Re-serialize binary story parts (footnotes,
+            endnotes) after the caller has processed their root; pass False
+            for read-only traversal
+        partnames: Only visit story parts with these part names (default: all)
+
+    Yields:
+        tuple: (part, lxml root element)
+    """
+    for part in iter_story_parts(doc):
+        if partnames is not None and part.partname not in partnames:
+            continue
+        if isinstance(part, XmlPart):
+            yield part, part.element
+            continue
+        root = parse_xml(part.blob)
+        yield part, root
+        if writeback:
+            part._blob = etree.tostring(root, encoding='UTF-8', xml_declaration=True, standalone=True)
+
+
+def iter_story_paragraph_elements(doc, writeback=True):
+    """
+    Yield (part, w:p element) for every paragraph in every story part:
+    body, tables (nested included), text boxes, headers, footers, notes
+    and comments. The paragraphs of a part are collected before the first
+    one is yielded, so callers may restructure them.
+
+    Args:
+        doc: python-docx Document
+        writeback (bool): See iter_story_roots()
+
+    Yields:
+        tuple: (part, w:p element)
+    """
+    p_tag = qn('w:p')
+    for part, root in iter_story_roots(doc, writeback):
+        for p in list(root.iter(p_tag)):
+            yield part, p
@@ -0,0 +1,232 @@
+"""
+Survey/parcel images for Exhibit A.
+
+Images live in LEASE_IMAGE_DIR (default: ./survey_images), named by APN,
+e.g. "16174.908.png". When a document is rendered, the [Image] placeholder
+in Exhibit A is replaced with the images of its parcels, in parcel order.
+
+Each source image is downscaled and re-encoded once per target size. The
+result is cached in memory and on disk (LEASE_IMAGE_CACHE_DIR), keyed by the
+source content hash and size, so repeated leases for the same parcels never
+decode the originals again and output documents stay small.
+"""
+import copy
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from docx.shared import Inches
+from docx.text.paragraph import Paragraph
+from PIL import Image
+
+from docx_stories import PartParent, iter_story_paragraph_elements
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.environ.get('LEASE_IMAGE_DIR', os.path.join(_ROOT, 'survey_images'))
+IMAGE_CACHE_DIR = os.environ.get('LEASE_IMAGE_CACHE_DIR', os.path.join(_ROOT, 'image_cache'))
+IMAGE_MAX_PX = int(os.environ.get('LEASE_IMAGE_MAX_PX', '1600'))
+IMAGE_JPEG_QUALITY = 85
+IMAGE_WIDTH = Inches(6)
+IMAGE_PLACEHOLDER = "[Image]"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp')
+
+_MEMORY_CACHE_SIZE = 64
+_SOURCE_HASH_CACHE_SIZE = 1024
+_APN_KEY = re.compile(r'^\[Exhibit A - Parcel (\d+) APN\]$')
+
+_lock = threading.Lock()
+_memory_cache = OrderedDict()
+_source_hashes = OrderedDict()
+_directory_index = {"mtime": None, "files": {}}
+
+
+def _safe_name(apn):
+    return re.sub(r'[^\w.\-]+', '_', str(apn)).strip('.') or '_'
+
+
+def find_image(apn, image_dir=None):
+    """
+    Find the survey image for an APN.
+
+    The directory listing is indexed once and re-read only when the directory
+    changes.
+
+    Args:
+        apn: Parcel APN
+        image_dir (str): Image directory (default IMAGE_DIR)
+
+    Returns:
+        str or None: Image path
+    """
+    image_dir = image_dir or IMAGE_DIR
+    try:
+        mtime = os.stat(image_dir).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        if _directory_index["mtime"] != (image_dir, mtime):
+            files = {}
+            for filename in os.listdir(image_dir):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() in IMAGE_EXTENSIONS:
+                    files.setdefault(stem, os.path.join(image_dir, filename))
+            _directory_index["mtime"] = (image_dir, mtime)
+            _directory_index["files"] = files
+        return _directory_index["files"].get(_safe_name(apn))
+
+
+def _source_hash(path):
+    """Content hash of a source image, re-computed only when the file changes."""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        digest = _source_hashes.get(key)
+        if digest is not None:
+            _source_hashes.move_to_end(key)
+            return digest
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _lock:
+        _source_hashes[key] = digest
+        while len(_source_hashes) > _SOURCE_HASH_CACHE_SIZE:
+            _source_hashes.popitem(last=False)
+    return digest
+
+
+def _encode(path, max_px):
+    with Image.open(path) as image:
+        image.draft('RGB', (max_px, max_px))  # lets JPEG decode at reduced size
+        image.thumbnail((max_px, max_px))
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        out = BytesIO()
+        if has_alpha:
+            image.save(out, format='PNG', optimize=True)
+        else:
+            image.convert('RGB').save(out, format='JPEG', quality=IMAGE_JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def prepare_image(path, max_px=IMAGE_MAX_PX):
+    """
+    Get the downscaled, re-encoded bytes of a source image.
+
+    Args:
+        path (str): Source image path
+        max_px (int): Maximum width/height in pixels
+
+    Returns:
+        bytes: Encoded image (JPEG, or PNG for images with transparency)
+    """
+    key = f"{_source_hash(path)}_{max_px}"
+    with _lock:
+        data = _memory_cache.get(key)
+        if data is not None:
+            _memory_cache.move_to_end(key)
+            return data
+
+    cache_path = os.path.join(IMAGE_CACHE_DIR, f"{key}.img")
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    else:
+        data = _encode(path, max_px)
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+        print(f"[DEBUG] Cached survey image {os.path.basename(path)} -> {len(data)} bytes")
+
+    with _lock:
+        _memory_cache[key] = data
+        while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    return data
+
+
+def apns_from_mapping(mapping):
+    """
+    Get parcel APNs in parcel order from a placeholder mapping.
+
+    Args:
+        mapping (dict): Placeholder -> value mapping
+
+    Returns:
+        list: APNs
+    """
+    numbered = []
+    for key, value in mapping.items():
+        match = _APN_KEY.match(key)
+        if match:
+            numbered.append((int(match.group(1)), value))
+    return [apn for _, apn in sorted(numbered)]
+
+
+def insert_exhibit_images(doc, apns, width=IMAGE_WIDTH):
+    """
+    Replace [Image] placeholders with survey images.
+
+    Every story part that can hold pictures is searched: body, tables, text
+    boxes, headers, footers and comments. Placeholders are left untouched
+    when none of the parcels has an image, and in footnotes and endnotes,
+    which python-docx loads as binary parts.
+
+    Args:
+        doc: python-docx Document
+        apns (list): Parcel APNs in exhibit order
+        width: Picture width (docx Length)
+
+    Returns:
+        int: Number of pictures inserted
+    """
+    images = []
+    for apn in apns:
+        path = find_image(apn)
+        if path:
+            images.append(prepare_image(path))
+    if not images:
+        return 0
+
+    inserted = 0
+    parents = {}
+    for part, p in iter_story_paragraph_elements(doc, writeback=False):
+        # python-docx adds pictures only to XML story parts (not footnotes/endnotes)
+        if not hasattr(part, 'new_pic_inline'):
+            continue
+        parent = parents.get(id(part))
+        if parent is None:
+            parent = parents[id(part)] = PartParent(part)
+        paragraph = Paragraph(p, parent)
+        if IMAGE_PLACEHOLDER not in paragraph.text:
+            continue
+        for run in list(paragraph.runs):
+            if IMAGE_PLACEHOLDER not in run.text:
+                continue
+            # Every placeholder in the run gets the pictures; the text
+            # between placeholders stays in runs with the original formatting
+            before, *afters = run.text.split(IMAGE_PLACEHOLDER)
+            run.text = before
+            anchor = run._r
+            for after in afters:
+                for i, data in enumerate(images):
+                    picture_run = paragraph.add_run()
+                    if i:
+                        picture_run.add_break()
+                    picture_run.add_picture(BytesIO(data), width=width)
+                    anchor.addnext(picture_run._r)
+                    anchor = picture_run._r
+                    inserted += 1
+                if after:
+                    tail = paragraph.add_run(after)
+                    if run._r.rPr is not None:
+                        tail._r.insert(0, copy.deepcopy(run._r.rPr))
+                    anchor.addnext(tail._r)
+                    anchor = tail._r
+    print(f"[DEBUG] Inserted {inserted} survey image(s) into Exhibit A")
+    return inserted
@@ -0,0 +1,155 @@
+"""
+Structured Exhibit A output.
+
+Instead of writing the whole exhibit into one run with embedded line breaks,
+the paragraph holding the exhibit placeholder is replaced by one Word
+paragraph per exhibit line. The paragraphs are generated as a single XML
+fragment (formatting copied from the placeholder paragraph and serialized
+once) and parsed in one call, so time and output size grow linearly with
+the number of parcels.
+"""
+import os
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+from docx_stories import INVALID_XML_CHARS, iter_story_roots
+
+EXHIBIT_PLACEHOLDER = "[Exhibit A - Exhibit A String]"
+EXHIBIT_FORMATS = ('auto', 'text', 'paragraphs')
+
+# In "auto" mode, exhibits with at least this many parcels are written as paragraphs
+EXHIBIT_PARAGRAPH_THRESHOLD = int(os.environ.get('LEASE_EXHIBIT_PARAGRAPH_THRESHOLD', '50'))
+
+
+def use_paragraphs(exhibit_format, parcel_count):
+    """
+    Decide whether the exhibit is written as structured paragraphs.
+
+    Args:
+        exhibit_format (str): 'auto', 'text' or 'paragraphs'
+        parcel_count (int): Number of exhibit parcels
+
+    Returns:
+        bool: True for structured paragraphs
+    """
+    if exhibit_format == 'paragraphs':
+        return True
+    if exhibit_format == 'auto':
+        return parcel_count >= EXHIBIT_PARAGRAPH_THRESHOLD
+    return False
+
+
+def _paragraph_text(p):
+    return ''.join(t.text or '' for t in p.iter(qn('w:t')))
+
+
+def _serialize(element):
+    return etree.tostring(element, encoding='unicode') if element is not None else ''
+
+
+def _build_fragment(lines, ppr_xml, rpr_xml):
+    """Build one w:p per line; a line is a list of text strings and (serialized XML,) tuples."""
+    parts = []
+    append = parts.append
+    for line in lines:
+        append(f'<w:p>{ppr_xml}')
+        for item in line:
+            if type(item) is tuple:
+                append(item[0])
+            elif item:
+                text = escape(INVALID_XML_CHARS.sub('', item))
+                append(f'<w:r>{rpr_xml}<w:t xml:space="preserve">{text}</w:t></w:r>')
+        append('</w:p>')
+    return parse_xml(f'<w:body {nsdecls("w")}>{"".join(parts)}</w:body>')
+
+
+def _anchor_lines(anchor, text, placeholder):
+    """
+    Split the anchor paragraph's content into exhibit lines.
+
+    Text runs are joined and every occurrence of the placeholder is replaced;
+    runs without text (drawings, fields, breaks) and other inline elements
+    (bookmarks, hyperlinks) are kept in place as serialized XML.
+    """
+    r_tag, t_tag = qn('w:r'), qn('w:t')
+    segments = []
+    for child in anchor:
+        if child.tag == qn('w:pPr'):
+            continue
+        is_text = child.find(t_tag) is not None if child.tag == r_tag else placeholder in _paragraph_text(child)
+        if not is_text:
+            segments.append((_serialize(child),))
+        elif segments and type(segments[-1]) is str:
+            segments[-1] += _paragraph_text(child)
+        else:
+            segments.append(_paragraph_text(child))
+
+    lines = [[]]
+    for segment in segments:
+        if type(segment) is tuple:
+            lines[-1].append(segment)
+            continue
+        first, *rest = segment.replace(placeholder, text).split('\n')
+        lines[-1].append(first)
+        lines.extend([line] for line in rest)
+    return lines
+
+
+def insert_exhibit_paragraphs(doc, text, placeholder=EXHIBIT_PLACEHOLDER):
+    """
+    Replace each paragraph containing the exhibit placeholder with one
+    paragraph per exhibit line.
+
+    Every story part is searched (body, tables, text boxes, headers, footers,
+    notes, comments), so no occurrence is left as literal text, including
+    repeated occurrences in one paragraph. Text around the placeholder stays
+    on the first / last line; drawings, fields and breaks in the paragraph
+    are kept where they were. Paragraph and run
+    formatting are taken from the placeholder paragraph; a section break on
+    it is kept on the last generated paragraph only.
+
+    Args:
+        doc: python-docx Document
+        text (str): Exhibit A text (lines separated by newlines)
+        placeholder (str): Placeholder to replace
+
+    Returns:
+        int: Number of paragraphs generated
+    """
+    generated = 0
+    for _, root in iter_story_roots(doc):
+        # Binary parts are written back when the loop resumes, so each root
+        # is finished before moving on
+        anchors = [p for p in root.iter(qn('w:p')) if placeholder in _paragraph_text(p)]
+        for anchor in anchors:
+            generated += _expand_anchor(anchor, text, placeholder)
+    print(f"[DEBUG] Wrote Exhibit A as {generated} paragraphs")
+    return generated
+
+
+def _expand_anchor(anchor, text, placeholder):
+    lines = _anchor_lines(anchor, text, placeholder)
+
+    ppr = anchor.find(qn('w:pPr'))
+    rpr = next((r.find(qn('w:rPr')) for r in anchor.iter(qn('w:r')) if r.find(qn('w:t')) is not None), None)
+    last_ppr_xml = _serialize(ppr)
+    ppr_xml = last_ppr_xml
+    if ppr is not None and ppr.find(qn('w:sectPr')) is not None:
+        ppr_copy = etree.fromstring(last_ppr_xml)
+        ppr_copy.remove(ppr_copy.find(qn('w:sectPr')))
+        ppr_xml = _serialize(ppr_copy)
+
+    fragment = _build_fragment(lines, ppr_xml, _serialize(rpr))
+    paragraphs = list(fragment)
+    if ppr_xml != last_ppr_xml:
+        last = paragraphs[-1]
+        if last.pPr is not None:
+            last.remove(last.pPr)
+        last.insert(0, etree.fromstring(last_ppr_xml))
+    for paragraph in paragraphs:
+        anchor.addprevious(paragraph)
+    anchor.getparent().remove(anchor)
+    return len(paragraphs)
@@ -0,0 +1,190 @@
+"""
+Exhibit A rendering engine.
+
+Compiles the text blocks in templates/exhibit/*.txt once into render functions
+and uses them to build the Exhibit A string. Each parcel picks its block by
+templateType / isPortion.
+
+A compiled template is generated Python code: one function per template that
+reads only the parcel fields its text uses and builds the block with a single
+f-string, so rendering does no per-parcel dict building, lookups by slot name
+or string scanning.
+"""
+import os
+import re
+
+EXHIBIT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'exhibit')
+
+# Template name -> file in templates/exhibit
+EXHIBIT_TEMPLATE_FILES = {
+    "general": "general_description.txt",
+    "normal": "normal_portion.txt",
+    "portion": "portion_description.txt",
+    "custom_1": "custom_template_1.txt",
+    "custom_2": "custom_template_2.txt",
+}
+
+# templateType values accepted on a parcel -> template name
+TEMPLATE_TYPE_ALIASES = {
+    "custom_1": "custom_1",
+    "custom_template_1": "custom_1",
+    "custom_2": "custom_2",
+    "custom_template_2": "custom_2",
+}
+
+# Placeholder slots that are filled at render time -> render value name.
+# Any other bracketed text (e.g. "[Image]") is kept as literal text.
+EXHIBIT_SLOTS = {
+    "[i]": "i",
+    "[Acres]": "acres",
+    "[Legal Description]": "legal_description",
+    "[APN]": "apn",
+    "[County]": "county",
+    "[State]": "state",
+}
+
+# Render value name -> (parcel field, default); "county" and "state" are document level
+_PARCEL_FIELDS = {
+    "i": ("parcelNumber", "Unknown"),
+    "acres": ("acres", 0),
+    "legal_description": ("legal_description", "No legal description provided"),
+    "apn": ("apn", "Unknown"),
+}
+
+_SLOT_PATTERN = re.compile('|'.join(re.escape(slot) for slot in EXHIBIT_SLOTS))
+
+_compiled_templates = {}
+
+
+def compile_exhibit_template(text):
+    """
+    Compile exhibit template text into a render function.
+
+    The text is turned into the source of a function returning one f-string
+    (literal parts are embedded with repr(), so template text is never
+    evaluated), which is compiled once.
+
+    Args:
+        text (str): Template text containing [i], [Acres], ... slots
+
+    Returns:
+        callable: render(parcel, county, state) -> str
+    """
+    text = text.strip()
+    pieces = []
+    used = []
+    pos = 0
+    for match in _SLOT_PATTERN.finditer(text):
+        if match.start() > pos:
+            pieces.append(repr(text[pos:match.start()]))
+        name = EXHIBIT_SLOTS[match.group(0)]
+        if name not in used:
+            used.append(name)
+        pieces.append(f"f'{{{name}}}'")
+        pos = match.end()
+    if pos < len(text):
+        pieces.append(repr(text[pos:]))
+
+    lines = ["def render(parcel, county, state):"]
+    for name in used:
+        if name in _PARCEL_FIELDS:
+            field, default = _PARCEL_FIELDS[name]
+            lines.append(f"    {name} = parcel.get({field!r}, {default!r})")
+    lines.append(f"    return {' '.join(pieces) or repr('')}")
+    namespace = {}
+    exec(compile("\n".join(lines), "<exhibit template>", "exec"), namespace)
+    return namespace["render"]
+
+
+def get_exhibit_template(name):
+    """
+    Get a compiled exhibit template by name, compiling it on first use.
+
+    Args:
+        name (str): Template name (a key of EXHIBIT_TEMPLATE_FILES)
+
+    Returns:
+        callable: Compiled render function
+    """
+    render = _compiled_templates.get(name)
+    if render is None:
+        path = os.path.join(EXHIBIT_TEMPLATE_DIR, EXHIBIT_TEMPLATE_FILES[name])
+        with open(path, 'r', encoding='utf-8') as f:
+            render = compile_exhibit_template(f.read())
+        _compiled_templates[name] = render
+    return render
+
+
+def load_exhibit_templates():
+    """
+    Compile every exhibit template up front.
+
+    Returns:
+        dict: Template name -> compiled render function
+    """
+    if len(_compiled_templates) != len(EXHIBIT_TEMPLATE_FILES):
+        for name in EXHIBIT_TEMPLATE_FILES:
+            get_exhibit_template(name)
+    return _compiled_templates
+
+
+def select_exhibit_template(parcel):
+    """
+    Pick the template name for a parcel from its templateType and isPortion.
+
+    Args:
+        parcel (dict): Parcel object
+
+    Returns:
+        str: Template name
+    """
+    name = TEMPLATE_TYPE_ALIASES.get(parcel.get("templateType"))
+    if name:
+        return name
+    return "portion" if parcel.get("isPortion", False) else "normal"
+
+
+def render_exhibit_blocks(parcels, context=None):
+    """
+    Render the Exhibit A header and one text block per parcel.
+
+    Args:
+        parcels (list): Parcel objects with parcelNumber, apn, acres,
+            legal_description, isPortion and templateType
+        context (dict): Document level values ("county", "state")
+
+    Returns:
+        list: Rendered blocks, header first
+    """
+    context = context or {}
+    county = context.get("county", "")
+    state = context.get("state", "")
+    templates = load_exhibit_templates()
+    aliases = TEMPLATE_TYPE_ALIASES
+    normal = templates["normal"]
+    portion = templates["portion"]
+
+    blocks = [templates["general"]({}, county, state)]
+    append = blocks.append
+    for parcel in parcels:
+        if not isinstance(parcel, dict):
+            continue
+        # select_exhibit_template(), inlined
+        name = aliases.get(parcel.get("templateType"))
+        render = templates[name] if name else portion if parcel.get("isPortion", False) else normal
+        append(render(parcel, county, state))
+    return blocks
+
+
+def render_exhibit(parcels, context=None):
+    """
+    Build the complete Exhibit A string with a single join.
+
+    Args:
+        parcels (list): Parcel objects
+        context (dict): Document level values ("county", "state")
+
+    Returns:
+        str: The complete Exhibit A text string
+    """
+    return "\n\n".join(render_exhibit_blocks(parcels, context))
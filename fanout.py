@@ -0,0 +1,99 @@
+"""
+Multi-template fan-out: one payload, many documents.
+
+The mapping is computed once by the caller and rendered into every template
+(e.g. the easement agreement, a memorandum of easement and a recording
+page). Templates are rendered on a small thread pool (LEASE_FANOUT_WORKERS,
+default 4); each render works on its own document, so they share nothing but
+the read-only mapping.
+"""
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from lease_pipeline import render
+
+FANOUT_WORKERS = int(os.environ.get('LEASE_FANOUT_WORKERS', '4'))
+
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def render_many(templates, mapping, **render_options):
+    """
+    Render one mapping into several templates.
+
+    Args:
+        templates (list): Anything render() accepts (paths, file objects,
+            Document working copies)
+        mapping (list): Mapping list from build_mapping()
+        **render_options: Keyword arguments passed to render()
+
+    Returns:
+        list: (success, docx_bytes, error_message) per template, in order
+    """
+    if len(templates) == 1 or FANOUT_WORKERS <= 1:
+        return [render(template, mapping, **render_options) for template in templates]
+    with ThreadPoolExecutor(max_workers=min(FANOUT_WORKERS, len(templates))) as pool:
+        return list(pool.map(lambda template: render(template, mapping, **render_options), templates))
+
+
+def safe_filename(name, default):
+    """
+    Reduce a client-supplied name to a plain file name.
+
+    Path separators and any other characters outside letters, digits, '.',
+    '-', '_' and space become '_', so the name can neither leave the output
+    directory nor create directories inside a ZIP archive.
+
+    Args:
+        name: Requested name
+        default (str): Name used when nothing usable is left
+
+    Returns:
+        str: Sanitized file name
+    """
+    return re.sub(r'[^\w.\- ]+', '_', str(name)).strip() or default
+
+
+def unique_names(names):
+    """
+    Make file names unique by appending -2, -3, ... to repeats.
+
+    Args:
+        names (list): File names
+
+    Returns:
+        list: Unique file names, in order
+    """
+    seen = set()
+    unique = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        candidate, n = name, 1
+        while candidate in seen:
+            n += 1
+            candidate = f"{stem}-{n}{ext}"
+        seen.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+def zip_documents(documents):
+    """
+    Bundle rendered documents into one ZIP archive.
+
+    Entries carry a fixed date, so identical documents give identical archives.
+
+    Args:
+        documents (list): (file name, bytes) pairs
+
+    Returns:
+        bytes: ZIP archive
+    """
+    out = BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, data in documents:
+            z.writestr(zipfile.ZipInfo(name, date_time=_ZIP_DATE), data, zipfile.ZIP_DEFLATED)
+    return out.getvalue()
@@ -0,0 +1,170 @@
+"""
+JSON response helpers for the API.
+
+- Pluggable encoder: orjson when installed, the standard library otherwise.
+  Override with the LEASE_JSON_ENCODER environment variable or set_json_encoder().
+- gzip/deflate compression when the client sends Accept-Encoding.
+- Optional string de-duplication so a long string (legal descriptions, the
+  Exhibit A string) is sent once and referenced elsewhere.
+"""
+import gzip
+import json
+import os
+import zlib
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+# Strings at least this long are candidates for de-duplication
+DEDUPE_MIN_LENGTH = 64
+STRING_TABLE_KEY = "$strings"
+STRING_REF_KEY = "$ref"
+
+
+def _encode_stdlib(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _encode_orjson(obj):
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # orjson.JSONEncodeError subclasses TypeError; it rejects values the
+        # standard library accepts (integers wider than 64 bits, non-str keys)
+        return _encode_stdlib(obj)
+
+
+JSON_ENCODERS = {"json": _encode_stdlib}
+if orjson is not None:
+    JSON_ENCODERS["orjson"] = _encode_orjson
+
+_encoder_name = os.environ.get('LEASE_JSON_ENCODER') or ("orjson" if orjson is not None else "json")
+
+
+def register_json_encoder(name, encode):
+    """
+    Register a JSON encoder.
+
+    Args:
+        name (str): Encoder name
+        encode (callable): encode(obj) -> bytes
+    """
+    JSON_ENCODERS[name] = encode
+
+
+def set_json_encoder(name):
+    """
+    Select the encoder used by json_response().
+
+    Args:
+        name (str): A registered encoder name
+    """
+    global _encoder_name
+    if name not in JSON_ENCODERS:
+        raise ValueError(f"Unknown JSON encoder '{name}'. Available: {', '.join(sorted(JSON_ENCODERS))}")
+    _encoder_name = name
+
+
+def encode_json(obj):
+    """
+    Encode an object to UTF-8 JSON bytes with the selected encoder.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        bytes: Encoded JSON
+    """
+    encode = JSON_ENCODERS.get(_encoder_name, _encode_stdlib)
+    return encode(obj)
+
+
+def dedupe_strings(payload, min_length=DEDUPE_MIN_LENGTH):
+    """
+    Replace long strings with references into a string table.
+
+    Every distinct string of at least min_length characters is stored once
+    under "$strings" and each occurrence becomes {"$ref": index}. This is a
+    single pass over the payload.
+
+    Args:
+        payload (dict): JSON payload
+        min_length (int): Minimum length of strings to de-duplicate
+
+    Returns:
+        dict: Shaped payload (the input is not modified)
+    """
+    table = []
+    index = {}
+
+    def shape(value):
+        kind = type(value)
+        if kind is str:
+            if len(value) < min_length:
+                return value
+            ref = index.get(value)
+            if ref is None:
+                ref = index[value] = len(table)
+                table.append(value)
+            return {STRING_REF_KEY: ref}
+        if kind is dict:
+            return {key: shape(item) for key, item in value.items()}
+        if kind is list:
+            return [shape(item) for item in value]
+        return value
+
+    shaped = shape(payload)
+    if table:
+        shaped[STRING_TABLE_KEY] = table
+    return shaped
+
+
+def compress_body(body, accept_encoding):
+    """
+    Compress a response body with the best encoding the client accepts.
+
+    Args:
+        body (bytes): Uncompressed body
+        accept_encoding: werkzeug Accept object for the Accept-Encoding header
+
+    Returns:
+        tuple: (body bytes, content encoding or None)
+    """
+    if len(body) < COMPRESS_MIN_SIZE or accept_encoding is None:
+        return body, None
+    encoding = accept_encoding.best_match(['gzip', 'deflate'])
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0), 'gzip'
+    if encoding == 'deflate':
+        return zlib.compress(body, COMPRESS_LEVEL), 'deflate'
+    return body, None
+
+
+def json_response(payload, status=200, dedupe=False):
+    """
+    Build a Flask JSON response using the fast encoder and compression.
+
+    Args:
+        payload: JSON-serializable object
+        status (int): HTTP status code
+        dedupe (bool): If True, apply dedupe_strings() to the payload
+
+    Returns:
+        flask.Response: The response
+    """
+    if dedupe:
+        payload = dedupe_strings(payload)
+    body, encoding = compress_body(encode_json(payload), request.accept_encodings)
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,911 @@
+"""
+Lease document pipeline.
+
+Shared core used by both converter.py and lease_automation.py (and through
+them app.py). The stable public API is:
+
+    enrich(json_data)           -> enriched JSON with signature blocks and Exhibit A
+    build_mapping(enriched)     -> list of {"key", "value"} placeholder pairs
+    render(template, mapping)   -> (success, docx_bytes, error_message)
+
+Caching and parallel execution should be layered on these three functions.
+"""
+import os
+import json
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from docx import Document 
+from docx.document import Document as DocumentObject
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from io import BytesIO
+import traceback
+from exhibit_templates import render_exhibit
+from exhibit_images import apns_from_mapping, insert_exhibit_images
+from exhibit_paragraphs import EXHIBIT_PLACEHOLDER, insert_exhibit_paragraphs, use_paragraphs
+from parcel_loops import expand_parcel_loops
+from docx_stories import PartParent, iter_story_paragraph_elements
+from docx_normalize import normalize_document
+from deterministic_output import DETERMINISTIC_TIMESTAMP, normalize_docx_zip, pin_timestamp, stabilize_core_properties
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Text template path -> content, filled on first read or by preload_text_templates()
+_text_templates = {}
+
+
+def _read_text_template(path):
+    content = _text_templates.get(path)
+    if content is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        _text_templates[path] = content
+    return content
+
+
+def preload_text_templates(directory=TEMPLATES_DIR):
+    """
+    Read every templates/**/*.txt block into the text template cache.
+    
+    Args:
+        directory (str): Templates root directory
+    
+    Returns:
+        int: Number of text templates cached
+    """
+    count = 0
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.endswith('.txt'):
+                _read_text_template(os.path.join(root, filename))
+                count += 1
+    return count
+def load_sig_block_template(filename):
+    """
+    Load a signature block template from the templates/sigBlocks directory.
+    
+    Args:
+        filename (str): Name of the template file
+        
+    Returns:
+        str: Template content
+    """  
+    try:
+        # Get the directory where this script is located
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        # Use repository root (this file's directory) for current structure
+        project_root = script_dir
+        path = os.path.join(project_root, 'templates', 'sigBlocks', filename)
+        
+        return _read_text_template(path).strip()
+    except FileNotFoundError:
+        return f"Template file '{filename}' not found at {path}"
+    except Exception as e:
+        return f"Error reading template: {str(e)}"
+def load_notary_template():
+    """
+    Load the notary template from templates/Notorary/notrary.txt.
+    
+    Returns:
+        str: Notary template content
+    """
+    try:
+        # Get the directory where this script is located
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        # Use repository root (this file's directory) for current structure
+        project_root = script_dir
+        notary_file_path = os.path.join(project_root, 'templates', 'Notorary', 'notrary.txt')
+        
+        return _read_text_template(notary_file_path)
+    except FileNotFoundError:
+        return "Notary block template file 'notrary.txt' not found."
+    except Exception as e:
+        return f"Error reading notary block: {str(e)}"
+def get_sig_block(owner_type, num_signatures):
+    """
+    Get signature block content based on owner type and number of signatures.
+    
+    Args:
+        owner_type (str): Type of owner (individual, corporation, etc.)
+        num_signatures (int): Number of signatures needed
+        
+    Returns:
+        list: Array with filename1 and filename2 content
+    """
+    filename1 = None
+    filename2 = None
+    filename1Content = None
+    filename2Content = None
+    
+    # Map owner types to template files (using files that actually exist)
+    if owner_type == 'his/her sole property' and num_signatures == 1:
+        filename1 = 'SI1.txt'
+    elif owner_type == 'a married couple' and num_signatures == 2:
+        filename1 = 'I1.txt'
+        filename2 = 'I1.txt'
+    elif owner_type == 'Corporation':
+        filename1 = 'E1.txt'
+        if num_signatures == 2:
+            filename2 = 'E1.txt'
+    elif owner_type == 'LLC':
+        filename1 = 'E1.txt'
+        if num_signatures == 2:
+            filename2 = 'E1.txt'
+    elif owner_type == 'LP':    
+        filename1 = 'E1.txt'
+        if num_signatures == 2:
+            filename2 = 'E1.txt'
+    elif owner_type == 'Trust':
+        filename1 = 'E1.txt'
+        if num_signatures == 2:
+            filename2 = 'E1.txt'
+    elif owner_type == 'Sole Owner, married couple' and num_signatures == 2:
+        filename1 = 'I1.txt'
+        filename2 = 'SI1.txt'
+    elif 'individual' in owner_type.lower():
+        # Default individual case
+        filename1 = 'I1.txt'
+        if num_signatures == 2:
+            filename2 = 'I1.txt'
+    else:
+        # Default entity case
+        filename1 = 'E1.txt'
+        if num_signatures == 2:
+            filename2 = 'E1.txt'
+    
+    # Load content from filename1 if it exists
+    if filename1:
+        filename1Content = load_sig_block_template(filename1)
+    
+    # Load content from filename2 if it exists  
+    if filename2:
+        filename2Content = load_sig_block_template(filename2)
+    
+    # Return array with filename1 and filename2 content
+    return [filename1Content, filename2Content]
+def generator(owner_type, is_notary, notary_block, num_signatures):
+    """
+    Generate signature blocks using the existing generator logic.
+    This is the main function used in the /generate_signature_block route.
+    
+    Args:
+        owner_type (str): Type of owner
+        is_notary (bool): Whether to include notary
+        notary_block (str): Notary block content
+        num_signatures (int): Number of signatures
+        
+    Returns:
+        str: Generated signature block(s)
+    """
+    # Generate notary block with default parameters
+    notary_content = load_notary_template()
+    
+    # Get signature block content
+    filecontent = get_sig_block(owner_type, num_signatures)
+    sigB1 = filecontent[0] if filecontent[0] is not None else ''
+    sigB2 = filecontent[1] if filecontent[1] is not None else ''
+    
+    final_string = ""
+
+    # Edge case where there are unique sig blocks 
+    if owner_type == 'Sole owner, married couple' and is_notary:
+        final_string += sigB1
+        if is_notary and notary_content:
+            final_string += "\n\n" + notary_content
+        final_string += "\n\n" + sigB2
+        if is_notary and notary_content:
+            final_string += "\n\n" + notary_content
+        return final_string
+    
+    if owner_type == 'Sole owner, married couple' and not is_notary:
+        final_string += sigB1
+        final_string += "\n\n" + sigB2
+        return final_string
+    
+    # Generate additional signature blocks based on num_signatures
+    for i in range(num_signatures):
+        if is_notary and notary_content:
+            final_string += "\n\n" + sigB1
+            final_string += "\n\n" + notary_content
+        else:
+            final_string += "\n\n" + sigB1
+
+    return final_string
+def generate_signature_blocks_from_json(json_data):
+    """
+    Generate signature blocks with and without notary from JSON data.
+    Uses the existing generator() function twice for proper dynamic/nested functionality.
+    
+    Args:
+        json_data (dict): JSON data containing grantor information
+        
+    Returns:
+        dict: JSON response with both signature blocks
+    """
+    try:
+        # Step 1: Extract information from JSON using getter methods
+        grantor_name = json_data.get('grantor_name', '')
+        grantor_name_1 = json_data.get('grantor_name_1', '')
+        grantor_name_2 = json_data.get('grantor_name_2', '')
+        trust_entity_name = json_data.get('trust_entity_name', '')
+        owner_type = json_data.get('owner_type', 'individual')
+        number_of_signatures = json_data.get('number_of_grantor_signatures', 1)
+        state = json_data.get('state', '')
+        county = json_data.get('county', '')
+        
+        # Step 2: Call the generator() function twice
+        # First call: WITHOUT notary (isNotary = False)
+        signature_block_without_notary = generator(
+            owner_type=owner_type,
+            is_notary=False,  # isNotary = False
+            notary_block='',
+            num_signatures=number_of_signatures
+        )
+        
+        # Second call: WITH notary (isNotary = True)
+        signature_block_with_notary = generator(
+            owner_type=owner_type,
+            is_notary=True,   # isNotary = True
+            notary_block='',
+            num_signatures=number_of_signatures
+        )
+        
+        # Step 3: Return both generated blocks in JSON format (standardized keys)
+        return {
+            "Signature_block": signature_block_without_notary,
+            "Signature_Block_With_Notary": signature_block_with_notary
+        }
+        
+    except Exception as e:
+        # Return error in the same format
+        return {
+            "signature_block": f"Error generating signature block: {str(e)}",
+            "Signature Block With Notrary": f"Error generating signature block with notary: {str(e)}"
+        }
+def exhibit_parcel(raw_parcel, number):
+    """
+    Exhibit A view of one input parcel, with defaults for missing fields.
+    
+    Used both to render Exhibit A and for the "[Exhibit A - Parcel N ...]"
+    mapping keys; it is not stored in the enriched JSON, which already holds
+    the parcels.
+    
+    Args:
+        raw_parcel (dict): Parcel from the payload's parcels array
+        number (int): 1-based parcel number
+    
+    Returns:
+        dict: parcelNumber, apn, acres, legal_description, isPortion, templateType
+    """
+    return {
+        "parcelNumber": number,
+        "apn": raw_parcel.get("apn", f"Unknown-{number}"),
+        "acres": raw_parcel.get("acres", 0),
+        "legal_description": raw_parcel.get("legal_description", "No legal description provided"),
+        "isPortion": raw_parcel.get("isPortion", False),
+        "templateType": raw_parcel.get("templateType", "standard")
+    }
+def build_exhibit_string_from_json(json_data):
+   
+    try:
+        print("[DEBUG] Starting exhibit string generation from JSON")
+        
+        # Parse JSON if it's a string
+        if isinstance(json_data, str):
+            import json
+            data = json.loads(json_data)
+        else:
+            data = json_data
+        
+        # Extract document information
+        document_name = data.get("document_name", "Unknown Document")
+        grantor_type = data.get("grantor_type", "Unknown")
+        grantor_name = data.get("grantor_name", "Unknown")
+        state = data.get("state", "Unknown")
+        county = data.get("county", "Unknown")
+        total_acres = data.get("total_acres", 0)
+        number_of_parcels = data.get("number_of_parcels", 0)
+        
+        # Extract and create parcel objects
+        raw_parcels = data.get("parcels", [])
+        
+        print(f"[DEBUG] Processing document: {document_name}")
+        print(f"[DEBUG] Found {len(raw_parcels)} parcels, total acres: {total_acres}")
+        
+        # Validate parcels data
+        if not isinstance(raw_parcels, list) or len(raw_parcels) == 0:
+            raise ValueError("Parcels must be a non-empty list")
+        
+        # Create parcel objects from the JSON data
+        parcel_objects = []
+        for i, raw_parcel in enumerate(raw_parcels, 1):
+            if not isinstance(raw_parcel, dict):
+                print(f"[WARNING] Invalid parcel data at index {i}: {raw_parcel}")
+                continue
+            parcel_objects.append(exhibit_parcel(raw_parcel, i))
+        
+        # Now use the existing build_exhibit_string function with our parcel objects
+        exhibit_string = build_exhibit_string(parcel_objects, {"county": county, "state": state})
+        
+        # Create the output JSON structure
+        output_json = {
+            "document_name": document_name,
+            "grantor_type": grantor_type,
+            "grantor_name": grantor_name,
+            "state": state,
+            "county": county,
+            "total_acres": total_acres,
+            "number_of_parcels": number_of_parcels,
+            "exhibit_a_string": exhibit_string,
+            "parcels_processed": len(parcel_objects),
+            "generation_timestamp": data.get("generation_timestamp") or __import__('datetime').datetime.now().isoformat()
+        }
+        
+        print(f"[DEBUG] Generated exhibit string, length: {len(exhibit_string)}")
+        print(f"[DEBUG] Output JSON created with {len(output_json)} fields")
+        print(f"[DEBUG] Created {len(parcel_objects)} parcel objects")
+        
+        return output_json
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to build exhibit string from JSON: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        
+        # Return error JSON
+        error_json = {
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "generation_timestamp": __import__('datetime').datetime.now().isoformat()
+        }
+        return error_json
+def build_exhibit_string(parcels, context=None):
+
+    """
+    Build the Exhibit A text string from parcel objects.
+    
+    Uses the compiled templates in templates/exhibit, picking one per parcel
+    by templateType / isPortion.
+    
+    Args:
+        parcels: List of parcel objects with parcelNumber, isPortion, and templateType properties
+        context: Optional dict with "county" and "state" for the exhibit header
+    
+    Returns:
+        str: The complete Exhibit A text string
+    """
+    try:
+        print(f"[DEBUG] Building exhibit string for {len(parcels)} parcels")
+        
+        # Validate parcels data
+        if not isinstance(parcels, list) or len(parcels) == 0:
+            raise ValueError("Parcels must be a non-empty list")
+        
+        exhibit_string = render_exhibit(parcels, context)
+        
+        print(f"[DEBUG] Generated exhibit string, length: {len(exhibit_string)}")
+        return exhibit_string
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to build exhibit string: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise
+def update_json_with_generated_content(json_data):
+    """
+    Build the JSON data with generated signature blocks and exhibit A content.
+    
+    The caller's dict is not modified: the result is a shallow copy that
+    shares the original values and only adds the generated keys.
+    
+    Args:
+        json_data (dict): The JSON data dictionary to enrich
+        
+    Returns:
+        dict: New JSON data with signature blocks and exhibit A
+    """
+    # Generate signature blocks and exhibit A content
+    sigBlocks = generate_signature_blocks_from_json(json_data)
+    exhibitA = build_exhibit_string_from_json(json_data)
+    
+    enriched = dict(json_data)
+    
+    # Add the two signature blocks individually (use standardized keys)
+    enriched["Signature_block"] = sigBlocks.get("Signature_block")
+    # Backward compatibility for any older key names
+    enriched["Signature_Block_With_Notary"] = sigBlocks.get("Signature_Block_With_Notary") or sigBlocks.get("Signature Block With Notrary") or sigBlocks.get("Signature Block With Notary")
+    
+    # Add the exhibit A content
+    enriched["exhibit_a"] = exhibitA
+    
+    return enriched
+def keyValueMapping(json_data):
+    """
+    Create a key-value mapping from the JSON data.
+    
+    Args:
+        json_data (dict): The JSON data dictionary to process
+        
+    Returns:
+        list: List of dictionaries with 'key' and 'value' pairs for document replacement
+    """
+    mapping_data = []
+    
+    # Basic field mappings
+    basic_fields = {
+        "document_name": "[Document Name]",
+        "grantor_type": "[Grantor Type]", 
+        "grantor_name_1": "[Grantor Name 1]",
+        "grantor_name_2": "[Grantor Name 2]",
+        "trust_entity_name": "[Trust Entity Name]",
+        "grantor_name": "[Grantor Name]",
+        "owner_type": "[Owner Type]",
+        "number_of_grantor_signatures": "[Number of Grantor Signatures]",
+        "grantor_address_1": "[Grantor Address 1]",
+        "grantor_address_2": "[Grantor Address 2]",
+        "state": "[State]",
+        "county": "[County]",
+        "total_acres": "[Total Acres]",
+        "number_of_parcels": "[Number of Parcels]"
+    }
+    
+    # Add basic field mappings
+    for json_key, placeholder in basic_fields.items():
+        if json_key in json_data:
+            value = json_data[json_key]
+            if value is not None:
+                # Convert to string and check if it's not empty
+                str_value = str(value).strip()
+                if str_value != "" and str_value.lower() != "na":
+                    mapping_data.append({
+                        "key": placeholder,
+                        "value": str_value
+                    })
+    
+    # Add signature blocks (use existing values from JSON if available)
+    if "Signature_Block_With_Notary" in json_data:
+        mapping_data.append({
+            "key": "[Signature Block With Notary]",
+            "value": json_data["Signature_Block_With_Notary"]
+        })
+    else:
+        mapping_data.append({
+            "key": "[Signature Block With Notary]",
+            "value": ""
+        })
+    
+    if "Signature_block" in json_data:
+        mapping_data.append({
+            "key": "[Signature Block]",
+            "value": json_data["Signature_block"]
+        })
+    else:
+        mapping_data.append({
+            "key": "[Signature Block]",
+            "value": ""
+        })
+    
+    # Add APN list
+    if "apn_list" in json_data and json_data["apn_list"]:
+        mapping_data.append({
+            "key": "[APN List]",
+            "value": json_data["apn_list"]
+        })
+    
+    # Add Exhibit A mappings
+    if "exhibit_a" in json_data:
+        exhibit = json_data["exhibit_a"]
+        
+        # Basic exhibit fields
+        exhibit_basic_fields = {
+            "county": "[Exhibit A - County]",
+            "document_name": "[Exhibit A - Document Name]",
+            "exhibit_a_string": "[Exhibit A - Exhibit A String]",
+            "generation_timestamp": "[Exhibit A - Generation Timestamp]",
+            "grantor_name": "[Exhibit A - Grantor Name]",
+            "grantor_type": "[Exhibit A - Grantor Type]",
+            "number_of_parcels": "[Exhibit A - Number of Parcels]",
+            "state": "[Exhibit A - State]",
+            "total_acres": "[Exhibit A - Total Acres]"
+        }
+        
+        for json_key, placeholder in exhibit_basic_fields.items():
+            if json_key in exhibit:
+                value = exhibit[json_key]
+                if value is not None:
+                    mapping_data.append({
+                        "key": placeholder,
+                        "value": value
+                    })
+        
+    # Add parcel-specific mappings. Templates use both key families, so both
+    # are built in a single pass over the parcels; the Exhibit A family takes
+    # the exhibit's defaults for missing fields (only when Exhibit A was built).
+    parcels = json_data.get("parcels") or []
+    with_exhibit = "exhibit_a_string" in json_data.get("exhibit_a", {})
+    exhibit_parcel_mappings = []
+    parcel_mappings = []
+    for i, parcel in enumerate(parcels, 1):
+        if with_exhibit:
+            parcel_obj = exhibit_parcel(parcel, i)
+            parcel_prefix = f"[Exhibit A - Parcel {i}"
+            exhibit_parcel_mappings.extend([
+                {"key": f"{parcel_prefix} APN]", "value": parcel_obj.get("apn", "")},
+                {"key": f"{parcel_prefix} Acres]", "value": parcel_obj.get("acres", 0)},
+                {"key": f"{parcel_prefix} Is Portion]", "value": parcel_obj.get("isPortion", False)},
+                {"key": f"{parcel_prefix} Legal Description]", "value": parcel_obj.get("legal_description", "")},
+                {"key": f"{parcel_prefix} Parcel Number]", "value": parcel_obj.get("parcelNumber", i)},
+                {"key": f"{parcel_prefix} Template Type]", "value": parcel_obj.get("templateType", "standard")}
+            ])
+        
+        parcel_prefix = f"[Parcels - Parcel {i}"
+        parcel_mappings.extend([
+            {"key": f"{parcel_prefix} APN]", "value": parcel.get("apn", "")},
+            {"key": f"{parcel_prefix} Acres]", "value": parcel.get("acres", 0)},
+            {"key": f"{parcel_prefix} Is Portion]", "value": parcel.get("isPortion", False)},
+            {"key": f"{parcel_prefix} Legal Description]", "value": parcel.get("legal_description", "")},
+            {"key": f"{parcel_prefix} Parcel Number]", "value": parcel.get("parcelNumber", i)}
+        ])
+    
+    mapping_data.extend(exhibit_parcel_mappings)
+    mapping_data.extend(parcel_mappings)
+    
+    return mapping_data
+def getMapping(json_data):
+    mapping = keyValueMapping(update_json_with_generated_content(json_data))
+    return mapping
+def enrich(json_data, deterministic=False):
+    """
+    Enrich lease JSON with generated signature blocks and Exhibit A.
+    
+    Args:
+        json_data (dict): Lease JSON payload
+        deterministic (bool): If True, use the payload's generation_timestamp
+            or a fixed one instead of the current time
+    
+    Returns:
+        dict: Enriched copy of the payload
+    """
+    if deterministic:
+        json_data = pin_timestamp(json_data)
+    return update_json_with_generated_content(json_data)
+def build_mapping(enriched):
+    """
+    Build the placeholder mapping from enriched lease JSON.
+    
+    Args:
+        enriched (dict): Output of enrich()
+    
+    Returns:
+        list: List of {"key": ..., "value": ...} pairs
+    """
+    return keyValueMapping(enriched)
+def render(template, mapping, output_filename='processed_document.docx', track_changes=False, exhibit_images=True, exhibit_format='auto',
+           deterministic=False, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Render a DOCX template with a placeholder mapping.
+    
+    Args:
+        template: File path, file-like object or Document working copy of the DOCX template
+        mapping: Mapping list from build_mapping() (or its JSON string)
+        output_filename: Name for the output file (optional)
+        track_changes: If True, enables track changes mode
+        exhibit_images: If True, insert survey images into Exhibit A
+        exhibit_format: 'text' (one run), 'paragraphs' (one paragraph per line)
+            or 'auto' (paragraphs for large exhibits)
+        deterministic: If True, produce byte-identical output for identical input
+        timestamp: ISO timestamp stamped into deterministic output
+    
+    Returns:
+        tuple: (success: bool, docx_bytes: bytes or None, error_message: str)
+    """
+    return simple_document_replacement(template, mapping, output_filename=output_filename, track_changes=track_changes,
+                                       exhibit_images=exhibit_images, exhibit_format=exhibit_format,
+                                       deterministic=deterministic, timestamp=timestamp)
+def replace_placeholders_in_document(doc, mapping, track_changes=False):
+    """
+    Core function that replaces placeholders in a DOCX document.
+    Supports both normal replacement and track changes mode.
+    
+    Args:
+        doc: Document object to process
+        mapping: Dictionary of placeholder keys to replacement values
+        track_changes: If True, adds "NEW:" prefix and highlights changes
+    
+    Returns:
+        Document: Processed document with replacements
+    """
+    try:
+        print(f"[DEBUG] Starting placeholder replacement. Track changes: {track_changes}")
+        print(f"[DEBUG] Processing {len(mapping)} placeholders")
+        
+        # Apply track changes prefix if enabled
+        if track_changes:
+            mapping = {k: f"NEW:{v}" for k, v in mapping.items()}
+            print("[DEBUG] Applied 'NEW:' prefix for track changes")
+        
+        # Choose replacement method based on track changes setting
+        if track_changes:
+            doc = _replace_placeholders_with_track_changes(doc, mapping)
+        else:
+            doc = _replace_placeholders_normal(doc, mapping)
+        
+        print("[DEBUG] Placeholder replacement completed successfully")
+        return doc
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to replace placeholders: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise
+# A "[...]" placeholder token (no nested brackets)
+_PLACEHOLDER_TOKEN = re.compile(r'\[[^\[\]]*\]')
+
+
+def _iter_story_paragraphs(doc):
+    """
+    Yield every paragraph of the document exactly once: body, tables (nested
+    included), text boxes, and each distinct header, footer, footnotes,
+    endnotes and comments part.
+    
+    Args:
+        doc: python-docx Document
+    
+    Yields:
+        Paragraph: Paragraphs, part by part in document order
+    """
+    parents = {}
+    for part, p in iter_story_paragraph_elements(doc):
+        parent = parents.get(id(part))
+        if parent is None:
+            parent = parents[id(part)] = PartParent(part)
+        yield Paragraph(p, parent)
+def _replace_placeholders_normal(doc, mapping):
+    """
+    Normal placeholder replacement without track changes.
+    Replaces placeholders throughout the entire document.
+    
+    Args:
+        doc: Document object to process
+        mapping: Dictionary of placeholder keys to replacement values
+    
+    Returns:
+        Document: Processed document with replacements
+    """
+    # Keys with a value, in mapping order (blank values leave the placeholder)
+    replacements = [(key, value) for key, value in mapping.items() if value.strip()]
+    if not replacements:
+        return doc
+    order = {key: i for i, (key, _) in enumerate(replacements)}
+    # When every key is a "[...]" token, a paragraph's keys are looked up from
+    # its tokens, so the cost per paragraph does not grow with the mapping
+    tokenized = all(_PLACEHOLDER_TOKEN.fullmatch(key) for key in order)
+    t_tag = qn('w:t')
+    rpr_tag = qn('w:rPr')
+    
+    def next_replacement(text, after):
+        """Index of the first replacement after `after` whose key occurs in text, or None"""
+        if tokenized:
+            found = [order[token] for token in _PLACEHOLDER_TOKEN.findall(text) if order.get(token, -1) > after]
+            return min(found) if found else None
+        for i in range(after + 1, len(replacements)):
+            if replacements[i][0] in text:
+                return i
+        return None
+    
+    def replace_in_runs(runs, texts, index):
+        """
+        Apply the replacements in mapping order over the paragraph text,
+        exactly like str.replace on the joined runs, but edit only the runs a
+        match overlaps: the first keeps its prefix plus the value, the last
+        keeps its suffix and runs wholly inside the match are emptied.
+        Untouched runs keep their XML and formatting.
+        """
+        original = list(texts)
+        joined = ''.join(texts)
+        while index is not None:
+            key, value = replacements[index]
+            pos = joined.find(key)
+            starts = []
+            while pos != -1:
+                starts.append(pos)
+                pos = joined.find(key, pos + len(key))
+            bounds = list(accumulate([0] + [len(text) for text in texts[:-1]]))
+            # Right to left, so offsets of earlier matches stay valid
+            for start in reversed(starts):
+                end = start + len(key)
+                first = bisect_right(bounds, start) - 1
+                last = bisect_right(bounds, end - 1) - 1
+                if first == last:
+                    text = texts[first]
+                    offset = start - bounds[first]
+                    texts[first] = text[:offset] + value + text[offset + len(key):]
+                    continue
+                texts[first] = texts[first][:start - bounds[first]] + value
+                for i in range(first + 1, last):
+                    texts[i] = ''
+                texts[last] = texts[last][end - bounds[last]:]
+            joined = ''.join(texts)
+            index = next_replacement(joined, index)
+        
+        for run, old, new in zip(runs, original, texts):
+            if new == old:
+                continue
+            r = run._r
+            if not new and all(child.tag in (t_tag, rpr_tag) for child in r):
+                # Emptied plain-text run: drop it instead of leaving an empty w:r
+                r.getparent().remove(r)
+            else:
+                run.text = new
+    
+    def process_paragraph(paragraph, mapping):
+        """Process a single paragraph for placeholders"""
+        runs = paragraph.runs
+        if not runs:
+            return
+            
+        # Check if this paragraph contains any placeholders
+        texts = [run.text for run in runs]
+        index = next_replacement(''.join(texts), -1)
+        if index is not None:
+            replace_in_runs(runs, texts, index)
+    
+    # Process every story part (body, tables, text boxes, headers/footers,
+    # footnotes, endnotes, comments) in one pass, each paragraph once
+    count = 0
+    for paragraph in _iter_story_paragraphs(doc):
+        process_paragraph(paragraph, mapping)
+        count += 1
+    print(f"[DEBUG] Processed {count} paragraphs")
+    
+    return doc
+def _replace_placeholders_with_track_changes(doc, mapping):
+    """
+    Placeholder replacement with track changes.
+    Highlighting is disabled per user preference.
+    
+    Args:
+        doc: Document object to process
+        mapping: Dictionary of placeholder keys to replacement values
+    
+    Returns:
+        Document: Processed document with highlighted replacements
+    """
+    def process_paragraph(paragraph, mapping):
+        """Process a single paragraph for placeholders (no highlighting)"""
+        for run in paragraph.runs:
+            for key, value in mapping.items():
+                if not value.strip():
+                    continue
+                    
+                # Check if this run contains the placeholder
+                if key in run.text:
+                    # Replace the placeholder with the value
+                    run.text = run.text.replace(key, value)
+                    # Highlighting disabled
+                    print(f"[DEBUG] Replaced: {key} -> {value[:30]}{'...' if len(value) > 30 else ''}")
+                    break  # Only process one replacement per run to avoid conflicts
+    
+    # Process every story part (body, tables, text boxes, headers/footers,
+    # footnotes, endnotes, comments) in one pass, each paragraph once
+    count = 0
+    for paragraph in _iter_story_paragraphs(doc):
+        process_paragraph(paragraph, mapping)
+        count += 1
+    print(f"[DEBUG] Processed {count} paragraphs with track changes")
+    
+    return doc
+def simple_document_replacement(docx_file, mapping_json, output_filename='processed_document.docx', track_changes=False, exhibit_images=True, exhibit_format='auto',
+                                deterministic=False, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Simple document replacement function that takes JSON mapping and DOCX template,
+    performs text replacement (with optional track changes), and returns the processed DOCX file.
+    
+    Args:
+        docx_file: File path, file-like object or loaded Document (used in place) for the DOCX template
+        mapping_json: JSON string in the format [{"key": "...", "value": "..."}]
+        output_filename: Name for the output file (optional)
+        track_changes: If True, enables track changes mode with highlighting
+        exhibit_images: If True, replace [Image] with the parcels' survey images (when any exist)
+        exhibit_format: 'text', 'paragraphs' or 'auto' (see exhibit_paragraphs.py)
+        deterministic: If True, fix core property dates and ZIP metadata (see deterministic_output.py)
+        timestamp: ISO timestamp used for deterministic output
+    
+    Returns:
+        tuple: (success: bool, result: str or bytes, error_message: str)
+        - If success=True: result contains the DOCX file bytes
+        - If success=False: result is None, error_message contains the error
+    """
+    try:
+        import json
+        from docx import Document
+        from io import BytesIO
+        
+        print(f"[DEBUG] Starting document replacement for: {output_filename}")
+        print(f"[DEBUG] Track changes enabled: {track_changes}")
+        
+        # Parse the JSON mapping
+        if isinstance(mapping_json, str):
+            mapping_data = json.loads(mapping_json)
+        else:
+            mapping_data = mapping_json
+        
+        # Validate mapping format
+        if not isinstance(mapping_data, list):
+            return False, None, "Mapping must be a list of key-value objects"
+        
+        # Convert to the format expected by replacement functions
+        mapping = {}
+        for item in mapping_data:
+            if isinstance(item, dict) and 'key' in item and 'value' in item:
+                key = item['key'].strip()
+                value = str(item['value']).strip()
+                if key and value:  # Only add non-empty key-value pairs
+                    mapping[key] = value
+                    print(f"[DEBUG] Added mapping: {key} -> {value[:50]}{'...' if len(value) > 50 else ''}")
+        
+        if not mapping:
+            return False, None, "No valid key-value pairs found in mapping"
+        
+        print(f"[DEBUG] Processed {len(mapping)} key-value pairs")
+        
+        # Load the DOCX document
+        if isinstance(docx_file, DocumentObject):
+            # Already-loaded working copy (e.g. a clone of a cached template)
+            doc = docx_file
+        else:
+            # File-like object or file path; normalized like cached templates
+            # (docx_clone.load_frozen_document), so placeholders sit in single runs
+            doc = Document(docx_file)
+            normalize_document(doc)
+        
+        print(f"[DEBUG] Loaded DOCX document with {len(doc.paragraphs)} paragraphs and {len(doc.tables)} tables")
+        
+        # Large exhibits are written as paragraphs after the text pass, so the
+        # exhibit placeholder is kept out of it
+        apns = apns_from_mapping(mapping)
+        exhibit_text = None
+        if EXHIBIT_PLACEHOLDER in mapping and use_paragraphs(exhibit_format, len(apns)):
+            exhibit_text = mapping.pop(EXHIBIT_PLACEHOLDER)
+        
+        # Repeat per-parcel loop blocks before the text pass, which then fills
+        # the remaining (document-level) placeholders of the copies
+        expand_parcel_loops(doc, mapping, "NEW:" if track_changes else "")
+        
+        # Perform placeholder replacement
+        doc = replace_placeholders_in_document(doc, mapping, track_changes)
+        
+        if exhibit_text is not None:
+            insert_exhibit_paragraphs(doc, f"NEW:{exhibit_text}" if track_changes else exhibit_text)
+        
+        # Insert survey images for the exhibit parcels
+        if exhibit_images:
+            insert_exhibit_images(doc, apns)
+        
+        if deterministic:
+            stabilize_core_properties(doc, timestamp)
+        
+        # Save the processed document to bytes
+        output_stream = BytesIO()
+        doc.save(output_stream)
+        output_stream.seek(0)
+        
+        docx_bytes = output_stream.getvalue()
+        if deterministic:
+            docx_bytes = normalize_docx_zip(docx_bytes, timestamp)
+        print(f"[DEBUG] Document processed successfully. Output size: {len(docx_bytes)} bytes")
+        
+        return True, docx_bytes, ""
+        
+    except json.JSONDecodeError as e:
+        error_msg = f"Invalid JSON format: {str(e)}"
+        print(f"[ERROR] {error_msg}")
+        return False, None, error_msg
+    except Exception as e:
+        error_msg = f"Document processing failed: {str(e)}"
+        print(f"[ERROR] {error_msg}")
+        import traceback
+        traceback.print_exc()
+        return False, None, error_msg
+
+
@@ -0,0 +1,104 @@
+"""
+Short-lived server-side cache of computed placeholder mappings.
+
+/api/process stores the mapping it computed and returns a handle;
+/api/generate-docx accepts the handle and renders without enriching the
+payload again. The cache is bounded by entry count (LEASE_MAPPING_CACHE_SIZE)
+and by the approximate in-memory size of the mappings
+(LEASE_MAPPING_CACHE_BYTES, default 32 MB; a 500-parcel mapping takes about
+1.8 MB), least recently used evicted first, and entries expire after
+LEASE_MAPPING_TTL seconds.
+
+Handles are random and local to the worker process that issued them: with
+several workers, a handle only resolves when the follow-up request reaches
+the same process (sticky sessions); otherwise the client gets 410 and must
+send the payload or the mapping itself.
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from deterministic_output import DETERMINISTIC_TIMESTAMP, pin_mapping_timestamp
+
+MAPPING_CACHE_SIZE = int(os.environ.get('LEASE_MAPPING_CACHE_SIZE', '256'))
+MAPPING_CACHE_BYTES = int(os.environ.get('LEASE_MAPPING_CACHE_BYTES', str(32 * 1024 * 1024)))
+MAPPING_TTL = float(os.environ.get('LEASE_MAPPING_TTL', '600'))
+
+# Approximate per-item cost of a {"key": ..., "value": ...} dict and its strings
+_ITEM_OVERHEAD = 256
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_total_bytes = 0
+
+
+def mapping_size(mapping):
+    """
+    Estimate the memory held by a mapping.
+
+    Args:
+        mapping (list): Mapping list from build_mapping()
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    return sum(len(item["key"]) + len(str(item["value"])) for item in mapping) + _ITEM_OVERHEAD * len(mapping)
+
+
+def store_mapping(mapping, deterministic=False):
+    """
+    Cache a mapping and return its handle.
+
+    Args:
+        mapping (list): Mapping list from build_mapping()
+        deterministic (bool): The mapping was built with a fixed generation
+            timestamp (enrich(..., deterministic=True))
+
+    Returns:
+        str: Mapping handle
+    """
+    global _total_bytes
+    handle = secrets.token_urlsafe(16)
+    expires = time.monotonic() + MAPPING_TTL
+    size = mapping_size(mapping)
+    with _lock:
+        _entries[handle] = (expires, mapping, deterministic, size)
+        _total_bytes += size
+        # The newest mapping is kept even if it alone exceeds the byte bound
+        while len(_entries) > MAPPING_CACHE_SIZE or (_total_bytes > MAPPING_CACHE_BYTES and len(_entries) > 1):
+            _total_bytes -= _entries.popitem(last=False)[1][3]
+    return handle
+
+
+def get_mapping(handle, deterministic=False, timestamp=DETERMINISTIC_TIMESTAMP):
+    """
+    Look up a cached mapping.
+
+    Args:
+        handle (str): Handle from store_mapping()
+        deterministic (bool): The caller renders deterministically; a mapping
+            built with the current time gets `timestamp` as its generation
+            timestamp instead
+        timestamp (str): ISO 8601 timestamp for deterministic rendering
+
+    Returns:
+        list or None: The mapping, None if unknown or expired
+    """
+    global _total_bytes
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(handle)
+        if entry is None:
+            return None
+        expires, mapping, pinned, size = entry
+        if expires < now:
+            del _entries[handle]
+            _total_bytes -= size
+            return None
+        _entries.move_to_end(handle)
+    if deterministic and not pinned:
+        return pin_mapping_timestamp(mapping, timestamp)
+    return mapping
+
@@ -0,0 +1,260 @@
+"""
+Per-parcel repeat blocks in DOCX templates.
+
+Instead of pre-placing numbered slots such as "[Parcels - Parcel 7 APN]",
+a template can mark content that is repeated once per parcel:
+
+- a paragraph loop: the paragraphs (and tables) between a paragraph reading
+  exactly "[Begin Parcel Loop]" and one reading "[End Parcel Loop]" in the
+  same container; the marker paragraphs are removed
+- a row loop: a table row containing "[Parcel Row]" anywhere in its cells;
+  the marker text is removed
+
+Inside a loop, "[Parcel <Field>]" is replaced with the parcel's value, where
+<Field> is any per-parcel field of the mapping ("[Parcel APN]",
+"[Parcel Acres]", "[Parcel Legal Description]", "[Parcel Is Portion]",
+"[Parcel Template Type]", "[Parcel Number]") or "[Parcel Index]" for the
+1-based position. Other placeholders in a loop are left for the normal
+replacement pass.
+
+Each block is serialized once; the copies for all parcels are produced by
+substituting the parcel fields into that XML string and parsed in a single
+call, so expansion cost grows with the number of parcels only.
+
+Cached templates go further: compile_parcel_loops() finds and serializes
+the blocks once when the frozen template is loaded (docx_clone), and clones
+share the result (share_compiled_loops), so a render only substitutes the
+parcel fields and splices the copies in.
+"""
+import copy
+import re
+import threading
+import weakref
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from lxml import etree
+
+from docx_normalize import normalize_root
+from docx_stories import INVALID_XML_CHARS, iter_story_roots
+
+LOOP_BEGIN = "[Begin Parcel Loop]"
+LOOP_END = "[End Parcel Loop]"
+ROW_MARKER = "[Parcel Row]"
+
+_PARCEL_KEY = re.compile(r'^\[(?:Exhibit A|Parcels) - Parcel (\d+) (.+)\]$')
+_FIELD = re.compile(r'\[Parcel ([^\]\[]+)\]')
+_FIELD_ALIASES = {"Number": "Parcel Number"}
+
+# Document part -> compiled loops, for frozen templates and their unmodified clones
+_compiled = weakref.WeakKeyDictionary()
+_compiled_lock = threading.Lock()
+
+
+def parcels_from_mapping(mapping):
+    """
+    Collect per-parcel fields from the numbered parcel keys of a mapping.
+
+    Both key families ("[Exhibit A - Parcel N ...]" and
+    "[Parcels - Parcel N ...]") describe the same parcels; the first value
+    seen for a field wins.
+
+    Args:
+        mapping (dict): Placeholder -> value mapping
+
+    Returns:
+        list: One {field: value} dict per parcel, in parcel order
+    """
+    parcels = {}
+    for key, value in mapping.items():
+        match = _PARCEL_KEY.match(key)
+        if match:
+            parcels.setdefault(int(match.group(1)), {}).setdefault(match.group(2), value)
+    return [parcels[i] for i in sorted(parcels)]
+
+
+def _text(element):
+    return ''.join(t.text or '' for t in element.iter(qn('w:t')))
+
+
+def _row_text(tr):
+    """Text of a table row, excluding rows of tables nested in its cells."""
+    tr_tag = qn('w:tr')
+    return ''.join(t.text or '' for t in tr.iter(qn('w:t')) if next(t.iterancestors(tr_tag)) is tr)
+
+
+def _find_loops(root):
+    """Return (block, markers) for each loop of a story root, row loops first."""
+    p_tag, tr_tag = qn('w:p'), qn('w:tr')
+    loops = [([tr], []) for tr in root.iter(tr_tag) if ROW_MARKER in _row_text(tr)]
+    for begin in [p for p in root.iter(p_tag) if _text(p).strip() == LOOP_BEGIN]:
+        block = []
+        end = begin.getnext()
+        while end is not None and not (end.tag == p_tag and _text(end).strip() == LOOP_END):
+            block.append(end)
+            end = end.getnext()
+        if end is None:
+            print(f"[WARNING] {LOOP_BEGIN} without a matching {LOOP_END}; loop left as is")
+            continue
+        loops.append((block, [begin, end]))
+    return loops
+
+
+def _serialize_block(block):
+    """XML of a loop block with normalized runs and without row markers; block is not modified."""
+    copies = [copy.deepcopy(element) for element in block]
+    for element in copies:
+        normalize_root(element)
+    return ''.join(etree.tostring(element, encoding='unicode') for element in copies).replace(ROW_MARKER, '')
+
+
+def _expand(block, markers, template, parcels, prefix):
+    """Replace block with one copy of template per parcel, and remove the loop markers."""
+    if block:
+        anchor = block[0]
+        if parcels:
+            copies = []
+            for index, parcel in enumerate(parcels, 1):
+                def field(match):
+                    name = match.group(1)
+                    if name == 'Index':
+                        value = index
+                    else:
+                        value = parcel.get(_FIELD_ALIASES.get(name, name))
+                        if value is None:
+                            return match.group(0)
+                    return escape(INVALID_XML_CHARS.sub('', f"{prefix}{value}"))
+                copies.append(_FIELD.sub(field, template))
+
+            fragment = parse_xml(f'<w:body {nsdecls("w")}>{"".join(copies)}</w:body>')
+            for element in list(fragment):
+                anchor.addprevious(element)
+        parent = anchor.getparent()
+        for element in block:
+            parent.remove(element)
+    for marker in markers:
+        marker.getparent().remove(marker)
+
+
+def _path(root, element):
+    """Child indexes leading from root to element."""
+    path = []
+    while element is not root:
+        parent = element.getparent()
+        path.append(parent.index(element))
+        element = parent
+    return tuple(reversed(path))
+
+
+def _resolve(root, path):
+    element = root
+    for index in path:
+        element = element[index]
+    return element
+
+
+def _is_nested(loops):
+    """True if a loop lies inside another loop's block (expanded dynamically)."""
+    block_ids = {}
+    for i, (block, _) in enumerate(loops):
+        for element in block:
+            block_ids[id(element)] = i
+    for i, (block, markers) in enumerate(loops):
+        for element in block + markers:
+            if any(block_ids.get(id(ancestor), i) != i for ancestor in element.iterancestors()):
+                return True
+    return False
+
+
+def compile_parcel_loops(doc):
+    """
+    Find and serialize the parcel loops of a template once.
+
+    The result is kept with the document; clones made from it with
+    share_compiled_loops() are then expanded without searching or
+    serializing the template again. The document is not modified.
+
+    Args:
+        doc: python-docx Document (normally a frozen template)
+
+    Returns:
+        dict or None: Part name -> [(block paths, marker paths, XML template)];
+            None if loops are nested, which are expanded without compilation
+    """
+    compiled = {}
+    for part, root in iter_story_roots(doc, writeback=False):
+        loops = _find_loops(root)
+        if not loops:
+            continue
+        if _is_nested(loops):
+            return None
+        compiled[part.partname] = [
+            ([_path(root, e) for e in block], [_path(root, e) for e in markers], _serialize_block(block))
+            for block, markers in loops
+        ]
+    with _compiled_lock:
+        _compiled[doc.part] = compiled
+    return compiled
+
+
+def share_compiled_loops(frozen, clone):
+    """
+    Let a clone use the compiled loops of the document it was cloned from.
+
+    Args:
+        frozen: Document passed to compile_parcel_loops()
+        clone: Unmodified clone of it (docx_clone.clone_document)
+    """
+    with _compiled_lock:
+        compiled = _compiled.get(frozen.part)
+        if compiled is not None:
+            _compiled[clone.part] = compiled
+
+
+def expand_parcel_loops(doc, mapping, prefix=''):
+    """
+    Expand every parcel loop of a document in place.
+
+    Uses the loops compiled for the document (compile_parcel_loops /
+    share_compiled_loops) when there are any; otherwise the document is
+    searched for loops.
+
+    Args:
+        doc: python-docx Document
+        mapping (dict): Placeholder -> value mapping (parcel fields are taken
+            from its numbered parcel keys)
+        prefix (str): Text prepended to each substituted value (e.g. "NEW:"
+            in track changes mode)
+
+    Returns:
+        int: Number of loops expanded
+    """
+    with _compiled_lock:
+        # The paths are only valid for the unmodified document: use them once
+        compiled = _compiled.pop(doc.part, None)
+    if compiled is not None and not compiled:
+        return 0
+
+    parcels = None
+    expanded = 0
+    for part, root in iter_story_roots(doc, partnames=compiled):
+        if compiled is not None:
+            loops = [([_resolve(root, path) for path in block], [_resolve(root, path) for path in markers], template)
+                     for block, markers, template in compiled[part.partname]]
+        else:
+            loops = [(block, markers, None) for block, markers in _find_loops(root)]
+        if not loops:
+            continue
+        if parcels is None:
+            parcels = parcels_from_mapping(mapping)
+
+        for block, markers, template in loops:
+            if template is None and block and parcels:
+                template = _serialize_block(block)
+            _expand(block, markers, template, parcels, prefix)
+            expanded += 1
+
+    if expanded:
+        print(f"[DEBUG] Expanded {expanded} parcel loops for {len(parcels)} parcels")
+    return expanded
@@ -0,0 +1,279 @@
+"""
+Lease payload validation.
+
+LEASE_PAYLOAD_SCHEMA is compiled once into a tree of small check functions
+(compile_schema), so validating a payload is a handful of type checks and
+costs microseconds. It runs before any template I/O.
+
+Supported schema keywords: type (name or list of names), enum, format
+("date-time"), properties, required, items, minItems, minimum, maximum.
+"""
+from deterministic_output import parse_timestamp
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def _is_timestamp(value):
+    try:
+        parse_timestamp(value)
+    except ValueError:
+        return False
+    return True
+
+
+# Value checks for the "format" keyword, applied to strings only
+_FORMAT_CHECKS = {
+    "date-time": (_is_timestamp, "an ISO 8601 date-time"),
+}
+
+
+def _format_path(path):
+    """Format a lazily built (parent, segment) path chain as "$.a[0].b"."""
+    parts = []
+    while isinstance(path, tuple):
+        path, segment = path
+        parts.append(f"[{segment}]" if isinstance(segment, int) else f".{segment}")
+    return path + "".join(reversed(parts))
+
+
+_STRING = {"type": "string"}
+_OPTIONAL_STRING = {"type": ["string", "null"]}
+
+LEASE_PAYLOAD_SCHEMA = {
+    "type": "object",
+    "required": ["parcels"],
+    "properties": {
+        "document_name": _STRING,
+        "grantor_type": _STRING,
+        "grantor_name": _STRING,
+        "grantor_name_1": _OPTIONAL_STRING,
+        "grantor_name_2": _OPTIONAL_STRING,
+        "trust_entity_name": _OPTIONAL_STRING,
+        "owner_type": _STRING,
+        "number_of_grantor_signatures": {"type": "integer", "minimum": 1, "maximum": 10},
+        "grantor_address_1": _OPTIONAL_STRING,
+        "grantor_address_2": _OPTIONAL_STRING,
+        "state": _STRING,
+        "county": _STRING,
+        "total_acres": {"type": "number", "minimum": 0},
+        "number_of_parcels": {"type": "integer", "minimum": 0},
+        "apn_list": {"type": "array", "items": _STRING},
+        "parcels": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["apn", "acres"],
+                "properties": {
+                    "apn": _STRING,
+                    "acres": {"type": "number", "minimum": 0},
+                    "legal_description": _STRING,
+                    "isPortion": {"type": "boolean"},
+                    "templateType": _STRING,
+                    "parcelNumber": {"type": "integer", "minimum": 1},
+                },
+            },
+        },
+        "track_changes": {"type": "boolean"},
+        "template_path": _STRING,
+        "template_id": _STRING,
+        "format": {"type": "string", "enum": ["docx", "pdf"]},
+        "exhibit_format": {"type": "string", "enum": ["auto", "text", "paragraphs"]},
+        "deterministic": {"type": "boolean"},
+        "generation_timestamp": {"type": "string", "format": "date-time"},
+        "output_filename": _STRING,
+        "templates": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "template_id": _STRING,
+                    "template_path": _STRING,
+                    "output_filename": _STRING,
+                },
+            },
+        },
+    },
+}
+
+
+# /api/generate-docx with a precomputed mapping (mapping_handle from
+# /api/process, or the mapping itself): only the render options are checked
+_RENDER_OPTIONS = ("track_changes", "template_path", "template_id", "format", "exhibit_format",
+                   "deterministic", "generation_timestamp", "output_filename", "templates")
+PRECOMPUTED_MAPPING_SCHEMA = {
+    "type": "object",
+    "properties": dict(
+        {name: LEASE_PAYLOAD_SCHEMA["properties"][name] for name in _RENDER_OPTIONS},
+        mapping_handle=_STRING,
+        mapping={
+            "type": "array",
+            "minItems": 1,
+            "items": {"type": "object", "required": ["key", "value"], "properties": {"key": _STRING}},
+        },
+    ),
+}
+
+
+def compile_schema(schema):
+    """
+    Compile a schema dict into a validator function.
+
+    Args:
+        schema (dict): Schema using the keywords listed in the module docstring
+
+    Returns:
+        callable: validate(value, path, errors) appending error strings to errors.
+            path is a root string or a (parent, segment) chain that is only
+            formatted when an error is reported.
+    """
+    checks = []
+
+    types = schema.get("type")
+    if types is not None:
+        names = [types] if isinstance(types, str) else list(types)
+        type_checks = [_TYPE_CHECKS[name] for name in names]
+        expected = " or ".join(names)
+
+        def check_type(value, path, errors):
+            for type_check in type_checks:
+                if type_check(value):
+                    return True
+            errors.append(f"{_format_path(path)}: expected {expected}, got {type(value).__name__}")
+            return False
+    else:
+        def check_type(value, path, errors):
+            return True
+
+    enum = schema.get("enum")
+    if enum is not None:
+        allowed = frozenset(enum)
+        allowed_text = ", ".join(repr(value) for value in enum)
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{_format_path(path)}: must be one of {allowed_text}")
+        checks.append(check_enum)
+
+    fmt = schema.get("format")
+    if fmt is not None:
+        format_check, format_text = _FORMAT_CHECKS[fmt]
+
+        def check_format(value, path, errors):
+            if isinstance(value, str) and not format_check(value):
+                errors.append(f"{_format_path(path)}: must be {format_text}")
+        checks.append(check_format)
+
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_range(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{_format_path(path)}: must be >= {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{_format_path(path)}: must be <= {maximum}")
+        checks.append(check_range)
+
+    required = tuple(schema.get("required", ()))
+    properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    if required or properties:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{_format_path((path, name))}: is required")
+            for name, validate in properties.items():
+                if name in value:
+                    validate(value[name], (path, name), errors)
+        checks.append(check_object)
+
+    min_items = schema.get("minItems")
+    items = compile_schema(schema["items"]) if "items" in schema else None
+    if min_items is not None or items is not None:
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{_format_path(path)}: must have at least {min_items} item(s)")
+            if items is not None:
+                for i, item in enumerate(value):
+                    items(item, (path, i), errors)
+        checks.append(check_array)
+
+    checks = tuple(checks)
+
+    def validate(value, path, errors):
+        if check_type(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+
+    return validate
+
+
+_validate_lease_payload = compile_schema(LEASE_PAYLOAD_SCHEMA)
+
+
+def validate_lease_payload(payload):
+    """
+    Validate a lease payload against LEASE_PAYLOAD_SCHEMA.
+
+    Args:
+        payload: Decoded JSON payload
+
+    Returns:
+        list: Error messages; empty if the payload is valid
+    """
+    errors = []
+    _validate_lease_payload(payload, "$", errors)
+    return errors
+
+
+_validate_precomputed = compile_schema(PRECOMPUTED_MAPPING_SCHEMA)
+
+
+def validate_generate_payload(payload):
+    """
+    Validate a /api/generate-docx payload.
+
+    Payloads carrying a mapping_handle or mapping are checked against
+    PRECOMPUTED_MAPPING_SCHEMA, all others against LEASE_PAYLOAD_SCHEMA.
+
+    Args:
+        payload: Decoded JSON payload
+
+    Returns:
+        list: Error messages; empty if the payload is valid
+    """
+    if isinstance(payload, dict) and ("mapping_handle" in payload or "mapping" in payload):
+        errors = []
+        _validate_precomputed(payload, "$", errors)
+        return errors
+    return validate_lease_payload(payload)
+
+
+def validate_manifest(records):
+    """
+    Validate every record of a batch manifest.
+
+    Args:
+        records (list): Lease payloads
+
+    Returns:
+        list: Error messages prefixed with the record index; empty if all are valid
+    """
+    errors = []
+    for i, record in enumerate(records):
+        _validate_lease_payload(record, ("records", i), errors)
+    return errors
@@ -0,0 +1,294 @@
+"""
+Optional DOCX -> PDF conversion through a local LibreOffice install.
+
+Conversions run on a pool of long-lived converter slots (LEASE_PDF_WORKERS,
+default 2) instead of one soffice launch per document:
+
+- If the LibreOffice Python bridge (uno) is importable, each slot keeps a
+  headless soffice listening on a private pipe and converts over UNO.
+- Otherwise, if unoserver (2.x) is installed, each slot keeps a unoserver
+  (which keeps its own soffice running) and converts over its XML-RPC port.
+- Only when neither is available does each slot run "soffice --convert-to
+  pdf" per document, with its own persistent user profile.
+
+Results are cached on disk by a hash of the document content
+(LEASE_PDF_CACHE_DIR). The hash ignores ZIP entry metadata and the core
+properties' created / modified dates, so re-rendering an identical document
+is free in non-deterministic mode too.
+"""
+import hashlib
+import os
+import queue
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import xmlrpc.client
+import zipfile
+from io import BytesIO
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:  # optional dependency, shipped with LibreOffice
+    uno = None
+
+PDF_CACHE_DIR = os.environ.get(
+    'LEASE_PDF_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_cache'),
+)
+PDF_WORKERS = int(os.environ.get('LEASE_PDF_WORKERS', '2'))
+PDF_TIMEOUT = float(os.environ.get('LEASE_PDF_TIMEOUT', '120'))
+PDF_MIMETYPE = 'application/pdf'
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def find_soffice():
+    """
+    Locate the LibreOffice executable.
+
+    Returns:
+        str or None: Path to soffice (LEASE_SOFFICE overrides the PATH lookup)
+    """
+    return os.environ.get('LEASE_SOFFICE') or shutil.which('soffice') or shutil.which('libreoffice')
+
+
+def find_unoserver():
+    """
+    Locate the unoserver executable.
+
+    Returns:
+        str or None: Path to unoserver (LEASE_UNOSERVER overrides the PATH lookup)
+    """
+    return os.environ.get('LEASE_UNOSERVER') or shutil.which('unoserver')
+
+
+def is_available():
+    """Return True if a local converter is installed."""
+    return find_soffice() is not None
+
+
+def _uno_property(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _new_slot(index):
+    workdir = tempfile.mkdtemp(prefix=f'lease_pdf_{index}_')
+    return {
+        "index": index,
+        "workdir": workdir,
+        "profile_url": 'file://' + os.path.join(workdir, 'profile'),
+        "pipe": f"lease_pdf_{os.getpid()}_{index}",
+        "process": None,
+        "desktop": None,
+        "rpc": None,
+    }
+
+
+def _start_listener(slot, soffice):
+    """Start a headless soffice for the slot and connect to it over UNO."""
+    slot["process"] = subprocess.Popen(
+        [soffice, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+         f'-env:UserInstallation={slot["profile_url"]}',
+         f'--accept=pipe,name={slot["pipe"]};urp;StarOffice.ComponentContext'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local_ctx)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            ctx = resolver.resolve(f'uno:pipe,name={slot["pipe"]};urp;StarOffice.ComponentContext')
+            break
+        except Exception:
+            if time.monotonic() > deadline or slot["process"].poll() is not None:
+                raise RuntimeError("LibreOffice listener did not start")
+            time.sleep(0.25)
+    slot["desktop"] = ctx.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', ctx)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _start_unoserver(slot, soffice, unoserver):
+    """Start a unoserver for the slot and connect to its XML-RPC port."""
+    port = _free_port()
+    slot["process"] = subprocess.Popen(
+        [unoserver, '--interface', '127.0.0.1', '--port', str(port), '--uno-port', str(_free_port()),
+         '--executable', soffice, '--user-installation', slot["profile_url"]],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or slot["process"].poll() is not None:
+                raise RuntimeError("unoserver did not start")
+            time.sleep(0.25)
+    slot["rpc"] = xmlrpc.client.ServerProxy(f'http://127.0.0.1:{port}', allow_none=True)
+
+
+def _stop_listener(slot):
+    process = slot.get("process")
+    slot["process"] = None
+    slot["desktop"] = None
+    slot["rpc"] = None
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _convert_with_slot(slot, soffice, docx_path, pdf_path):
+    if uno is not None:
+        if slot["desktop"] is None or slot["process"].poll() is not None:
+            _start_listener(slot, soffice)
+        doc = slot["desktop"].loadComponentFromURL(
+            uno.systemPathToFileUrl(docx_path), '_blank', 0, (_uno_property('Hidden', True),))
+        try:
+            doc.storeToURL(uno.systemPathToFileUrl(pdf_path), (_uno_property('FilterName', 'writer_pdf_Export'),))
+        finally:
+            doc.close(True)
+        return
+    unoserver = find_unoserver()
+    if unoserver is not None:
+        if slot["rpc"] is None or slot["process"].poll() is not None:
+            _start_unoserver(slot, soffice, unoserver)
+        # convert(inpath, indata, outpath, convert_to)
+        slot["rpc"].convert(docx_path, None, pdf_path, 'pdf')
+        return
+    # Last resort: one soffice launch per document
+    subprocess.run(
+        [soffice, '--headless', '--norestore', f'-env:UserInstallation={slot["profile_url"]}',
+         '--convert-to', 'pdf', '--outdir', os.path.dirname(pdf_path), docx_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=PDF_TIMEOUT, check=True,
+    )
+
+
+def _get_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = queue.Queue()
+            for i in range(max(1, PDF_WORKERS)):
+                _slots.put(_new_slot(i))
+        return _slots
+
+
+def shutdown():
+    """Stop all converter processes."""
+    global _slots
+    with _slots_lock:
+        slots, _slots = _slots, None
+    if slots is None:
+        return
+    while not slots.empty():
+        slot = slots.get_nowait()
+        _stop_listener(slot)
+        shutil.rmtree(slot["workdir"], ignore_errors=True)
+
+
+_CORE_DATES = re.compile(rb'<dcterms:(created|modified)\b[^>]*>[^<]*</dcterms:\1>')
+
+
+def content_key(docx_bytes):
+    """
+    Hash the content of a DOCX for the PDF cache.
+
+    Entry names and contents are hashed in name order; ZIP metadata (dates,
+    attributes, compression) and the core properties' created / modified
+    dates are left out, since none of them change the rendered PDF.
+
+    Args:
+        docx_bytes (bytes): DOCX file content
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    try:
+        with zipfile.ZipFile(BytesIO(docx_bytes)) as archive:
+            for name in sorted(archive.namelist()):
+                data = archive.read(name)
+                if name == 'docProps/core.xml':
+                    data = _CORE_DATES.sub(b'', data)
+                digest.update(b'%d:%s%d:' % (len(name), name.encode('utf-8'), len(data)))
+                digest.update(data)
+    except zipfile.BadZipFile:
+        return hashlib.sha256(docx_bytes).hexdigest()
+    return digest.hexdigest()
+
+
+def _cache_path(digest):
+    return os.path.join(PDF_CACHE_DIR, digest[:2], f"{digest}.pdf")
+
+
+def docx_to_pdf(docx_bytes, timeout=PDF_TIMEOUT):
+    """
+    Convert DOCX bytes to PDF, using the content_key() cache when possible.
+
+    Args:
+        docx_bytes (bytes): DOCX file content
+        timeout (float): Seconds to wait for a free converter slot
+
+    Returns:
+        tuple: (success: bool, pdf_bytes: bytes or None, error_message: str)
+    """
+    digest = content_key(docx_bytes)
+    cache_path = _cache_path(digest)
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            print(f"[DEBUG] PDF cache hit for {digest[:16]}")
+            return True, f.read(), ""
+
+    soffice = find_soffice()
+    if soffice is None:
+        return False, None, "PDF conversion unavailable: LibreOffice (soffice) not found"
+
+    slots = _get_slots()
+    try:
+        slot = slots.get(timeout=timeout)
+    except queue.Empty:
+        return False, None, "PDF conversion timed out waiting for a converter"
+    try:
+        docx_path = os.path.join(slot["workdir"], f"{digest}.docx")
+        pdf_path = os.path.join(slot["workdir"], f"{digest}.pdf")
+        with open(docx_path, 'wb') as f:
+            f.write(docx_bytes)
+        try:
+            _convert_with_slot(slot, soffice, docx_path, pdf_path)
+            with open(pdf_path, 'rb') as f:
+                pdf_bytes = f.read()
+        except Exception as e:
+            # A failed listener is restarted on the next conversion
+            _stop_listener(slot)
+            return False, None, f"PDF conversion failed: {str(e)}"
+        finally:
+            for path in (docx_path, pdf_path):
+                if os.path.exists(path):
+                    os.remove(path)
+    finally:
+        slots.put(slot)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, cache_path)
+    print(f"[DEBUG] Converted {digest[:16]} to PDF ({len(pdf_bytes)} bytes)")
+    return True, pdf_bytes, ""
@@ -0,0 +1,235 @@
+"""
+Opt-in profiling of lease generation.
+
+A profiled run captures, for each pipeline stage (mapping, render), a
+cProfile of the calling thread and a tracemalloc snapshot diff, and stores
+them under LEASE_PROFILE_DIR (default: ./profiles):
+
+    <profile id>/meta.json            label, timings, memory peaks
+    <profile id>/<stage>.prof         cProfile data (load with pstats / snakeviz)
+    <profile id>/<stage>.txt          top functions by cumulative time
+    <profile id>/<stage>.memory.txt   top allocation sites during the stage
+
+Profiling is enabled per request (PROFILE_HEADER) or by sampling
+(LEASE_PROFILE_SAMPLE_RATE, 0.0 - 1.0, default 0). Profiled stages are
+serialized within a process, so concurrent profiled requests wait for each
+other. tracemalloc is process wide, so allocations of concurrent unprofiled
+requests still show up in a profiled stage's memory figures (noted in
+<stage>.memory.txt). Only the newest LEASE_PROFILE_KEEP profiles are kept.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+import zipfile
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+PROFILE_DIR = os.environ.get(
+    'LEASE_PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'),
+)
+PROFILE_SAMPLE_RATE = float(os.environ.get('LEASE_PROFILE_SAMPLE_RATE', '0'))
+PROFILE_KEEP = int(os.environ.get('LEASE_PROFILE_KEEP', '200'))
+PROFILE_HEADER = 'X-Lease-Profile'
+PROFILE_TOP_N = 40
+
+_PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{6}_[0-9a-f]{8}$')
+
+_stage_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def should_profile(requested=False):
+    """
+    Decide whether to profile a run.
+
+    Args:
+        requested (bool): Profiling explicitly requested (header / CLI flag)
+
+    Returns:
+        bool: True if the run should be profiled
+    """
+    return bool(requested) or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class ProfileCapture:
+    """Collects per-stage profiles for one run; save() writes them to PROFILE_DIR."""
+
+    def __init__(self, label):
+        now = datetime.now(timezone.utc)
+        self.id = f"{now.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.created_at = now.isoformat()
+        self.stages = {}
+        self._files = {}
+
+    @contextmanager
+    def stage(self, name):
+        # Profiled stages run one at a time: tracemalloc's peak and snapshots
+        # are process wide, and only one cProfile may be active (Python 3.12+)
+        with _stage_lock:
+            _start_tracemalloc()
+            try:
+                before = tracemalloc.take_snapshot()
+                tracemalloc.reset_peak()
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+                    elapsed = time.perf_counter() - start
+                    current, peak = tracemalloc.get_traced_memory()
+                    after = tracemalloc.take_snapshot()
+                    self._record(name, profiler, before, after, elapsed, peak)
+            finally:
+                _stop_tracemalloc()
+
+    def _record(self, name, profiler, before, after, elapsed, peak):
+        profiler.create_stats()
+        self._files[f"{name}.prof"] = profiler
+
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+        self._files[f"{name}.txt"] = text.getvalue()
+
+        diff = after.compare_to(before, 'lineno')
+        allocated = sum(stat.size_diff for stat in diff)
+        lines = [f"{name}: {allocated / 1024:.1f} KiB net allocated, peak {peak / 1024:.1f} KiB",
+                 "(process wide: includes allocations of requests running concurrently)", ""]
+        lines.extend(str(stat) for stat in diff[:PROFILE_TOP_N])
+        self._files[f"{name}.memory.txt"] = "\n".join(lines) + "\n"
+
+        self.stages[name] = {
+            "seconds": round(elapsed, 6),
+            "peak_bytes": peak,
+            "allocated_bytes": allocated,
+        }
+
+    def save(self, **extra):
+        """
+        Write the captured stages to PROFILE_DIR.
+
+        Args:
+            **extra: Additional metadata (e.g. status, output name)
+
+        Returns:
+            dict: Profile metadata
+        """
+        meta = {"id": self.id, "label": self.label, "created_at": self.created_at, "stages": self.stages}
+        meta.update(extra)
+        directory = os.path.join(PROFILE_DIR, self.id)
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in self._files.items():
+            path = os.path.join(directory, filename)
+            if isinstance(content, cProfile.Profile):
+                content.dump_stats(path)
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        _prune()
+        print(f"[DEBUG] Saved profile {self.id} ({self.label})")
+        return meta
+
+
+class _NoCapture:
+    """Stand-in used when a run is not profiled."""
+
+    id = None
+
+    def stage(self, name):
+        return nullcontext()
+
+    def save(self, **extra):
+        return None
+
+
+def capture_for(label, requested=False):
+    """
+    Get a capture for a run: a ProfileCapture if it is profiled, else a no-op.
+
+    Args:
+        label (str): Description of the run (endpoint, batch record)
+        requested (bool): Profiling explicitly requested
+
+    Returns:
+        ProfileCapture or no-op capture with the same interface
+    """
+    if should_profile(requested):
+        return ProfileCapture(label)
+    return _NoCapture()
+
+
+def _prune():
+    profile_ids = sorted(name for name in os.listdir(PROFILE_DIR) if _PROFILE_ID.match(name))
+    for profile_id in profile_ids[:max(0, len(profile_ids) - PROFILE_KEEP)]:
+        shutil.rmtree(os.path.join(PROFILE_DIR, profile_id), ignore_errors=True)
+
+
+def list_profiles():
+    """
+    List stored profiles, newest first.
+
+    Returns:
+        list: Profile metadata dicts
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        meta_path = os.path.join(PROFILE_DIR, name, 'meta.json')
+        if _PROFILE_ID.match(name) and os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def profile_archive(profile_id):
+    """
+    Zip a stored profile for download.
+
+    Args:
+        profile_id (str): Profile id
+
+    Returns:
+        bytes or None: ZIP archive of the profile directory
+    """
+    if not _PROFILE_ID.match(profile_id or ''):
+        return None
+    directory = os.path.join(PROFILE_DIR, profile_id)
+    if not os.path.isdir(directory):
+        return None
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as z:
+        for filename in sorted(os.listdir(directory)):
+            z.write(os.path.join(directory, filename), f"{profile_id}/{filename}")
+    return out.getvalue()
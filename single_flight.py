@@ -0,0 +1,121 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+A double-clicked Generate button or a client retrying on timeout sends the
+same /api/generate-docx request several times at once. run() lets the first
+caller for a key (the leader) do the work while concurrent callers with the
+same key wait for it and share its outcome, result or exception. A waiting
+caller gives up after its timeout with Overloaded(503), like a request
+waiting for an admission slot. Nothing is kept once the leader finishes: a
+later identical request renders again.
+
+Coalescing is per worker process. Set LEASE_SINGLE_FLIGHT=0 to disable it.
+"""
+import copy
+import hashlib
+import json
+import math
+import os
+import threading
+
+from admission import Overloaded
+
+SINGLE_FLIGHT_ENABLED = os.environ.get('LEASE_SINGLE_FLIGHT', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+_lock = threading.Lock()
+_calls = {}
+_stats = {"leaders": 0, "shared": 0, "timed_out": 0}
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def request_key(*parts):
+    """
+    Build a coalescing key from JSON-serializable parts.
+
+    Dict keys are sorted, so payloads that differ only in key order share a key.
+
+    Args:
+        *parts: Payload, options, template identities, ...
+
+    Returns:
+        str: Hex digest
+    """
+    normalized = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _copy_error(error):
+    """A copy of the leader's exception to raise in a waiting thread (tracebacks are per raise)."""
+    try:
+        return copy.copy(error)
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def run(key, fn, timeout=None):
+    """
+    Run fn() once for all concurrent callers with the same key.
+
+    Args:
+        key (str): Key from request_key()
+        fn: Zero-argument callable doing the work
+        timeout (float): Longest time in seconds a waiting caller waits for
+            the leader (None: no limit)
+
+    Returns:
+        tuple: (fn's result, shared) where shared is True if this caller
+            waited on another caller's run; a copy of fn's exception is
+            raised in every waiting caller
+
+    Raises:
+        Overloaded: A waiting caller's timeout ran out (503)
+    """
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+            _stats["leaders"] += 1
+        else:
+            _stats["shared"] += 1
+
+    if not leader:
+        if not call.done.wait(timeout):
+            with _lock:
+                _stats["timed_out"] += 1
+            raise Overloaded(503, "Timed out waiting for an identical request in progress; retry later",
+                             max(1, math.ceil(timeout or 0)))
+        if call.error is not None:
+            raise _copy_error(call.error) from call.error
+        return call.result, True
+
+    try:
+        call.result = fn()
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            del _calls[key]
+        call.done.set()
+    return call.result, False
+
+
+def stats():
+    """
+    Coalescing counters for this process.
+
+    Returns:
+        dict: leaders (runs executed), shared (callers that waited on another
+            run), timed_out (of those, gave up waiting), in_flight
+    """
+    with _lock:
+        return dict(_stats, in_flight=len(_calls))
@@ -0,0 +1,358 @@
+"""
+DOCX template registry.
+
+Templates are uploaded once and referenced by id afterwards. On upload the
+DOCX is parsed and its [Placeholder] tokens are indexed. The parsed document
+is kept frozen in memory and every render works on its own clone of it
+(get_working_copy), so generation requests never re-read or re-parse a file
+and concurrent requests never share a mutable tree.
+
+Uploaded templates are also written to LEASE_TEMPLATE_DIR (default:
+./template_registry) and reloaded by load_registry() on startup. In
+multi-worker deployments a read-only template_store can be attached instead
+(attach_store); its templates are parsed lazily from the shared mapping.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+
+from docx.oxml.ns import qn
+
+from docx_clone import clone_document, load_frozen_document
+from docx_stories import iter_story_paragraph_elements
+from fanout import safe_filename
+from template_store import open_template_stream
+
+TEMPLATE_REGISTRY_DIR = os.environ.get(
+    'LEASE_TEMPLATE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template_registry'),
+)
+
+PLACEHOLDER_PATTERN = re.compile(r'\[[^\[\]\r\n]+\]')
+_TEMPLATE_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+_templates = {}
+_lock = threading.Lock()
+
+# Preloaded template files: absolute path -> (mtime_ns, size, frozen document)
+_path_documents = {}
+
+
+def index_placeholders(doc):
+    """
+    Collect every [Placeholder] token in a document.
+
+    Every story part is searched (body, headers, footers, notes, comments,
+    text boxes). Paragraph text is joined across runs first, so placeholders
+    split over several runs are found too.
+
+    Args:
+        doc: python-docx Document
+
+    Returns:
+        list: Sorted unique placeholder strings
+    """
+    t_tag = qn('w:t')
+    found = set()
+    for _, p in iter_story_paragraph_elements(doc, writeback=False):
+        text = ''.join(t.text or '' for t in p.iter(t_tag))
+        if '[' in text:
+            found.update(PLACEHOLDER_PATTERN.findall(text))
+    return sorted(found)
+
+
+def _public(entry):
+    return {key: value for key, value in entry.items() if key not in ('data', 'document', 'store', 'parse_lock')}
+
+
+def register_template(data, name=None, persist=True):
+    """
+    Parse, index and register a DOCX template.
+
+    Args:
+        data (bytes): DOCX file content
+        name (str): Display name (usually the uploaded file name); reduced
+            to a plain file name with fanout.safe_filename()
+        persist (bool): Also write the template to TEMPLATE_REGISTRY_DIR
+
+    Returns:
+        dict: Template metadata (id, name, size, placeholders, uploaded_at)
+
+    Raises:
+        ValueError: If the data is not a readable DOCX file
+    """
+    template_id = hashlib.sha256(data).hexdigest()[:16]
+    with _lock:
+        existing = _templates.get(template_id)
+    if existing is not None:
+        return _public(existing)
+
+    try:
+        doc = load_frozen_document(data)
+    except Exception as e:
+        raise ValueError(f"Not a valid DOCX template: {str(e)}")
+
+    entry = {
+        "id": template_id,
+        "name": safe_filename(name or '', f"{template_id}.docx"),
+        "size": len(data),
+        "placeholders": index_placeholders(doc),
+        "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        "data": data,
+        "document": doc,
+    }
+    print(f"[DEBUG] Registered template {template_id} ({entry['name']}) with {len(entry['placeholders'])} placeholders")
+
+    if persist:
+        os.makedirs(TEMPLATE_REGISTRY_DIR, exist_ok=True)
+        with open(os.path.join(TEMPLATE_REGISTRY_DIR, f"{template_id}.docx"), 'wb') as f:
+            f.write(data)
+        with open(os.path.join(TEMPLATE_REGISTRY_DIR, f"{template_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(_public(entry), f)
+
+    with _lock:
+        _templates[template_id] = entry
+    return _public(entry)
+
+
+def load_registry(directory=None):
+    """
+    Load previously uploaded templates from disk.
+
+    Args:
+        directory (str): Registry directory (default TEMPLATE_REGISTRY_DIR)
+
+    Returns:
+        int: Number of templates loaded
+    """
+    directory = directory or TEMPLATE_REGISTRY_DIR
+    if not os.path.isdir(directory):
+        return 0
+    loaded = 0
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.docx'):
+            continue
+        try:
+            register_template(*_read_stored(directory, filename), persist=False)
+            loaded += 1
+        except ValueError as e:
+            print(f"[WARNING] Skipping template {filename}: {str(e)}")
+    return loaded
+
+
+def load_template(template_id, directory=None):
+    """
+    Get a template by id, loading it from the registry directory if this
+    process has not registered it yet (e.g. batch runs).
+
+    Args:
+        template_id (str): Template id
+        directory (str): Registry directory (default TEMPLATE_REGISTRY_DIR)
+
+    Returns:
+        dict or None: Template metadata, None if the id is unknown
+
+    Raises:
+        ValueError: If the stored file is not a readable DOCX file
+    """
+    meta = get_template(template_id)
+    if meta is not None or not _TEMPLATE_ID_PATTERN.match(template_id or ''):
+        return meta
+    directory = directory or TEMPLATE_REGISTRY_DIR
+    filename = f"{template_id}.docx"
+    if not os.path.exists(os.path.join(directory, filename)):
+        return None
+    return register_template(*_read_stored(directory, filename), persist=False)
+
+
+def _read_stored(directory, filename):
+    """Return (bytes, display name) of a template file in a registry directory."""
+    meta_path = os.path.join(directory, filename[:-5] + '.json')
+    name = None
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            name = json.load(f).get('name')
+    with open(os.path.join(directory, filename), 'rb') as f:
+        data = f.read()
+    return data, name
+
+
+def attach_store(store):
+    """
+    Register every template of a mapped template store.
+
+    Raw bytes stay in the shared mapping; each template is parsed on first
+    use by this worker.
+
+    Args:
+        store (dict): Result of template_store.open_store()
+
+    Returns:
+        int: Number of templates attached
+    """
+    with _lock:
+        for template_id, meta in store["index"].items():
+            if template_id in _templates:
+                continue
+            _templates[template_id] = {
+                "id": template_id,
+                "name": meta["name"],
+                "size": meta["size"],
+                "placeholders": meta["placeholders"],
+                "uploaded_at": None,
+                "data": None,
+                "document": None,
+                "store": store,
+                "parse_lock": threading.Lock(),
+            }
+    return len(store["index"])
+
+
+def _frozen_document(entry):
+    """
+    Return the entry's frozen document, parsing it from the store on first use.
+
+    The parse holds only the entry's own lock, so first use of one template
+    does not block lookups or renders of the others.
+    """
+    if entry["document"] is None:
+        with entry["parse_lock"]:
+            if entry["document"] is None:
+                stream = open_template_stream(entry["store"], entry["id"])
+                try:
+                    entry["document"] = load_frozen_document(stream)
+                finally:
+                    stream.close()
+    return entry["document"]
+
+
+def get_template(template_id):
+    """
+    Get template metadata by id.
+
+    Args:
+        template_id (str): Template id
+
+    Returns:
+        dict or None: Template metadata
+    """
+    with _lock:
+        entry = _templates.get(template_id)
+    return _public(entry) if entry else None
+
+
+def get_template_bytes(template_id):
+    """
+    Get the DOCX bytes of a registered template.
+
+    Args:
+        template_id (str): Template id
+
+    Returns:
+        bytes or None: DOCX content
+    """
+    with _lock:
+        entry = _templates.get(template_id)
+    if not entry:
+        return None
+    if entry["data"] is None:
+        stream = open_template_stream(entry["store"], template_id)
+        try:
+            return stream.read()
+        finally:
+            stream.close()
+    return entry["data"]
+
+
+def get_working_copy(template_id):
+    """
+    Get an isolated, editable copy of a registered template.
+
+    Args:
+        template_id (str): Template id
+
+    Returns:
+        Document or None: Clone of the frozen template document
+    """
+    with _lock:
+        entry = _templates.get(template_id)
+    return clone_document(_frozen_document(entry)) if entry else None
+
+
+def preload_path(path):
+    """
+    Parse a template file on disk once and keep it frozen for get_path_working_copy().
+
+    Args:
+        path (str): DOCX file path
+
+    Returns:
+        Document: Frozen template document
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    doc = load_frozen_document(path)
+    with _lock:
+        _path_documents[path] = (stat.st_mtime_ns, stat.st_size, doc)
+    print(f"[DEBUG] Preloaded template file {path}")
+    return doc
+
+
+def get_path_working_copy(path):
+    """
+    Get a working copy of a preloaded template file.
+
+    The file is parsed again if it changed on disk since it was preloaded.
+
+    Args:
+        path (str): DOCX file path
+
+    Returns:
+        Document or None: Clone of the frozen document, None if the path was not preloaded
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        cached = _path_documents.get(path)
+    if cached is None:
+        return None
+    stat = os.stat(path)
+    mtime_ns, size, doc = cached
+    if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+        doc = preload_path(path)
+    return clone_document(doc)
+
+
+def list_templates():
+    """
+    List registered templates.
+
+    Returns:
+        list: Template metadata dicts
+    """
+    with _lock:
+        entries = list(_templates.values())
+    return [_public(entry) for entry in entries]
+
+
+def delete_template(template_id):
+    """
+    Remove a template from the registry and from disk.
+
+    Args:
+        template_id (str): Template id
+
+    Returns:
+        bool: True if the template existed
+    """
+    if not _TEMPLATE_ID_PATTERN.match(template_id or ''):
+        return False
+    with _lock:
+        entry = _templates.pop(template_id, None)
+    for ext in ('.docx', '.json'):
+        path = os.path.join(TEMPLATE_REGISTRY_DIR, template_id + ext)
+        if os.path.exists(path):
+            os.remove(path)
+    return entry is not None
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped, read-only template store for multi-worker deployments.
+
+The store is a single file holding the raw DOCX bytes of every template and
+its precomputed placeholder index:
+
+    b"LTSTORE1" | header length (8 bytes, little endian) | header JSON | blobs
+
+It is built once (build_store / ensure_store) and every worker process maps
+it read-only with open_store(). Template bytes are read straight from the
+shared page cache through open_template_stream(), so N workers hold one copy
+of the raw templates instead of N.
+
+Usage:
+    python template_store.py build templates.store file1.docx file2.docx ...
+    python template_store.py build templates.store --from-dir template_registry
+"""
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+STORE_MAGIC = b"LTSTORE1"
+_HEADER_LENGTH = struct.Struct('<Q')
+
+
+def build_store(path, templates):
+    """
+    Write a template store file.
+
+    The file is written to a temporary name and moved into place, so workers
+    never map a half-written store.
+
+    Args:
+        path (str): Store file path
+        templates (list): Dicts with "data" (bytes), optional "name" and
+            "placeholders"; the id is the content hash, as in template_registry
+
+    Returns:
+        dict: Header index (template id -> metadata with offset and length)
+    """
+    index = {}
+    blobs = []
+    offset = 0
+    for template in templates:
+        data = template["data"]
+        template_id = hashlib.sha256(data).hexdigest()[:16]
+        if template_id in index:
+            continue
+        index[template_id] = {
+            "id": template_id,
+            "name": template.get("name") or f"{template_id}.docx",
+            "size": len(data),
+            "placeholders": template.get("placeholders", []),
+            "offset": offset,
+            "length": len(data),
+        }
+        blobs.append(data)
+        offset += len(data)
+
+    header = json.dumps(index).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.store-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(STORE_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, path)
+    print(f"[DEBUG] Built template store {path} with {len(index)} templates ({offset} bytes)")
+    return index
+
+
+def open_store(path):
+    """
+    Map a template store read-only.
+
+    Args:
+        path (str): Store file path
+
+    Returns:
+        dict: {"mmap": mmap, "index": {id: metadata}, "base": offset of the first blob}
+
+    Raises:
+        ValueError: If the file is not a template store
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(STORE_MAGIC)] != STORE_MAGIC:
+        mapped.close()
+        raise ValueError(f"{path} is not a template store")
+    start = len(STORE_MAGIC)
+    (header_length,) = _HEADER_LENGTH.unpack(mapped[start:start + _HEADER_LENGTH.size])
+    start += _HEADER_LENGTH.size
+    index = json.loads(mapped[start:start + header_length])
+    return {"mmap": mapped, "index": index, "base": start + header_length}
+
+
+class MappedTemplateStream(io.RawIOBase):
+    """Read-only, seekable file object over one template's bytes in the store."""
+
+    def __init__(self, mapped, offset, length):
+        super().__init__()
+        self._view = memoryview(mapped)[offset:offset + length]
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        else:
+            pos = len(self._view) + offset
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer):
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_template_stream(store, template_id):
+    """
+    Open a template in a mapped store as a file object, without copying it.
+
+    Args:
+        store (dict): Result of open_store()
+        template_id (str): Template id
+
+    Returns:
+        io.BufferedReader or None: Stream over the template bytes
+    """
+    meta = store["index"].get(template_id)
+    if meta is None:
+        return None
+    raw = MappedTemplateStream(store["mmap"], store["base"] + meta["offset"], meta["length"])
+    return io.BufferedReader(raw)
+
+
+def ensure_store(path, directory):
+    """
+    Build the store from a registry directory if it is missing or out of date.
+
+    The store is rebuilt when the directory, or any file in it, was modified
+    after the store was written.
+
+    Args:
+        path (str): Store file path
+        directory (str): Registry directory with <id>.docx / <id>.json files
+
+    Returns:
+        dict: Result of open_store()
+    """
+    if not os.path.exists(path) or _directory_mtime_ns(directory) > os.stat(path).st_mtime_ns:
+        build_store(path, _templates_from_directory(directory))
+    return open_store(path)
+
+
+def _directory_mtime_ns(directory):
+    if not os.path.isdir(directory):
+        return 0
+    latest = os.stat(directory).st_mtime_ns
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+def _templates_from_directory(directory):
+    from template_registry import index_placeholders
+    from docx_clone import load_frozen_document
+
+    templates = []
+    if not os.path.isdir(directory):
+        return templates
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.docx'):
+            continue
+        with open(os.path.join(directory, filename), 'rb') as f:
+            data = f.read()
+        name = filename
+        meta_path = os.path.join(directory, filename[:-5] + '.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                name = json.load(f).get('name') or filename
+        templates.append({"data": data, "name": name, "placeholders": index_placeholders(load_frozen_document(data))})
+    return templates
+
+
+def _templates_from_files(paths):
+    from template_registry import index_placeholders
+    from docx_clone import load_frozen_document
+
+    templates = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        templates.append({"data": data, "name": os.path.basename(path), "placeholders": index_placeholders(load_frozen_document(data))})
+    return templates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a memory-mapped template store.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="Build a store from DOCX files or a registry directory")
+    build.add_argument('store')
+    build.add_argument('files', nargs='*')
+    build.add_argument('--from-dir', help="Registry directory (LEASE_TEMPLATE_DIR layout)")
+    args = parser.parse_args(argv)
+
+    templates = _templates_from_files(args.files)
+    if args.from_dir:
+        templates.extend(_templates_from_directory(args.from_dir))
+    if not templates:
+        print("[ERROR] No templates given", file=sys.stderr)
+        return 2
+    build_store(args.store, templates)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
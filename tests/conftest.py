@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def lease_payload():
+    return {
+        "document_name": "Test Lease",
+        "grantor_type": "individual",
+        "grantor_name": "Jane Roe",
+        "owner_type": "Sole owner",
+        "number_of_grantor_signatures": 1,
+        "state": "Washington",
+        "county": "Spokane",
+        "total_acres": 30,
+        "number_of_parcels": 2,
+        "parcels": [
+            {"apn": "16174.901", "acres": 10, "legal_description": "LOT 1", "isPortion": False},
+            {"apn": "16174.902", "acres": 20, "isPortion": True},
+        ],
+    }
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+import admission
+
+
+def _hold(limiter, count):
+    """Occupy count slots from background threads; returns (release event, threads)."""
+    release = threading.Event()
+    entered = threading.Semaphore(0)
+
+    def hold():
+        with limiter.slot():
+            entered.release()
+            release.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert entered.acquire(timeout=5)
+    return release, threads
+
+
+def test_parse_deadline():
+    assert admission.parse_deadline("2.5") == 2.5
+    assert admission.parse_deadline("0") == 0.0
+    for value in (None, "", "soon", "-1", "nan", "inf"):
+        assert admission.parse_deadline(value) is None
+
+
+def test_requests_within_concurrency_are_admitted():
+    limiter = admission.Limiter('test', concurrency=2, max_queue=0)
+    with limiter.slot(), limiter.slot():
+        assert limiter.stats()["active"] == 2
+    stats = limiter.stats()
+    assert (stats["active"], stats["admitted"], stats["queued"]) == (0, 2, 0)
+
+
+def test_full_queue_is_rejected_with_429():
+    limiter = admission.Limiter('test', concurrency=1, max_queue=0)
+    release, threads = _hold(limiter, 1)
+    with pytest.raises(admission.Overloaded) as excinfo:
+        with limiter.slot():
+            pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert excinfo.value.status == 429
+    assert excinfo.value.retry_after >= 1
+    assert limiter.stats()["rejected_queue_full"] == 1
+
+
+def test_wait_past_the_deadline_is_rejected_with_503():
+    limiter = admission.Limiter('test', concurrency=1, max_queue=4, queue_timeout=10)
+    release, threads = _hold(limiter, 1)
+    with pytest.raises(admission.Overloaded) as excinfo:
+        with limiter.slot(deadline=0.05):
+            pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert excinfo.value.status == 503
+    stats = limiter.stats()
+    assert (stats["rejected_timeout"], stats["queue_depth"], stats["active"]) == (1, 0, 0)
+
+
+def test_deadline_is_capped_at_the_queue_timeout():
+    limiter = admission.Limiter('test', concurrency=1, max_queue=1, queue_timeout=3)
+    assert limiter.wait_timeout(None) == 3
+    assert limiter.wait_timeout(1.5) == 1.5
+    assert limiter.wait_timeout(60) == 3
+
+
+def test_queued_requests_are_served_in_order():
+    limiter = admission.Limiter('test', concurrency=1, max_queue=3)
+    release, holders = _hold(limiter, 1)
+    order = []
+
+    def wait(i):
+        with limiter.slot():
+            order.append(i)
+
+    waiters = []
+    for i in range(3):
+        waiters.append(threading.Thread(target=wait, args=(i,)))
+        waiters[-1].start()
+        while limiter.stats()["queue_depth"] < i + 1:
+            threading.Event().wait(0.001)
+    release.set()
+    for thread in holders + waiters:
+        thread.join()
+    assert order == [0, 1, 2]
+    assert limiter.stats()["active"] == 0
+
+
+def test_disabled_limiter_admits_everything():
+    limiter = admission.Limiter('test', concurrency=0, max_queue=0)
+    with limiter.slot(), limiter.slot(), limiter.slot():
+        pass
+    assert limiter.stats()["admitted"] == 0
+
+
+def test_overloaded_response_carries_retry_after():
+    import app as app_module
+
+    with app_module.app.test_request_context():
+        body, status, headers = app_module._overloaded(admission.Overloaded(429, "busy", 4))
+    assert status == 429
+    assert headers == {"Retry-After": "4"}
+    assert body.get_json() == {"error": "busy"}
@@ -0,0 +1,75 @@
+import io
+import os
+
+import pytest
+from docx import Document
+
+from batch import output_filename_for, run_batch
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Lease for [Grantor Name], [County] County")
+    path = tmp_path / "template.docx"
+    doc.save(str(path))
+    return str(path)
+
+
+def test_output_filename_is_sanitized():
+    assert output_filename_for({"document_name": "A/B: lease"}, 0) == "A_B_ lease.docx"
+    assert output_filename_for({}, 4) == "lease_5.docx"
+
+
+def test_records_with_the_same_name_do_not_overwrite(tmp_path, template_path, lease_payload):
+    out_dir = str(tmp_path / "out")
+    summary = run_batch([lease_payload, dict(lease_payload), dict(lease_payload, grantor_name="Other")],
+                        template_path, out_dir)
+    outputs = [result["output"] for result in summary["results"]]
+    assert [os.path.basename(path) for path in outputs] == ["Test Lease.docx", "Test Lease-2.docx", "Test Lease-3.docx"]
+    assert sorted(os.listdir(out_dir)) == sorted(os.path.basename(path) for path in outputs)
+    assert "Other" in "\n".join(p.text for p in Document(outputs[2]).paragraphs)
+
+
+def test_invalid_manifest_renders_nothing(tmp_path, template_path, lease_payload):
+    summary = run_batch([lease_payload, {"parcels": []}], template_path, str(tmp_path / "out"))
+    assert summary["validation_errors"] == ["records[1].parcels: must have at least 1 item(s)"]
+    assert not os.path.exists(tmp_path / "out")
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    import template_registry
+
+    directory = tmp_path / "registry"
+    monkeypatch.setattr(template_registry, 'TEMPLATE_REGISTRY_DIR', str(directory))
+    doc = Document()
+    doc.add_paragraph("Memorandum for [Grantor Name]")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    meta = template_registry.register_template(buffer.getvalue(), name="memorandum.docx")
+    # Batch processes load registry templates from disk
+    monkeypatch.delitem(template_registry._templates, meta["id"])
+    return meta["id"]
+
+
+def test_template_ids_render_from_the_registry(tmp_path, template_path, lease_payload, registry_dir):
+    out_dir = str(tmp_path / "out")
+    records = [dict(lease_payload, template_id=registry_dir),
+               dict(lease_payload, document_name="Fan", templates=[{"template_id": registry_dir}, {}])]
+    summary = run_batch(records, template_path, out_dir)
+    assert [result["error"] for result in summary["results"]] == [None, None]
+    first = Document(summary["results"][0]["output"])
+    assert first.paragraphs[0].text == "Memorandum for Jane Roe"
+    fanned = summary["results"][1]["outputs"]
+    assert [os.path.basename(path) for path in fanned] == ["Fan - memorandum.docx", "Fan - template.docx"]
+    assert Document(fanned[0]).paragraphs[0].text == "Memorandum for Jane Roe"
+    assert Document(fanned[1]).paragraphs[0].text.startswith("Lease for Jane Roe")
+
+
+def test_unknown_template_ids_fail_validation(tmp_path, template_path, lease_payload):
+    records = [lease_payload, dict(lease_payload, templates=[{"template_path": template_path},
+                                                              {"template_id": "0123456789abcdef"}])]
+    summary = run_batch(records, template_path, str(tmp_path / "out"))
+    assert summary["validation_errors"] == ["records[1].templates[1].template_id: unknown template_id '0123456789abcdef'"]
+    assert summary["results"] == []
@@ -0,0 +1,63 @@
+import io
+import time
+import zipfile
+
+from docx import Document
+
+from deterministic_output import DETERMINISTIC_TIMESTAMP, normalize_docx_zip, stabilize_core_properties
+from lease_pipeline import build_mapping, enrich, render
+
+
+def _template():
+    doc = Document()
+    doc.add_paragraph("Lease for [Grantor Name], [County] County, [State]")
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def test_normalize_fixes_zip_metadata():
+    normalized = normalize_docx_zip(_template(), "2024-05-01T12:30:00Z")
+    with zipfile.ZipFile(io.BytesIO(normalized)) as z:
+        infos = z.infolist()
+    assert {info.date_time for info in infos} == {(2024, 5, 1, 12, 30, 0)}
+    assert {info.compress_type for info in infos} == {zipfile.ZIP_DEFLATED}
+    assert len({(info.create_system, info.external_attr) for info in infos}) == 1
+
+
+def test_normalize_is_idempotent_and_keeps_entries():
+    original = _template()
+    once = normalize_docx_zip(original)
+    assert normalize_docx_zip(once) == once
+    with zipfile.ZipFile(io.BytesIO(original)) as a, zipfile.ZipFile(io.BytesIO(once)) as b:
+        assert a.namelist() == b.namelist()
+        assert all(a.read(name) == b.read(name) for name in a.namelist())
+
+
+def test_normalize_clamps_dates_before_the_zip_epoch():
+    normalized = normalize_docx_zip(_template(), "1970-01-01T00:00:00Z")
+    with zipfile.ZipFile(io.BytesIO(normalized)) as z:
+        assert {info.date_time for info in z.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+
+def test_same_document_saved_at_different_times_gives_same_bytes():
+    outputs = []
+    for _ in range(2):
+        doc = Document(io.BytesIO(_template()))
+        stabilize_core_properties(doc)
+        out = io.BytesIO()
+        doc.save(out)
+        outputs.append(normalize_docx_zip(out.getvalue()))
+        time.sleep(1.1)  # ZIP dates have two-second resolution
+    assert outputs[0] == outputs[1]
+
+
+def test_deterministic_render_is_byte_stable(lease_payload):
+    results = []
+    for _ in range(2):
+        mapping = build_mapping(enrich(lease_payload, deterministic=True))
+        ok, docx_bytes, err = render(io.BytesIO(_template()), mapping, exhibit_images=False,
+                                     deterministic=True, timestamp=DETERMINISTIC_TIMESTAMP)
+        assert ok, err
+        results.append(docx_bytes)
+    assert results[0] == results[1]
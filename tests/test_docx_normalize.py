@@ -0,0 +1,46 @@
+import io
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from docx_normalize import normalize_document
+from lease_pipeline import build_mapping, enrich, render
+
+
+def _fragmented_template(path):
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    for text in ("Lease for [Grantor", " Name] in ", "[County] County"):
+        run = paragraph.add_run(text)
+        run.bold = True
+        run._r.set(qn('w:rsidR'), "00A1B2C3")
+    paragraph._p.insert(1, OxmlElement('w:proofErr'))
+    paragraph.add_run(" (signed)").italic = True
+    doc.save(path)
+
+
+def test_normalize_merges_identically_formatted_runs(tmp_path):
+    path = str(tmp_path / "template.docx")
+    _fragmented_template(path)
+    doc = Document(path)
+    stats = normalize_document(doc)
+    assert stats["removed"] == 1
+    runs = doc.paragraphs[0].runs
+    assert [(run.text, run.bold, run.italic) for run in runs] == [
+        ("Lease for [Grantor Name] in [County] County", True, None), (" (signed)", None, True)]
+
+
+def test_template_files_are_normalized_when_rendered(tmp_path, lease_payload):
+    path = str(tmp_path / "template.docx")
+    _fragmented_template(path)
+    mapping = build_mapping(enrich(lease_payload))
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Not preloaded: a file path and a file-like object
+    for template in (path, io.BytesIO(data)):
+        ok, docx_bytes, err = render(template, mapping, exhibit_images=False)
+        assert ok, err
+        runs = Document(io.BytesIO(docx_bytes)).paragraphs[0].runs
+        assert [(run.text, run.bold, run.italic) for run in runs] == [
+            ("Lease for Jane Roe in Spokane County", True, None), (" (signed)", None, True)]
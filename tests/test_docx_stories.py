@@ -0,0 +1,128 @@
+import io
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part, XmlPart
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from docx_stories import iter_story_paragraph_elements, iter_story_parts, iter_story_roots
+
+NOTES_XML = (
+    '<w:{kind}s {ns}><w:{kind} w:id="1"><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:{kind}></w:{kind}s>'
+)
+
+
+def _reload(doc):
+    out = io.BytesIO()
+    doc.save(out)
+    out.seek(0)
+    return Document(out)
+
+
+def _add_notes(doc, kind, text):
+    """Attach a footnotes / endnotes part; python-docx loads these as binary parts."""
+    content_type = CT.WML_FOOTNOTES if kind == "footnote" else CT.WML_ENDNOTES
+    blob = NOTES_XML.format(kind=kind, ns=nsdecls("w"), text=text).encode('utf-8')
+    part = Part(PackURI(f'/word/{kind}s.xml'), content_type, blob, doc.part.package)
+    doc.part.relate_to(part, RT.FOOTNOTES if kind == "footnote" else RT.ENDNOTES)
+
+
+def _texts(doc):
+    return [''.join(t.text or '' for t in p.iter(qn('w:t')))
+            for _, p in iter_story_paragraph_elements(doc, writeback=False)]
+
+
+def test_headers_linked_across_sections_are_visited_once():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Shared header"
+    doc.add_paragraph("Section 1")
+    doc.add_section()
+    doc.add_paragraph("Section 2")
+    doc = _reload(doc)
+    assert doc.sections[1].header.is_linked_to_previous
+
+    assert _texts(doc).count("Shared header") == 1
+    assert [p.text for p in doc.paragraphs if p.text] == ["Section 1", "Section 2"]
+    assert {"Section 1", "Section 2"} <= set(_texts(doc))
+
+
+def test_unlinked_second_section_header_is_its_own_part():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "First header"
+    doc.add_section()
+    doc.sections[1].header.is_linked_to_previous = False
+    doc.sections[1].header.paragraphs[0].text = "Second header"
+    doc.sections[1].footer.is_linked_to_previous = False
+    doc.sections[1].footer.paragraphs[0].text = "Second footer"
+    doc = _reload(doc)
+
+    parts = list(iter_story_parts(doc))
+    assert parts[0] is doc.part
+    assert len(parts) == len({id(part) for part in parts})
+    assert [part.content_type for part in parts].count(CT.WML_HEADER) == 2
+    texts = _texts(doc)
+    for text in ("First header", "Second header", "Second footer"):
+        assert texts.count(text) == 1
+
+
+def test_text_box_paragraphs_are_visited():
+    doc = Document()
+    run = doc.add_paragraph("Body").add_run()
+    run._r.append(parse_xml(
+        f'<w:pict {nsdecls("w")} xmlns:v="urn:schemas-microsoft-com:vml"><v:shape><v:textbox><w:txbxContent>'
+        '<w:p><w:r><w:t>Box text</w:t></w:r></w:p>'
+        '</w:txbxContent></v:textbox></v:shape></w:pict>'))
+    assert "Box text" in _texts(_reload(doc))
+
+
+def test_footnote_and_endnote_changes_are_written_back():
+    doc = Document()
+    doc.add_paragraph("Body")
+    _add_notes(doc, "footnote", "[Grantor Name] note")
+    _add_notes(doc, "endnote", "[County] note")
+    doc = _reload(doc)
+    notes = [part for part in iter_story_parts(doc) if part.content_type in (CT.WML_FOOTNOTES, CT.WML_ENDNOTES)]
+    assert len(notes) == 2 and not any(isinstance(part, XmlPart) for part in notes)
+
+    for part, root in iter_story_roots(doc):
+        for t in root.iter(qn('w:t')):
+            t.text = t.text.replace("[Grantor Name]", "Jane Roe").replace("[County]", "Spokane")
+
+    blobs = {part.content_type: part.blob for part in iter_story_parts(_reload(doc))}
+    assert b"Jane Roe note" in blobs[CT.WML_FOOTNOTES]
+    assert b"Spokane note" in blobs[CT.WML_ENDNOTES]
+
+
+def test_read_only_traversal_leaves_binary_parts_alone():
+    doc = Document()
+    _add_notes(doc, "footnote", "Original")
+    doc = _reload(doc)
+    (part,) = [part for part in iter_story_parts(doc) if part.content_type == CT.WML_FOOTNOTES]
+    blob = part.blob
+
+    for _, root in iter_story_roots(doc, writeback=False):
+        for t in root.iter(qn('w:t')):
+            t.text = "Changed"
+    assert part.blob is blob
+
+    visited = [visited_part.partname
+               for visited_part, _ in iter_story_roots(doc, writeback=False, partnames={part.partname})]
+    assert visited == [part.partname]
+
+
+def test_comment_edits_are_saved():
+    doc = Document()
+    paragraph = doc.add_paragraph("Commented")
+    doc.add_comment(paragraph.runs, text="[State] comment", author="Reviewer")
+    doc = _reload(doc)
+
+    for part, root in iter_story_roots(doc):
+        if part.content_type == CT.WML_COMMENTS:
+            for t in root.iter(qn('w:t')):
+                t.text = t.text.replace("[State]", "Washington")
+
+    saved = _reload(doc)
+    assert [part.content_type for part in iter_story_parts(saved)].count(CT.WML_COMMENTS) == 1
+    assert "Washington comment" in _texts(saved)
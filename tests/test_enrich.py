@@ -0,0 +1,26 @@
+import copy
+
+from lease_pipeline import build_mapping, enrich
+
+
+def test_enrich_does_not_mutate_input(lease_payload):
+    original = copy.deepcopy(lease_payload)
+    enriched = enrich(lease_payload)
+    assert lease_payload == original
+    assert "exhibit_a" in enriched and "Signature_block" in enriched
+
+
+def test_enriched_json_holds_parcels_once(lease_payload):
+    enriched = enrich(lease_payload)
+    assert "parcel_objects" not in enriched["exhibit_a"]
+    assert enriched["exhibit_a"]["parcels_processed"] == 2
+
+
+def test_mapping_has_both_parcel_key_families(lease_payload):
+    mapping = {item["key"]: item["value"] for item in build_mapping(enrich(lease_payload))}
+    assert mapping["[Exhibit A - Parcel 2 APN]"] == "16174.902"
+    assert mapping["[Parcels - Parcel 2 APN]"] == "16174.902"
+    # Exhibit A family fills in the exhibit defaults, the Parcels family does not
+    assert mapping["[Exhibit A - Parcel 2 Legal Description]"] == "No legal description provided"
+    assert mapping["[Parcels - Parcel 2 Legal Description]"] == ""
+    assert mapping["[Exhibit A - Parcel 1 Template Type]"] == "standard"
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+from docx import Document
+from PIL import Image
+
+import exhibit_images
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    Image.new('RGB', (40, 30), 'red').save(str(images / "16174.901.png"))
+    monkeypatch.setattr(exhibit_images, 'IMAGE_DIR', str(images))
+    monkeypatch.setattr(exhibit_images, 'IMAGE_CACHE_DIR', str(tmp_path / "cache"))
+    return images
+
+
+def _pictures(element):
+    return len(element.xpath('.//pic:pic'))
+
+
+def test_placeholders_in_body_tables_and_headers_get_images(image_dir):
+    doc = Document()
+    doc.add_paragraph("Exhibit A [Image] end")
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].paragraphs[0].text = "[Image]"
+    doc.sections[0].header.paragraphs[0].text = "Survey [Image]"
+
+    assert exhibit_images.insert_exhibit_images(doc, ["16174.901", "16174.999"]) == 3
+    assert _pictures(doc.element.body) == 2
+    assert _pictures(doc.sections[0].header._element) == 1
+    assert doc.paragraphs[0].text == "Exhibit A  end"
+    assert "[Image]" not in doc.sections[0].header.paragraphs[0].text
+
+    out = io.BytesIO()
+    doc.save(out)
+    out.seek(0)
+    assert _pictures(Document(out).sections[0].header._element) == 1
+
+
+def test_placeholders_stay_without_images(image_dir):
+    doc = Document()
+    doc.add_paragraph("[Image]")
+    assert exhibit_images.insert_exhibit_images(doc, ["00000.000"]) == 0
+    assert doc.paragraphs[0].text == "[Image]"
+
+
+def test_source_hash_cache_is_bounded(image_dir, monkeypatch):
+    monkeypatch.setattr(exhibit_images, '_SOURCE_HASH_CACHE_SIZE', 2)
+    monkeypatch.setattr(exhibit_images, '_source_hashes', type(exhibit_images._source_hashes)())
+    for i in range(4):
+        path = image_dir / f"{i}.png"
+        Image.new('RGB', (4, 4), (i, 0, 0)).save(str(path))
+        exhibit_images._source_hash(str(path))
+    assert len(exhibit_images._source_hashes) == 2
+
+
+def test_every_placeholder_in_a_run_gets_the_images(image_dir):
+    doc = Document()
+    run = doc.add_paragraph().add_run("A [Image] B [Image][Image] C")
+    run.bold = True
+
+    assert exhibit_images.insert_exhibit_images(doc, ["16174.901"]) == 3
+    paragraph = doc.paragraphs[0]
+    assert _pictures(paragraph._p) == 3
+    assert paragraph.text == "A  B  C"
+    assert [r.text for r in paragraph.runs if r.text] == ["A ", " B ", " C"]
+    assert all(r.bold for r in paragraph.runs if r.text)
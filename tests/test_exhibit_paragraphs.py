@@ -0,0 +1,57 @@
+import io
+
+from docx import Document
+
+from exhibit_paragraphs import EXHIBIT_PLACEHOLDER, insert_exhibit_paragraphs
+from lease_pipeline import build_mapping, enrich, render
+
+
+def test_every_occurrence_is_expanded():
+    doc = Document()
+    doc.add_paragraph(f"Exhibit: {EXHIBIT_PLACEHOLDER} (end)")
+    doc.add_paragraph("Between")
+    doc.add_paragraph(EXHIBIT_PLACEHOLDER)
+    doc.add_table(rows=1, cols=1).rows[0].cells[0].paragraphs[0].text = EXHIBIT_PLACEHOLDER
+    doc.sections[0].header.paragraphs[0].text = f"See {EXHIBIT_PLACEHOLDER}"
+
+    assert insert_exhibit_paragraphs(doc, "Parcel 1\nParcel 2") == 8
+
+    body = [p.text for p in doc.paragraphs]
+    assert body == ["Exhibit: Parcel 1", "Parcel 2 (end)", "Between", "Parcel 1", "Parcel 2"]
+    assert [p.text for p in doc.tables[0].rows[0].cells[0].paragraphs] == ["Parcel 1", "Parcel 2"]
+    assert [p.text for p in doc.sections[0].header.paragraphs] == ["See Parcel 1", "Parcel 2"]
+
+
+def test_rendered_document_keeps_no_literal_placeholder(lease_payload):
+    doc = Document()
+    doc.add_paragraph(EXHIBIT_PLACEHOLDER)
+    doc.add_paragraph(f"Again: {EXHIBIT_PLACEHOLDER}")
+    doc.sections[0].footer.paragraphs[0].text = EXHIBIT_PLACEHOLDER
+    template = io.BytesIO()
+    doc.save(template)
+    template.seek(0)
+
+    ok, docx_bytes, err = render(template, build_mapping(enrich(lease_payload)), exhibit_images=False,
+                                 exhibit_format='paragraphs')
+    assert ok, err
+    out = Document(io.BytesIO(docx_bytes))
+    texts = [p.text for p in out.paragraphs] + [p.text for p in out.sections[0].footer.paragraphs]
+    assert not any(EXHIBIT_PLACEHOLDER in text for text in texts)
+    assert out.sections[0].footer.paragraphs[0].text == "EXHIBIT A"
+
+
+def test_repeated_placeholders_and_non_text_runs_are_kept():
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
+    doc = Document()
+    paragraph = doc.add_paragraph(f"A {EXHIBIT_PLACEHOLDER} B ")
+    paragraph.add_run().add_break()
+    paragraph._p.append(parse_xml(f'<w:bookmarkStart {nsdecls("w")} w:id="0" w:name="exhibit"/>'))
+    paragraph.add_run(f"C {EXHIBIT_PLACEHOLDER} D")
+
+    assert insert_exhibit_paragraphs(doc, "Parcel 1\nParcel 2") == 3
+    assert [p.text for p in doc.paragraphs] == ["A Parcel 1", "Parcel 2 B \nC Parcel 1", "Parcel 2 D"]
+    middle = doc.paragraphs[1]._p
+    assert len(middle.xpath('./w:r/w:br')) == 1
+    assert len(middle.xpath('./w:bookmarkStart[@w:name="exhibit"]')) == 1
@@ -0,0 +1,31 @@
+from exhibit_templates import compile_exhibit_template, render_exhibit, select_exhibit_template
+
+
+def test_compiled_template_fills_slots_and_keeps_other_text():
+    render = compile_exhibit_template("  Parcel [i] {x} 'q' \"d\" \\ [Image]: [Acres] ac, [APN], [County] [State]\n")
+    text = render({"parcelNumber": 3, "acres": 2.5, "apn": "16174.9"}, "Spokane", "WA")
+    assert text == "Parcel 3 {x} 'q' \"d\" \\ [Image]: 2.5 ac, 16174.9, Spokane WA"
+
+
+def test_missing_fields_use_defaults():
+    render = compile_exhibit_template("[i] [Acres] [Legal Description] [APN]")
+    assert render({}, "", "") == "Unknown 0 No legal description provided Unknown"
+
+
+def test_template_selection():
+    assert select_exhibit_template({"templateType": "custom_template_2", "isPortion": True}) == "custom_2"
+    assert select_exhibit_template({"isPortion": True}) == "portion"
+    assert select_exhibit_template({"templateType": "standard"}) == "normal"
+
+
+def test_render_exhibit_picks_a_block_per_parcel():
+    parcels = [
+        {"parcelNumber": 1, "apn": "A", "acres": 1, "legal_description": "LOT 1"},
+        {"parcelNumber": 2, "apn": "B", "acres": 2, "legal_description": "LOT 2", "isPortion": True},
+        "not a parcel",
+    ]
+    blocks = render_exhibit(parcels, {"county": "Spokane", "state": "Washington"}).split("\n\n")
+    text = "\n\n".join(blocks)
+    assert text.startswith("EXHIBIT A") and "Spokane" in text
+    assert "LOT 1" in text and "LOT 2" in text
+    assert text.index("LOT 1") < text.index("LOT 2")
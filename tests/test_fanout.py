@@ -0,0 +1,68 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+
+import template_registry
+from fanout import safe_filename, unique_names
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(template_registry, 'TEMPLATE_REGISTRY_DIR', str(tmp_path / "registry"))
+    monkeypatch.setattr(template_registry, '_templates', {})
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Lease for [Grantor Name]")
+    path = str(tmp_path / "lease.docx")
+    doc.save(path)
+    return path
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("lease.docx", "lease.docx"),
+    ("../../evil.docx", ".._.._evil.docx"),
+    ("/abs/x", "_abs_x"),
+    ("C:\\temp\\x.docx", "C_temp_x.docx"),
+    ("  ", "fallback"),
+])
+def test_safe_filename(name, expected):
+    assert safe_filename(name, "fallback") == expected
+
+
+def test_unique_names_number_repeats():
+    assert unique_names(["a.docx", "a.docx", "b.docx", "a.docx"]) == ["a.docx", "a-2.docx", "b.docx", "a-3.docx"]
+
+
+def test_fan_out_entry_and_download_names_are_sanitized(client, template_path, lease_payload):
+    with open(template_path, 'rb') as f:
+        data = f.read()
+    template_id = client.post('/api/templates?name=../../evil.docx', data=data).get_json()["id"]
+
+    response = client.post('/api/generate-docx', json=dict(
+        lease_payload,
+        output_filename="../out/bundle",
+        templates=[{"template_id": template_id},
+                   {"template_path": template_path, "output_filename": "/abs/x"},
+                   {"template_path": template_path, "output_filename": "/abs/x"}],
+    ))
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename=.._out_bundle.zip'
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        names = archive.namelist()
+    assert names == [".._.._evil.docx", "_abs_x.docx", "_abs_x-2.docx"]
+    assert not any('/' in name or '\\' in name for name in names)
+
+
+def test_single_document_download_name_is_sanitized(client, template_path, lease_payload):
+    response = client.post('/api/generate-docx', json=dict(
+        lease_payload, template_path=template_path, output_filename="../../etc/lease.docx"))
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == 'attachment; filename=.._.._etc_lease.docx'
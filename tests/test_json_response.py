@@ -0,0 +1,86 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+import json_response
+from json_response import STRING_REF_KEY, STRING_TABLE_KEY, dedupe_strings
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("encoder", sorted(json_response.JSON_ENCODERS))
+def test_wide_integers_encode_with_every_encoder(monkeypatch, encoder):
+    monkeypatch.setattr(json_response, '_encoder_name', encoder)
+    body = json_response.encode_json({"id": 123456789012345678901234567890})
+    assert json.loads(body) == {"id": 123456789012345678901234567890}
+
+
+def test_process_accepts_extra_wide_integer_fields(client, lease_payload):
+    lease_payload["external_id"] = 123456789012345678901234567890
+    response = client.post('/api/process', json=lease_payload)
+    assert response.status_code == 200
+    assert "mapping" in response.get_json()
+
+
+@pytest.mark.parametrize("accept, encoding, decode", [
+    ("gzip", "gzip", gzip.decompress),
+    ("deflate", "deflate", zlib.decompress),
+    ("deflate;q=1.0, gzip;q=0.5", "deflate", zlib.decompress),
+    ("br", None, bytes),
+    (None, None, bytes),
+])
+def test_process_response_compression_follows_accept_encoding(client, lease_payload, accept, encoding, decode):
+    headers = {"Accept-Encoding": accept} if accept else {}
+    response = client.post('/api/process', json=lease_payload, headers=headers)
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert "mapping" in json.loads(decode(response.get_data()))
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.post('/api/process', json=[], headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 400
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_dedupe_strings_sends_each_long_string_once():
+    long_text = "LOT 1 " * 20
+    payload = {"a": long_text, "b": [long_text, {"c": long_text}], "short": "x", "n": 3}
+    shaped = dedupe_strings(payload)
+    assert shaped[STRING_TABLE_KEY] == [long_text]
+    assert shaped["a"] == shaped["b"][0] == shaped["b"][1]["c"] == {STRING_REF_KEY: 0}
+    assert shaped["short"] == "x" and shaped["n"] == 3
+    assert payload["a"] == long_text
+
+
+def test_dedupe_strings_leaves_payloads_without_long_strings_alone():
+    assert dedupe_strings({"a": "short", "b": [1, 2]}) == {"a": "short", "b": [1, 2]}
+
+
+def test_process_dedup_shape_round_trips(client, lease_payload):
+    lease_payload["parcels"][0]["legal_description"] = "THE NORTH HALF OF THE SOUTHWEST QUARTER " * 3
+    plain = client.post('/api/process', json=lease_payload).get_json()
+    shaped = client.post('/api/process?shape=dedup', json=lease_payload).get_json()
+    table = shaped.pop(STRING_TABLE_KEY)
+
+    def resolve(value):
+        if isinstance(value, dict):
+            if set(value) == {STRING_REF_KEY}:
+                return table[value[STRING_REF_KEY]]
+            return {key: resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [resolve(item) for item in value]
+        return value
+
+    resolved = resolve(shaped)
+    assert resolved.pop("mapping_handle") != plain.pop("mapping_handle")
+    assert len(resolved["mapping"]) == len(plain["mapping"])
+    assert resolved["enriched_json"]["parcels"] == plain["enriched_json"]["parcels"]
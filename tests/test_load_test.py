@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench'))
+
+from load_test import percentile  # noqa: E402
+
+
+@pytest.mark.parametrize("pct, expected", [(50, 50), (95, 95), (99, 99), (100, 100), (0, 1), (1, 1)])
+def test_percentile_uses_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 101)), pct) == expected
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([], 95, 0.0),
+    ([7], 99, 7),
+    ([1, 2], 50, 1),
+    ([1, 2, 3, 4], 75, 3),
+    ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95, 10),
+])
+def test_percentile_small_samples(values, pct, expected):
+    assert percentile(values, pct) == expected
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+from docx import Document
+
+import mapping_cache
+from deterministic_output import DETERMINISTIC_TIMESTAMP, TIMESTAMP_PLACEHOLDER
+from lease_pipeline import build_mapping, enrich
+
+
+def _timestamp(mapping):
+    return next(item["value"] for item in mapping if item["key"] == TIMESTAMP_PLACEHOLDER)
+
+
+def test_handles_resolve_until_they_expire(monkeypatch, lease_payload):
+    mapping = build_mapping(enrich(lease_payload))
+    handle = mapping_cache.store_mapping(mapping)
+    assert mapping_cache.get_mapping(handle) is mapping
+    monkeypatch.setattr(mapping_cache, 'MAPPING_TTL', -1)
+    expired = mapping_cache.store_mapping(mapping)
+    assert mapping_cache.get_mapping(expired) is None
+    assert mapping_cache.get_mapping("unknown") is None
+
+
+def test_deterministic_lookup_pins_a_current_time_mapping(lease_payload):
+    mapping = build_mapping(enrich(lease_payload))
+    handle = mapping_cache.store_mapping(mapping)
+    pinned = mapping_cache.get_mapping(handle, deterministic=True, timestamp="2024-05-01T00:00:00Z")
+    assert _timestamp(pinned) == "2024-05-01T00:00:00Z"
+    assert _timestamp(mapping) != "2024-05-01T00:00:00Z"
+    assert len(pinned) == len(mapping)
+
+
+def test_deterministic_mapping_keeps_its_own_timestamp(lease_payload):
+    payload = dict(lease_payload, generation_timestamp="2023-01-02T03:04:05Z")
+    mapping = build_mapping(enrich(payload, deterministic=True))
+    handle = mapping_cache.store_mapping(mapping, deterministic=True)
+    assert _timestamp(mapping_cache.get_mapping(handle, deterministic=True)) == "2023-01-02T03:04:05Z"
+
+
+def test_cache_is_bounded_by_mapping_size(monkeypatch, lease_payload):
+    monkeypatch.setattr(mapping_cache, '_entries', type(mapping_cache._entries)())
+    monkeypatch.setattr(mapping_cache, '_total_bytes', 0)
+    mapping = build_mapping(enrich(lease_payload))
+    size = mapping_cache.mapping_size(mapping)
+    monkeypatch.setattr(mapping_cache, 'MAPPING_CACHE_BYTES', 3 * size)
+
+    handles = [mapping_cache.store_mapping(mapping) for _ in range(5)]
+    assert [mapping_cache.get_mapping(handle) is not None for handle in handles] == [False, False, True, True, True]
+    assert mapping_cache._total_bytes == 3 * size
+
+    # A mapping larger than the whole bound still gets a working handle
+    monkeypatch.setattr(mapping_cache, 'MAPPING_CACHE_BYTES', size // 2)
+    handle = mapping_cache.store_mapping(mapping)
+    assert mapping_cache.get_mapping(handle) is mapping
+    assert list(mapping_cache._entries) == [handle]
+    assert mapping_cache._total_bytes == size
+
+
+def test_mapping_size_grows_with_parcels(lease_payload):
+    small = mapping_cache.mapping_size(build_mapping(enrich(lease_payload)))
+    parcels = [dict(lease_payload["parcels"][0], apn=f"16174.{i:03d}") for i in range(50)]
+    large = mapping_cache.mapping_size(build_mapping(enrich(dict(lease_payload, parcels=parcels))))
+    assert large > 10 * small
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+    return app_module.app.test_client()
+
+
+def test_handle_renders_byte_identical_deterministic_output(client, tmp_path, lease_payload):
+    doc = Document()
+    doc.add_paragraph("Lease for [Grantor Name] generated [Exhibit A - Generation Timestamp]")
+    template_path = str(tmp_path / "template.docx")
+    doc.save(template_path)
+
+    bodies = []
+    for _ in range(2):
+        # Identical payloads processed separately (at different times)
+        handle = client.post('/api/process?lite=1', json=lease_payload).get_json()["mapping_handle"]
+        response = client.post('/api/generate-docx', json={
+            "mapping_handle": handle, "template_path": template_path, "deterministic": True})
+        assert response.status_code == 200
+        bodies.append(response.data)
+        time.sleep(1.1)
+    assert bodies[0] == bodies[1]
+
+
+def test_process_honors_deterministic(client, lease_payload):
+    body = client.post('/api/process?lite=1', json=dict(lease_payload, deterministic=True)).get_json()
+    assert _timestamp(body["mapping"]) == DETERMINISTIC_TIMESTAMP
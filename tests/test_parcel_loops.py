@@ -0,0 +1,89 @@
+import io
+
+import pytest
+from docx import Document
+
+from docx_clone import clone_document, load_frozen_document
+from parcel_loops import LOOP_BEGIN, LOOP_END, ROW_MARKER, compile_parcel_loops, expand_parcel_loops
+
+
+def _template(nested=False):
+    doc = Document()
+    doc.add_paragraph("Parcels of [Grantor Name]:")
+    doc.add_paragraph(LOOP_BEGIN)
+    paragraph = doc.add_paragraph("Parcel [Parcel Index]: APN ")
+    paragraph.add_run("[Parcel APN]").bold = True
+    paragraph.add_run(" in [County] County")
+    if nested:
+        table = doc.add_table(rows=1, cols=1)
+        table.cell(0, 0).text = f"{ROW_MARKER}[Parcel Acres]"
+    doc.add_paragraph("[Parcel Legal Description]")
+    doc.add_paragraph(LOOP_END)
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "APN"
+    table.cell(1, 0).text = f"{ROW_MARKER}[Parcel APN]"
+    table.cell(1, 1).text = "[Parcel Acres] <&>"
+    doc.sections[0].header.paragraphs[0].text = "Header"
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def _mapping(count):
+    mapping = {"[Grantor Name]": "Jane", "[County]": "Spokane"}
+    for i in range(1, count + 1):
+        mapping[f"[Parcels - Parcel {i} APN]"] = f"16174.{i}"
+        mapping[f"[Parcels - Parcel {i} Acres]"] = str(i * 1.5)
+        mapping[f"[Parcels - Parcel {i} Legal Description]"] = f"Lot {i} & <b>"
+    return mapping
+
+
+def _xml(doc):
+    return doc.element.xml
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_compiled_and_dynamic_expansion_agree(count):
+    data = _template()
+    dynamic = Document(io.BytesIO(data))
+    expand_parcel_loops(dynamic, _mapping(count))
+
+    frozen = load_frozen_document(data, normalize=False)
+    clone = clone_document(frozen)
+    assert expand_parcel_loops(clone, _mapping(count)) == 2
+    assert _xml(clone) == _xml(dynamic)
+
+
+def test_expansion_output():
+    clone = clone_document(load_frozen_document(_template()))
+    expand_parcel_loops(clone, _mapping(2), prefix="")
+    texts = [p.text for p in clone.paragraphs]
+    assert texts == ["Parcels of [Grantor Name]:",
+                     "Parcel 1: APN 16174.1 in [County] County", "Lot 1 & <b>",
+                     "Parcel 2: APN 16174.2 in [County] County", "Lot 2 & <b>"]
+    assert [run.bold for run in clone.paragraphs[1].runs if run.text == "16174.1"] == [True]
+    rows = [[cell.text for cell in row.cells] for row in clone.tables[0].rows]
+    assert rows == [["APN", ""], ["16174.1", "1.5 <&>"], ["16174.2", "3.0 <&>"]]
+
+
+def test_clones_expand_independently_and_frozen_stays_intact():
+    frozen = load_frozen_document(_template())
+    before = _xml(frozen)
+    first, second = clone_document(frozen), clone_document(frozen)
+    expand_parcel_loops(first, _mapping(3))
+    expand_parcel_loops(second, _mapping(1))
+    assert len(first.tables[0].rows) == 4
+    assert len(second.tables[0].rows) == 2
+    assert _xml(frozen) == before
+    # A second call on an already expanded document finds nothing to expand
+    assert expand_parcel_loops(first, _mapping(3)) == 0
+
+
+def test_nested_loops_are_expanded_without_compilation():
+    data = _template(nested=True)
+    frozen = load_frozen_document(data)
+    assert compile_parcel_loops(frozen) is None
+    clone = clone_document(frozen)
+    assert expand_parcel_loops(clone, _mapping(2)) == 3
+    nested = [cell.text for table in clone.tables[:-1] for row in table.rows for cell in row.cells]
+    assert nested == ["1.5", "3.0", "1.5", "3.0"]
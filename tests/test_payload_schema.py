@@ -0,0 +1,48 @@
+from payload_schema import validate_generate_payload, validate_lease_payload, validate_manifest
+
+
+def test_valid_payload(lease_payload):
+    assert validate_lease_payload(lease_payload) == []
+
+
+def test_errors_carry_field_paths(lease_payload):
+    lease_payload["number_of_grantor_signatures"] = 0
+    lease_payload["parcels"][1]["acres"] = "ten"
+    del lease_payload["parcels"][0]["apn"]
+    assert validate_lease_payload(lease_payload) == [
+        "$.number_of_grantor_signatures: must be >= 1",
+        "$.parcels[0].apn: is required",
+        "$.parcels[1].acres: expected number, got str",
+    ]
+
+
+def test_parcels_required_and_non_empty():
+    assert validate_lease_payload({}) == ["$.parcels: is required"]
+    assert validate_lease_payload({"parcels": []}) == ["$.parcels: must have at least 1 item(s)"]
+
+
+def test_enum_and_bool_are_not_numbers(lease_payload):
+    lease_payload["format"] = "rtf"
+    lease_payload["total_acres"] = True
+    assert validate_lease_payload(lease_payload) == [
+        "$.total_acres: expected number, got bool",
+        "$.format: must be one of 'docx', 'pdf'",
+    ]
+
+
+def test_generation_timestamp_format(lease_payload):
+    lease_payload["generation_timestamp"] = "2024-05-01T12:00:00Z"
+    assert validate_lease_payload(lease_payload) == []
+    lease_payload["generation_timestamp"] = "yesterday"
+    assert validate_lease_payload(lease_payload) == ["$.generation_timestamp: must be an ISO 8601 date-time"]
+
+
+def test_precomputed_mapping_payload():
+    assert validate_generate_payload({"mapping_handle": "abc", "deterministic": True}) == []
+    assert validate_generate_payload({"mapping": [{"key": "[A]"}]}) == ["$.mapping[0].value: is required"]
+    assert validate_generate_payload({"mapping_handle": "abc", "generation_timestamp": "x"}) == [
+        "$.generation_timestamp: must be an ISO 8601 date-time"]
+
+
+def test_manifest_errors_are_prefixed_with_record(lease_payload):
+    assert validate_manifest([lease_payload, {"parcels": "none"}]) == ["records[1].parcels: expected array, got str"]
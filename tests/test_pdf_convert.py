@@ -0,0 +1,116 @@
+import io
+import os
+import stat
+import sys
+from datetime import datetime
+
+import pytest
+from docx import Document
+
+import pdf_convert
+from deterministic_output import normalize_docx_zip
+
+STUB_SOFFICE = '''#!{python}
+import os, sys
+with open({log!r}, 'a') as log:
+    log.write('soffice\\n')
+args = sys.argv[1:]
+outdir = args[args.index('--outdir') + 1]
+source = args[-1]
+stem = os.path.splitext(os.path.basename(source))[0]
+with open(source, 'rb') as src, open(os.path.join(outdir, stem + '.pdf'), 'wb') as dst:
+    dst.write(b'%PDF-stub ' + str(len(src.read())).encode())
+'''
+
+STUB_UNOSERVER = '''#!{python}
+import sys
+from xmlrpc.server import SimpleXMLRPCServer
+with open({log!r}, 'a') as log:
+    log.write('unoserver\\n')
+args = sys.argv[1:]
+server = SimpleXMLRPCServer(('127.0.0.1', int(args[args.index('--port') + 1])), logRequests=False, allow_none=True)
+
+def convert(inpath, indata, outpath, convert_to):
+    with open({log!r}, 'a') as log:
+        log.write('convert\\n')
+    with open(inpath, 'rb') as src, open(outpath, 'wb') as dst:
+        dst.write(b'%PDF-rpc ' + str(len(src.read())).encode())
+
+server.register_function(convert)
+server.serve_forever()
+'''
+
+
+def _script(path, source, log):
+    path.write_text(source.format(python=sys.executable, log=str(log)))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def _calls(log):
+    return log.read_text().split() if log.exists() else []
+
+
+def _docx_bytes(text, modified=None):
+    doc = Document()
+    doc.add_paragraph(text)
+    if modified is not None:
+        doc.core_properties.modified = modified
+        doc.core_properties.created = modified
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def converter(tmp_path, monkeypatch):
+    log = tmp_path / "calls.log"
+    monkeypatch.setattr(pdf_convert, 'uno', None)
+    monkeypatch.setattr(pdf_convert, 'PDF_CACHE_DIR', str(tmp_path / "pdf_cache"))
+    monkeypatch.setenv('LEASE_SOFFICE', _script(tmp_path / "soffice", STUB_SOFFICE, log))
+    monkeypatch.setattr(pdf_convert, 'find_unoserver', lambda: None)
+    yield log
+    pdf_convert.shutdown()
+
+
+def test_converts_with_soffice_and_caches_the_result(converter):
+    data = _docx_bytes("Lease")
+    ok, pdf, err = pdf_convert.docx_to_pdf(data)
+    assert (ok, err) == (True, "")
+    assert pdf.startswith(b'%PDF-stub')
+    assert pdf_convert.docx_to_pdf(data) == (True, pdf, "")
+    assert _calls(converter) == ["soffice"]
+
+
+def test_cache_ignores_zip_metadata_and_core_dates(converter):
+    first = _docx_bytes("Lease", modified=datetime(2024, 1, 1))
+    second = normalize_docx_zip(_docx_bytes("Lease", modified=datetime(2025, 6, 1)), "2025-06-01T00:00:00Z")
+    assert first != second
+    assert pdf_convert.content_key(first) == pdf_convert.content_key(second)
+    assert pdf_convert.content_key(first) != pdf_convert.content_key(_docx_bytes("Other lease"))
+
+    assert pdf_convert.docx_to_pdf(first)[0]
+    assert pdf_convert.docx_to_pdf(second)[0]
+    assert _calls(converter) == ["soffice"]
+
+
+def test_unoserver_slot_is_started_once(converter, tmp_path, monkeypatch):
+    unoserver = _script(tmp_path / "unoserver", STUB_UNOSERVER, converter)
+    monkeypatch.setattr(pdf_convert, 'find_unoserver', lambda: unoserver)
+    monkeypatch.setattr(pdf_convert, 'PDF_WORKERS', 1)
+    for text in ("First", "Second", "Third"):
+        ok, pdf, err = pdf_convert.docx_to_pdf(_docx_bytes(text))
+        assert (ok, err) == (True, "")
+        assert pdf.startswith(b'%PDF-rpc')
+    assert _calls(converter) == ["unoserver", "convert", "convert", "convert"]
+
+
+def test_failed_conversion_reports_an_error(converter, tmp_path, monkeypatch):
+    broken = tmp_path / "broken"
+    broken.write_text("#!/bin/sh\nexit 3\n")
+    broken.chmod(broken.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('LEASE_SOFFICE', str(broken))
+    ok, pdf, err = pdf_convert.docx_to_pdf(_docx_bytes("Lease"))
+    assert (ok, pdf) == (False, None)
+    assert err.startswith("PDF conversion failed")
+    assert not os.path.exists(pdf_convert.PDF_CACHE_DIR) or not any(os.scandir(pdf_convert.PDF_CACHE_DIR))
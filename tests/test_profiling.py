@@ -0,0 +1,48 @@
+import cProfile
+import threading
+import tracemalloc
+
+import pytest
+
+import profiling
+
+
+def test_stage_records_timings_and_memory():
+    capture = profiling.ProfileCapture("test")
+    with capture.stage('render'):
+        sum(range(1000))
+    assert set(capture.stages['render']) == {"seconds", "peak_bytes", "allocated_bytes"}
+    assert "render.memory.txt" in capture._files
+    assert not tracemalloc.is_tracing()
+
+
+def test_failed_profiler_start_releases_the_stage(monkeypatch):
+    class BusyProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, 'Profile', BusyProfile)
+    with pytest.raises(ValueError):
+        with profiling.ProfileCapture("test").stage('render'):
+            pass
+    assert not tracemalloc.is_tracing()
+    assert not profiling._stage_lock.locked()
+
+
+def test_profiled_stages_do_not_overlap():
+    active = []
+    overlaps = []
+
+    def run():
+        with profiling.ProfileCapture("test").stage('render'):
+            active.append(1)
+            overlaps.append(len(active))
+            sum(range(20000))
+            active.pop()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [1, 1, 1, 1]
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+from docx import Document
+
+from lease_pipeline import _replace_placeholders_normal
+
+
+def _expected(text, mapping):
+    """Reference semantics: str.replace per key, in mapping order, blank values skipped."""
+    for key, value in mapping.items():
+        if value.strip():
+            text = text.replace(key, value)
+    return text
+
+
+def _paragraph(pieces, bold_first=False):
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    for i, piece in enumerate(pieces):
+        run = paragraph.add_run(piece)
+        if bold_first and i == 0:
+            run.bold = True
+    return doc
+
+
+def test_matches_str_replace_on_random_run_splits():
+    keys = ["[A]", "[Bb]", "[State]", "[Sig]"]
+    # Values that contain later keys, a blank value, and stray brackets
+    values = {"[A]": "x[State]", "[Bb]": "", "[State]": "WA", "[Sig]": "By [A] [State]"}
+    rnd = random.Random(1)
+    for _ in range(200):
+        order = keys[:]
+        rnd.shuffle(order)
+        mapping = {key: values[key] for key in order}
+        text = ''.join(rnd.choice(keys + ["ab", " ", "["]) for _ in range(6))
+        cuts = sorted(rnd.sample(range(1, len(text)), min(3, len(text) - 1)))
+        pieces = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+        doc = _paragraph(pieces)
+        _replace_placeholders_normal(doc, mapping)
+        assert doc.paragraphs[0].text == _expected(text, mapping), (pieces, mapping)
+
+
+@pytest.mark.parametrize("mapping", [
+    {"Grantor": "Jane", "[Grantor Name]": "unused"},  # non-token keys are replaced in order too
+    {"[Grantor Name]": "Jane [County]", "[County]": "Spokane"},
+    {"[County]": "Spokane", "[Grantor Name]": "Jane [County]"},
+])
+def test_key_order_decides_like_str_replace(mapping):
+    text = "[Grantor Name] of [County]"
+    doc = _paragraph(["[Grantor ", "Name] of [County]"])
+    _replace_placeholders_normal(doc, mapping)
+    assert doc.paragraphs[0].text == _expected(text, mapping)
+
+
+def test_untouched_runs_keep_their_formatting():
+    doc = _paragraph(["Signed: ", "[Grantor Name]", " on [Date]"], bold_first=True)
+    _replace_placeholders_normal(doc, {"[Grantor Name]": "Jane Roe", "[Date]": "May 1"})
+    runs = doc.paragraphs[0].runs
+    assert [(run.text, run.bold) for run in runs] == [("Signed: ", True), ("Jane Roe", None), (" on May 1", None)]
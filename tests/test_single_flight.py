@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+import admission
+import single_flight
+
+
+def _followers(key, count, timeout=None):
+    """Start count callers of run(key) that only wait; return (threads, outcomes)."""
+    outcomes = []
+
+    def follow():
+        try:
+            outcomes.append(single_flight.run(key, lambda: pytest.fail("a follower ran fn"), timeout=timeout))
+        except BaseException as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def _wait_for_followers(before, count):
+    for _ in range(500):
+        if single_flight.stats()["shared"] >= before + count:
+            return
+        threading.Event().wait(0.01)
+    pytest.fail("followers did not join")
+
+
+def test_request_key_ignores_key_order():
+    assert single_flight.request_key({"a": 1, "b": 2}, "docx") == single_flight.request_key({"b": 2, "a": 1}, "docx")
+    assert single_flight.request_key({"a": 1}, "docx") != single_flight.request_key({"a": 1}, "pdf")
+
+
+def test_concurrent_callers_share_one_run():
+    release = threading.Event()
+    shared_before = single_flight.stats()["shared"]
+    results = []
+
+    def lead():
+        results.append(single_flight.run("share", lambda: release.wait(5) and "result"))
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while single_flight.stats()["in_flight"] == 0:
+        threading.Event().wait(0.001)
+    threads, outcomes = _followers("share", 3)
+    _wait_for_followers(shared_before, 3)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join()
+    assert results == [("result", False)]
+    assert outcomes == [("result", True)] * 3
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_followers_get_their_own_copy_of_the_error():
+    release = threading.Event()
+    shared_before = single_flight.stats()["shared"]
+    leader_error = []
+
+    def fail():
+        release.wait(5)
+        raise admission.Overloaded(429, "queue full", 7)
+
+    def lead():
+        try:
+            single_flight.run("fail", fail)
+        except admission.Overloaded as e:
+            leader_error.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while single_flight.stats()["in_flight"] == 0:
+        threading.Event().wait(0.001)
+    threads, outcomes = _followers("fail", 2)
+    _wait_for_followers(shared_before, 2)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join()
+    assert len({id(e) for e in outcomes + leader_error}) == 3
+    for error in outcomes:
+        assert isinstance(error, admission.Overloaded)
+        assert (error.status, str(error), error.retry_after) == (429, "queue full", 7)
+        assert error.__cause__ is leader_error[0]
+
+
+def test_followers_give_up_at_their_timeout():
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: single_flight.run("slow", lambda: release.wait(5)))
+    leader.start()
+    while single_flight.stats()["in_flight"] == 0:
+        threading.Event().wait(0.001)
+    timed_out_before = single_flight.stats()["timed_out"]
+    threads, outcomes = _followers("slow", 1, timeout=0.05)
+    threads[0].join(2)
+    release.set()
+    leader.join()
+    assert isinstance(outcomes[0], admission.Overloaded)
+    assert outcomes[0].status == 503
+    assert single_flight.stats()["timed_out"] == timed_out_before + 1
@@ -0,0 +1,127 @@
+import io
+import threading
+
+import pytest
+from docx import Document
+
+import template_registry
+from template_store import build_store, ensure_store
+
+
+def _docx_bytes(text):
+    doc = Document()
+    doc.add_paragraph(text)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_registry, 'TEMPLATE_REGISTRY_DIR', str(tmp_path / "registry"))
+    monkeypatch.setattr(template_registry, '_templates', {})
+    return tmp_path / "registry"
+
+
+@pytest.fixture
+def client(registry):
+    import app as app_module
+
+    return app_module.app.test_client()
+
+
+def test_upload_list_get_and_delete(client, registry):
+    response = client.post('/api/templates', data={"file": (io.BytesIO(_docx_bytes("Lease for [Grantor Name] in [County]")), "lease.docx")})
+    assert response.status_code == 201
+    meta = response.get_json()
+    assert meta["name"] == "lease.docx"
+    assert meta["placeholders"] == ["[County]", "[Grantor Name]"]
+    assert (registry / f"{meta['id']}.docx").exists()
+
+    listed = client.get('/api/templates').get_json()["templates"]
+    assert [item["id"] for item in listed] == [meta["id"]]
+    assert "data" not in listed[0] and "document" not in listed[0]
+
+    assert client.get(f"/api/templates/{meta['id']}").get_json() == meta
+
+    assert client.delete(f"/api/templates/{meta['id']}").get_json() == {"deleted": meta["id"]}
+    assert not (registry / f"{meta['id']}.docx").exists()
+    assert client.get('/api/templates').get_json() == {"templates": []}
+
+
+def test_raw_body_upload_uses_the_name_parameter(client):
+    response = client.post('/api/templates?name=raw.docx', data=_docx_bytes("[State]"))
+    assert response.status_code == 201
+    assert response.get_json()["name"] == "raw.docx"
+
+
+def test_re_uploading_the_same_bytes_returns_the_existing_template(client):
+    data = _docx_bytes("[State]")
+    first = client.post('/api/templates', data=data).get_json()
+    second = client.post('/api/templates', data=data).get_json()
+    assert first == second
+    assert len(client.get('/api/templates').get_json()["templates"]) == 1
+
+
+@pytest.mark.parametrize("body", [b"", b"not a docx"])
+def test_invalid_uploads_are_rejected(client, body):
+    assert client.post('/api/templates', data=body).status_code == 400
+
+
+@pytest.mark.parametrize("template_id", ["0123456789abcdef", "not-an-id"])
+def test_unknown_ids_are_404(client, template_id):
+    assert client.get(f'/api/templates/{template_id}').status_code == 404
+    assert client.delete(f'/api/templates/{template_id}').status_code == 404
+
+
+def test_registry_reloads_uploaded_templates(client, registry, monkeypatch):
+    meta = client.post('/api/templates', data={"file": (io.BytesIO(_docx_bytes("[County]")), "lease.docx")}).get_json()
+    monkeypatch.setattr(template_registry, '_templates', {})
+    assert template_registry.load_registry() == 1
+    assert template_registry.get_template(meta["id"])["name"] == "lease.docx"
+
+
+def test_store_templates_parse_outside_the_registry_lock(tmp_path, registry, monkeypatch):
+    path = str(tmp_path / "templates.store")
+    index = build_store(path, [
+        {"data": _docx_bytes("First [County]"), "name": "first.docx"},
+        {"data": _docx_bytes("Second [State]"), "name": "second.docx"},
+    ])
+    template_registry.attach_store(ensure_store(path, str(tmp_path / "missing")))
+    first, second = sorted(index, key=lambda template_id: index[template_id]["name"])
+
+    parsing = threading.Event()
+    release = threading.Event()
+    parses = []
+    load = template_registry.load_frozen_document
+
+    def slow_load(stream):
+        parses.append(threading.current_thread().name)
+        assert not template_registry._lock.locked()
+        parsing.set()
+        release.wait(5)
+        return load(stream)
+
+    monkeypatch.setattr(template_registry, 'load_frozen_document', slow_load)
+    copies = []
+    threads = [threading.Thread(target=lambda: copies.append(template_registry.get_working_copy(first)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert parsing.wait(5)
+
+    # Another template and registry lookups stay available while the first parses
+    assert template_registry.get_template(first)["name"] == "first.docx"
+    monkeypatch.setattr(template_registry, 'load_frozen_document', load)
+    assert template_registry.get_working_copy(second).paragraphs[0].text == "Second [State]"
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(parses) == 1
+    assert [copy.paragraphs[0].text for copy in copies] == ["First [County]"] * 3
+
+
+def test_uploaded_names_are_reduced_to_plain_file_names(client):
+    meta = client.post('/api/templates?name=../../evil.docx', data=_docx_bytes("[State]")).get_json()
+    assert meta["name"] == ".._.._evil.docx"
@@ -0,0 +1,67 @@
+import io
+import os
+
+from docx import Document
+
+import template_registry
+from template_store import build_store, ensure_store, open_template_stream
+
+
+def _docx_bytes(text):
+    doc = Document()
+    doc.add_paragraph(text)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def test_store_round_trips_template_bytes(tmp_path):
+    data = _docx_bytes("Lease for [Grantor Name]")
+    path = str(tmp_path / "templates.store")
+    index = build_store(path, [{"data": data, "name": "lease.docx"}])
+    store = ensure_store(path, str(tmp_path / "missing"))
+    (template_id,) = index
+    stream = open_template_stream(store, template_id)
+    try:
+        assert stream.read() == data
+    finally:
+        stream.close()
+
+
+def test_ensure_store_rebuilds_when_registry_changes(tmp_path):
+    registry = tmp_path / "registry"
+    registry.mkdir()
+    path = str(tmp_path / "templates.store")
+    (registry / "first.docx").write_bytes(_docx_bytes("First [County]"))
+    assert len(ensure_store(path, str(registry))["index"]) == 1
+
+    # Unchanged directory: the existing store is reused
+    built = os.stat(path).st_mtime_ns
+    assert len(ensure_store(path, str(registry))["index"]) == 1
+    assert os.stat(path).st_mtime_ns == built
+
+    # A template added after the store was built triggers a rebuild
+    os.utime(path, ns=(built - 10**9, built - 10**9))
+    (registry / "second.docx").write_bytes(_docx_bytes("Second [State]"))
+    assert len(ensure_store(path, str(registry))["index"]) == 2
+
+
+def test_attached_store_templates_render_from_working_copies(tmp_path):
+    data = _docx_bytes("Lease for [Grantor Name]")
+    path = str(tmp_path / "templates.store")
+    index = build_store(path, [{"data": data, "name": "lease.docx", "placeholders": ["[Grantor Name]"]}])
+    template_registry.attach_store(ensure_store(path, str(tmp_path / "missing")))
+    (template_id,) = index
+    copy = template_registry.get_working_copy(template_id)
+    assert copy.paragraphs[0].text == "Lease for [Grantor Name]"
+    copy.paragraphs[0].text = "changed"
+    assert template_registry.get_working_copy(template_id).paragraphs[0].text == "Lease for [Grantor Name]"
+
+
+def test_uploads_and_deletes_are_rejected_in_store_mode(monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'TEMPLATE_STORE_PATH', '/srv/templates.store')
+    client = app_module.app.test_client()
+    assert client.post('/api/templates', data=_docx_bytes("[County]")).status_code == 409
+    assert client.delete('/api/templates/0123456789abcdef').status_code == 409
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+import warmup
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+
+    # Let the warm-up started when the app was imported finish first
+    for thread in threading.enumerate():
+        if thread.name == 'lease-warmup':
+            thread.join(60)
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def fresh_state(client, monkeypatch):
+    monkeypatch.setattr(warmup, '_state', {
+        "ready": False,
+        "started_at": None,
+        "finished_at": None,
+        "duration_s": None,
+        "steps": {},
+        "warnings": [],
+        "error": None,
+    })
+
+
+def test_ready_reports_503_until_warmup_finishes(client, fresh_state, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    preload = warmup.preload_text_templates
+
+    def blocked_preload():
+        started.set()
+        release.wait(10)
+        return preload()
+
+    monkeypatch.setattr(warmup, 'preload_text_templates', blocked_preload)
+    thread = warmup.start_warmup()
+    assert started.wait(10)
+
+    response = client.get('/api/ready')
+    assert response.status_code == 503
+    assert response.get_json()["ready"] is False
+    assert response.get_json()["started_at"] is not None
+
+    release.set()
+    thread.join(30)
+    response = client.get('/api/ready')
+    assert response.status_code == 200
+    state = response.get_json()
+    assert state["ready"] is True and state["error"] is None
+    assert set(state["steps"]) == {"text_templates", "exhibit_templates", "docx_templates", "synthetic_render"}
+
+
+def test_failed_synthetic_render_keeps_the_instance_unready(client, fresh_state, monkeypatch):
+    monkeypatch.setattr(warmup, 'render', lambda *args, **kwargs: (False, None, "broken template"))
+    state = warmup.run_warmup()
+    assert state["ready"] is False
+    assert state["error"] == "Synthetic warm-up render failed: broken template"
+    assert "synthetic_render" not in state["steps"]
+    assert client.get('/api/ready').status_code == 503
+
+
+def test_missing_template_files_warn_without_blocking(fresh_state, tmp_path):
+    state = warmup.start_warmup([str(tmp_path / "missing.docx")], background=False) or warmup.readiness()
+    assert state["ready"] is True
+    assert state["warnings"] == [f"Template file not found: {tmp_path / 'missing.docx'}"]
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from worker_pool import run_pool, summarize_workers
+
+
+def _upper(item, index):
+    return item.upper()
+
+
+def _flaky(item, index):
+    if item == "boom":
+        raise SystemExit(2)
+    if item == "bad":
+        raise ValueError("bad item")
+    if item == "die":
+        os._exit(3)
+    if item == "unpicklable":
+        return lambda: None
+    return item.upper()
+
+
+class _UnprintableError(Exception):
+    def __str__(self):
+        raise RuntimeError("no message")
+
+
+def _unprintable(item, index):
+    if item == "odd":
+        raise _UnprintableError()
+    return item.upper()
+
+
+def _failed(index, message):
+    return f"failed {index}: {message}"
+
+
+def test_results_keep_item_order():
+    results, stats = run_pool(_upper, list("abcdef"), workers=3, max_tasks=0, max_rss_mb=0)
+    assert results == list("ABCDEF")
+    assert sum(s["tasks"] for s in stats) == 6
+    assert {s["reason"] for s in stats} == {"done"}
+
+
+def test_workers_are_recycled_after_max_tasks():
+    results, stats = run_pool(_upper, list("abcde"), workers=1, max_tasks=2, max_rss_mb=0)
+    assert results == list("ABCDE")
+    assert [(s["tasks"], s["reason"]) for s in stats] == [(2, "max_tasks"), (2, "max_tasks"), (1, "done")]
+    assert len({s["pid"] for s in stats}) == 3
+
+
+def test_workers_are_recycled_at_the_rss_ceiling():
+    results, stats = run_pool(_upper, list("abc"), workers=1, max_tasks=0, max_rss_mb=0.001)
+    assert results == list("ABC")
+    assert [(s["tasks"], s["reason"]) for s in stats] == [(1, "max_rss")] * 3
+    assert all(s["peak_rss_mb"] >= s["last_rss_mb"] > 0 for s in stats)
+
+
+def test_exceptions_fail_only_their_task():
+    results, _ = run_pool(_flaky, ["a", "bad", "b"], workers=1, max_tasks=0, max_rss_mb=0, on_error=_failed)
+    assert results == ["A", "failed 1: ValueError: bad item", "B"]
+
+
+def test_system_exit_in_a_task_does_not_drop_the_queue():
+    results, stats = run_pool(_flaky, ["a", "boom", "b", "c"], workers=1, max_tasks=0, max_rss_mb=0, on_error=_failed)
+    assert results == ["A", "failed 1: SystemExit: 2", "B", "C"]
+    assert len(stats) == 1
+
+
+def test_unpicklable_results_fail_their_task():
+    results, _ = run_pool(_flaky, ["a", "unpicklable", "b"], workers=1, max_tasks=0, max_rss_mb=0, on_error=_failed)
+    assert results[0] == "A" and results[2] == "B"
+    assert results[1].startswith("failed 1: Result could not be sent")
+
+
+def test_a_worker_dying_mid_task_is_replaced():
+    results, stats = run_pool(_flaky, ["a", "die", "b", "c"], workers=1, max_tasks=0, max_rss_mb=0, on_error=_failed)
+    assert results[0] == "A" and results[2:] == ["B", "C"]
+    assert results[1].startswith("failed 1: worker ") and results[1].endswith("exited with code 3")
+    assert [s["reason"] for s in stats] == ["died (3)", "done"]
+
+    summary = summarize_workers(stats)
+    assert (summary["processes"], summary["died"], summary["recycled_max_tasks"]) == (2, 1, 0)
+    assert summary["peak_rss_mb"] == stats[1]["peak_rss_mb"]
+
+
+def test_a_worker_exiting_through_cleanup_fails_its_task_and_is_replaced():
+    # Formatting the error raises in the worker, which then exits via its finally block
+    results, stats = run_pool(_unprintable, ["a", "odd", "b", "c"], workers=1, max_tasks=0, max_rss_mb=0,
+                              on_error=_failed)
+    assert results[0] == "A" and results[2:] == ["B", "C"]
+    assert results[1].startswith("failed 1: worker ") and results[1].endswith("exited while running the task")
+    assert [s["tasks"] for s in stats] == [1, 2]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_empty_input_starts_no_workers(workers):
+    assert run_pool(_upper, [], workers=workers) == ([], [])
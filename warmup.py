@@ -0,0 +1,164 @@
+"""
+Server warm-up and readiness.
+
+Everything the first request would otherwise pay for lazily is done once at
+startup: text blocks (templates/**/*.txt) and exhibit templates are read and
+compiled, configured DOCX templates and registered templates are parsed, and
+a synthetic lease is rendered end to end to import and exercise python-docx,
+lxml and zipfile. The instance reports ready only after that.
+
+Configured templates are DEFAULT_TEMPLATE_PATH plus LEASE_WARMUP_TEMPLATES
+(paths separated by os.pathsep). Missing files are reported but do not block
+readiness; a failing synthetic render does.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+from docx import Document
+
+import template_registry
+from exhibit_templates import load_exhibit_templates
+from json_response import encode_json
+from lease_pipeline import build_mapping, enrich, preload_text_templates, render
+from payload_schema import validate_lease_payload
+
+WARMUP_TEMPLATE_PATHS = [p for p in os.environ.get('LEASE_WARMUP_TEMPLATES', '').split(os.pathsep) if p]
+
+SYNTHETIC_PAYLOAD = {
+    "document_name": "Warm-up Lease",
+    "grantor_name": "Warm-up Grantor",
+    "owner_type": "a married couple",
+    "number_of_grantor_signatures": 2,
+    "state": "Washington",
+    "county": "Spokane",
+    "parcels": [
+        {"apn": "0.1", "acres": 1, "legal_description": "Warm-up parcel", "isPortion": False},
+        {"apn": "0.2", "acres": 2, "legal_description": "Warm-up portion", "isPortion": True},
+    ],
+}
+
+_state = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "duration_s": None,
+    "steps": {},
+    "warnings": [],
+    "error": None,
+}
+_state_lock = threading.Lock()
+
+
+def _synthetic_template():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "[Document Name]"
+    doc.add_paragraph("Made by [Grantor Name], [Owner Type], in [County] County, [State].")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "[Parcels - Parcel 1 APN]"
+    table.cell(0, 1).text = "[Signature Block]"
+    doc.add_paragraph("[Exhibit A - Exhibit A String]")
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def _step(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    with _state_lock:
+        _state["steps"][name] = {"seconds": round(time.perf_counter() - start, 4), "result": result}
+    return result
+
+
+def _preload_docx_templates(paths):
+    loaded = 0
+    for path in paths:
+        if not path or not os.path.exists(path):
+            with _state_lock:
+                _state["warnings"].append(f"Template file not found: {path}")
+            continue
+        template_registry.preload_path(path)
+        loaded += 1
+    for meta in template_registry.list_templates():
+        template_registry.get_working_copy(meta["id"])
+        loaded += 1
+    return loaded
+
+
+def _synthetic_render():
+    if validate_lease_payload(SYNTHETIC_PAYLOAD):
+        raise RuntimeError("Synthetic warm-up payload failed validation")
+    enriched = enrich(SYNTHETIC_PAYLOAD, deterministic=True)
+    mapping = build_mapping(enriched)
+    encode_json({"mapping": mapping, "enriched_json": enriched})
+    template = _synthetic_template()
+    sizes = []
+    for exhibit_format in ('text', 'paragraphs'):
+        ok, docx_bytes, err = render(BytesIO(template), mapping, exhibit_format=exhibit_format, deterministic=True)
+        if not ok:
+            raise RuntimeError(f"Synthetic warm-up render failed: {err}")
+        sizes.append(len(docx_bytes))
+    return sizes
+
+
+def run_warmup(template_paths=()):
+    """
+    Run all warm-up steps and mark the instance ready.
+
+    Args:
+        template_paths (iterable): DOCX template files to preload
+
+    Returns:
+        dict: Readiness state
+    """
+    with _state_lock:
+        _state["started_at"] = datetime.now(timezone.utc).isoformat()
+    start = time.perf_counter()
+    try:
+        _step("text_templates", preload_text_templates)
+        _step("exhibit_templates", lambda: len(load_exhibit_templates()))
+        _step("docx_templates", lambda: _preload_docx_templates(list(template_paths) + WARMUP_TEMPLATE_PATHS))
+        _step("synthetic_render", _synthetic_render)
+        ready, error = True, None
+    except Exception as e:
+        ready, error = False, str(e)
+        print(f"[ERROR] Warm-up failed: {error}")
+    with _state_lock:
+        _state["ready"] = ready
+        _state["error"] = error
+        _state["finished_at"] = datetime.now(timezone.utc).isoformat()
+        _state["duration_s"] = round(time.perf_counter() - start, 4)
+    print(f"[INFO] Warm-up finished in {_state['duration_s']}s, ready: {ready}")
+    return readiness()
+
+
+def start_warmup(template_paths=(), background=True):
+    """
+    Start warm-up, by default on a background thread so the server can answer
+    readiness probes meanwhile.
+
+    Args:
+        template_paths (iterable): DOCX template files to preload
+        background (bool): Run on a daemon thread
+
+    Returns:
+        threading.Thread or None: The warm-up thread
+    """
+    if not background:
+        run_warmup(template_paths)
+        return None
+    thread = threading.Thread(target=run_warmup, args=(tuple(template_paths),), name='lease-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """Return a copy of the readiness state."""
+    with _state_lock:
+        state = dict(_state)
+        state["steps"] = dict(_state["steps"])
+        state["warnings"] = list(_state["warnings"])
+    return state
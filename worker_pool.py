@@ -0,0 +1,206 @@
+"""
+Process pool with worker recycling for long batch runs.
+
+python-docx/lxml trees and output buffers leave a rendering process's RSS
+creeping up over thousands of documents. Each worker here is retired
+gracefully, between tasks, once it has run LEASE_WORKER_MAX_TASKS tasks or
+its RSS reaches LEASE_WORKER_MAX_RSS_MB, and a fresh process takes its
+place, so a run of any length stays within workers x ceiling.
+
+The parent hands out one task at a time over a private pipe per worker, so
+it always knows which task a worker holds: a worker that dies (e.g. killed
+by the OOM killer) fails only that task, and a replacement is started. Each
+worker reports its task count, RSS and why it exited; run_pool() returns
+those stats with the results.
+"""
+import multiprocessing
+import os
+import sys
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+
+MAX_TASKS_PER_WORKER = int(os.environ.get('LEASE_WORKER_MAX_TASKS', '500'))
+MAX_WORKER_RSS_MB = float(os.environ.get('LEASE_WORKER_MAX_RSS_MB', '1024'))
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_mb():
+    """
+    Resident set size of the current process.
+
+    Read from /proc/self/statm on Linux; elsewhere the peak RSS from
+    getrusage() is used, which only errs towards recycling earlier.
+
+    Returns:
+        float: RSS in MB (0.0 if unknown)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _worker_main(conn, fn, args, max_tasks, max_rss_mb, on_exit):
+    stats = {"pid": os.getpid(), "tasks": 0, "start_rss_mb": current_rss_mb(), "peak_rss_mb": 0.0,
+             "last_rss_mb": 0.0, "reason": "done"}
+    stats["peak_rss_mb"] = stats["last_rss_mb"] = stats["start_rss_mb"]
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            index, item = task
+            try:
+                message = ("result", index, fn(item, index, *args))
+            except BaseException as e:
+                # SystemExit / KeyboardInterrupt from a task fail that task, not the run
+                traceback.print_exc()
+                message = ("error", index, f"{type(e).__name__}: {e}")
+
+            stats["tasks"] += 1
+            rss = current_rss_mb()
+            stats["last_rss_mb"] = rss
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss)
+            if max_tasks and stats["tasks"] >= max_tasks:
+                stats["reason"] = "max_tasks"
+            elif max_rss_mb and rss >= max_rss_mb:
+                stats["reason"] = "max_rss"
+            retiring = stats["reason"] != "done"
+            try:
+                conn.send(message + (retiring,))
+            except Exception as e:
+                # The result could not be pickled; nothing was written to the pipe
+                conn.send(("error", index, f"Result could not be sent: {type(e).__name__}: {e}", retiring))
+            if retiring:
+                break
+    finally:
+        if on_exit is not None:
+            on_exit()
+        conn.send(("exit", stats))
+        conn.close()
+
+
+def run_pool(fn, items, args=(), workers=2, max_tasks=MAX_TASKS_PER_WORKER, max_rss_mb=MAX_WORKER_RSS_MB,
+             on_error=None, on_exit=None):
+    """
+    Run fn(item, index, *args) for every item on recycled worker processes.
+
+    Args:
+        fn: Module-level function (it is sent to the worker processes)
+        items (list): Task inputs
+        args (tuple): Extra arguments passed to every call
+        workers (int): Number of concurrent worker processes
+        max_tasks (int): Retire a worker after this many tasks (0: never)
+        max_rss_mb (float): Retire a worker once its RSS reaches this (0: never)
+        on_error: Called in the parent as on_error(index, message) to build
+            the result of a task that raised (SystemExit included), whose
+            result could not be sent back, or whose worker exited while
+            running it; defaults to returning None
+        on_exit: Module-level function each worker calls before exiting
+            (e.g. to stop helper processes)
+
+    Returns:
+        tuple: (results in item order, list of per-worker stats dicts with
+            pid, tasks, start/peak/last RSS in MB and exit reason)
+    """
+    ctx = multiprocessing.get_context()
+    queue = deque(enumerate(items))
+    results = [None] * len(items)
+    stats = []
+    active = {}  # parent connection -> {"proc", "index", "retiring"}
+    on_error = on_error or (lambda index, message: None)
+
+    def dispatch(conn):
+        worker = active[conn]
+        task = queue.popleft() if queue else None
+        worker["index"] = task[0] if task else None
+        try:
+            conn.send(task)
+        except OSError:
+            # The worker is gone; its EOF is handled in the main loop
+            pass
+
+    def spawn():
+        parent_conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(target=_worker_main, args=(child_conn, fn, args, max_tasks, max_rss_mb, on_exit), daemon=True)
+        proc.start()
+        child_conn.close()
+        active[parent_conn] = {"proc": proc, "index": None, "retiring": False}
+        dispatch(parent_conn)
+
+    for _ in range(min(max(workers, 1), len(items))):
+        spawn()
+
+    while active:
+        for conn in wait(list(active)):
+            worker = active[conn]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                # Died without reporting: fail the task it held
+                proc = worker["proc"]
+                proc.join()
+                if worker["index"] is not None:
+                    results[worker["index"]] = on_error(worker["index"], f"worker {proc.pid} exited with code {proc.exitcode}")
+                    print(f"[ERROR] Worker {proc.pid} exited with code {proc.exitcode} while rendering task {worker['index']}")
+                stats.append({"pid": proc.pid, "tasks": None, "start_rss_mb": None, "peak_rss_mb": None,
+                              "last_rss_mb": None, "reason": f"died ({proc.exitcode})"})
+                del active[conn]
+                conn.close()
+                if queue:
+                    spawn()
+                continue
+
+            kind = message[0]
+            if kind == "exit":
+                stats.append(message[1])
+                del active[conn]
+                conn.close()
+                worker["proc"].join()
+                if worker["index"] is not None:
+                    # Exited through its cleanup path while holding a task
+                    pid = worker["proc"].pid
+                    results[worker["index"]] = on_error(worker["index"], f"worker {pid} exited while running the task")
+                    print(f"[ERROR] Worker {pid} exited while rendering task {worker['index']}")
+                if queue:
+                    spawn()
+                continue
+
+            _, index, value, retiring = message
+            results[index] = value if kind == "result" else on_error(index, value)
+            worker["index"] = None
+            worker["retiring"] = retiring
+            if not retiring:
+                dispatch(conn)
+    return results, stats
+
+
+def summarize_workers(stats):
+    """
+    Aggregate per-worker stats for a batch summary.
+
+    Args:
+        stats (list): Per-worker stats from run_pool()
+
+    Returns:
+        dict: processes, recycled counts by reason, died, peak and mean peak RSS in MB
+    """
+    peaks = [s["peak_rss_mb"] for s in stats if s["peak_rss_mb"] is not None]
+    return {
+        "processes": len(stats),
+        "recycled_max_tasks": sum(1 for s in stats if s["reason"] == "max_tasks"),
+        "recycled_max_rss": sum(1 for s in stats if s["reason"] == "max_rss"),
+        "died": sum(1 for s in stats if s["reason"].startswith("died")),
+        "peak_rss_mb": max(peaks) if peaks else None,
+        "mean_peak_rss_mb": sum(peaks) / len(peaks) if peaks else None,
+    }